@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # ================= CONFIG ==================
@@ -9,6 +10,13 @@ ID_WIND_DIR = 4
 READ_INTERVAL_MS = 1000
 CSV_AUTO_DIR = Path.cwd()
 MAX_SAMPLES = 200
+# Lịch sử RS485 (TimeSeriesStore): raw + rollup (độ phân giải s, số bucket giữ lại)
+HISTORY_RAW_CAPACITY = 3600                                   # ~1h mẫu 1 Hz
+# mỗi khung zoom có 1 mức <= HISTORY_MAX_POINTS bucket: 1h @10s, 6h @1min, 1 ngày @3min, 7 ngày @20min
+HISTORY_ROLLUPS = ((10, 720), (60, 720), (180, 960), (1200, 1008), (3600, 8760))   # 2h, 12h, 2 ngày, 14 ngày, 1 năm
+HISTORY_MAX_POINTS = 600                                      # số điểm tối đa mỗi lần vẽ
+# Các khung zoom cho plot: (nhãn, span giây)
+HISTORY_SPANS = (("Live", MAX_SAMPLES * READ_INTERVAL_MS // 1000), ("1 h", 3600), ("6 h", 21600), ("1 day", 86400), ("7 days", 604800))
 TABLE_HEADERS = ["Time", "Temperature (°C)", "Humidity (%)", "Wind Direction (°)", "Wind Speed (m/s)"]
 
 # ================= ADXL CONFIG (từ adxl.py) ==================
@@ -22,6 +30,80 @@ CH_ADXL3 = 4
 INTERVAL_US = 2000  # ~500 Hz
 
 ADXL_HEADERS = ["Z1", "Z2", "Z3"]
+ADXL_G_PER_LSB = 0.0039   # full-res ±8g: 3.9 mg/LSB
+
+# Block mẫu ADXLLogger giao cho các bộ xử lý (features, ...)
+ADXL_BLOCK_SIZE = 50
+
+# Tần số riêng cho từng đầu ra ADXL (Hz, phải chia hết 1e6 / INTERVAL_US; None = giữ nguyên)
+ADXL_LOG_RATE_HZ = 500
+ADXL_UPLOAD_RATE_HZ = 500     # vd. 100 để giảm băng thông upload
+ADXL_DISPLAY_RATE_HZ = 50
+ADXL_DISPLAY_SECONDS = 10
+
+# ================= ADXL FAULT RECOVERY ==================
+# Mẫu lỗi / kênh hỏng được ghi là gap (CSV rỗng, JSON null), không dùng giá trị cũ / 0
+ADXL_CHANNEL_FAIL_LIMIT = 5     # số lần đọc lỗi liên tiếp -> đánh dấu kênh down, bỏ khỏi vòng đọc
+ADXL_RETRY_MIN_S = 0.1          # backoff re-init kênh / mở lại bus (nhân đôi mỗi lần lỗi)
+ADXL_RETRY_MAX_S = 5.0
+ADXL_BUS_FAIL_LIMIT = 20        # số tick liên tiếp không kênh nào đọc được -> reset mux + mở lại bus
+ADXL_HEALTH_CHECK_S = 1.0       # chu kỳ kiểm tra POWER_CTL (brown-out), mỗi lần 1 kênh
+ADXL_MAX_CATCHUP_TICKS = 5      # trễ hơn số tick này -> bỏ qua, điền gap rồi bắt nhịp lại
+ADXL_MAX_GAP_FILL_S = 10.0      # trễ quá lâu (vd. suspend) -> không điền gap, chỉ bắt nhịp
+ADXL_OFFSET_SAMPLES = 200       # số mẫu hiệu chuẩn offset (median)
+
+# ================= TIMEBASE ==================
+# Mẫu i lên lịch theo time.monotonic; thời gian thực = monotonic + offset (wall - monotonic) đo định kỳ
+TIMEBASE_DISCIPLINE_S = 1.0     # chu kỳ đo lại offset
+TIMEBASE_ALPHA = 0.1            # hệ số làm mượt offset
+TIMEBASE_STEP_US = 20000        # lệch hơn -> coi là chỉnh giờ (NTP step, RTC lúc boot): nhảy neo, không làm mượt
+ADXL_ANCHOR_S = 10.0            # chu kỳ ghi neo thời gian vào <log>.time.jsonl cạnh CSV ADXL
+
+# ================= LOG QUERY ==================
+# Index <log>.idx.npz cạnh log ADXL: aggregate theo bucket giờ thực, ghép với RS485 (app/logstore.py)
+QUERY_BUCKET_S = 1.0            # độ phân giải index (= chu kỳ RS485)
+QUERY_MAX_INTERVAL_S = 2.0      # kỳ RS485 dài hơn (mất mẫu) -> chỉ ghép ADXL trong chừng này giây
+QUERY_INDEX_REFRESH_MS = 10000  # dashboard: cập nhật index của phiên đang ghi
+QUERY_EXPORT_WINDOW_S = 60      # dashboard export khung > 1 ngày: cửa sổ 60s thay vì từng kỳ RS485
+
+# ================= ADXL FEATURES ==================
+# Chế độ ADXL:
+# - "raw":      ghi CSV raw + gửi mẫu raw 500Hz + features
+# - "features": ghi CSV raw, chỉ gửi features
+# - "events":   không ghi/gửi raw; chỉ gửi + ghi log event (trigger) và features
+ADXL_MODE = "raw"
+FEATURE_WINDOW = 1024              # mẫu / cửa sổ (~2s @500Hz)
+FEATURE_OVERLAP = 0.5
+FEATURE_WELCH_NPERSEG = 256
+FEATURE_BANDS_HZ = ((0.5, 5), (5, 20), (20, 50), (50, 100), (100, 250))
+FEATURE_TOP_K = 3
+
+# ================= ADXL TRIGGER ==================
+TRIGGER_LEVEL_G = 0.5              # ngưỡng |Z - DC| (g), None -> tắt detector ngưỡng
+TRIGGER_STA_S = 0.05
+TRIGGER_LTA_S = 5.0                # 0 -> tắt STA/LTA
+TRIGGER_ON_RATIO = 4.0
+TRIGGER_OFF_RATIO = 1.5
+TRIGGER_PRE_S = 0.5                # buffer trước trigger
+TRIGGER_POST_S = 1.0               # giữ thêm sau lần kích hoạt cuối
+TRIGGER_MAX_EVENT_S = 10.0
+
+# ================= HARDWARE BACKEND ==================
+# "hw": SMBus(1) + /dev/ttyUSB0 thật; "sim": FakeSMBus / FakeInstrument (app/sensors/sim.py)
+HW_BACKEND = os.environ.get("SENSOR_BACKEND", "hw")
+SIM_I2C_LATENCY_S = 0.0002      # mỗi transaction I2C
+SIM_I2C_ERROR_RATE = 0.0
+SIM_MODBUS_LATENCY_S = 0.005    # xử lý của slave (chưa gồm thời gian truyền frame)
+SIM_MODBUS_TIMEOUT_RATE = 0.0
+
+# ================= METRICS ==================
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108             # GET http://METRICS_HOST:METRICS_PORT/metrics; None -> tắt
+
+# ================= TRACING ==================
+TRACE_ENABLED = os.environ.get("TRACE", "0") == "1"   # bật tracing hot-path (app/tracing.py)
+TRACE_BUFFER_EVENTS = 65536     # span giữ lại / thread (~15s ở 500Hz)
+TRACE_DEAD_BUFFERS = 8          # buffer của thread đã kết thúc giữ lại chờ dump (bỏ cái cũ nhất)
 
 # ================= REALTIME SERVER CONFIG (ADD) ==================
 SERVER_URL = "http://100.109.17.117:8080"  # <-- IP Windows chạy server
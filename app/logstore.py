@@ -0,0 +1,494 @@
+"""
+Truy vấn log đã ghi theo thời gian: ghép RS485 (1 Hz) với aggregate ADXL từng kênh.
+
+- Phiên log = hậu tố tên file (adxl345_log_<phiên>.csv, rs485_log_<phiên>.csv).
+- Thời gian từng hàng ADXL lấy từ file neo <log>.time.jsonl (log cũ không có neo: giờ trong
+  tên file + ADXL_LOG_RATE_HZ, đánh dấu approx_time); RS485 từ cột "Time" (giờ local).
+- Index <log>.idx.npz cạnh log ADXL (bucket khác QUERY_BUCKET_S: <log>.idx-<µs>us.npz riêng):
+  mỗi bucket giờ thực lưu số hàng và,
+  cho từng kênh, số mẫu không gap / sum / sum bình phương / min / max. Xây 1 lần bằng đọc chunk,
+  sau đó chỉ đọc phần log ghi thêm (từ byte offset) -> truy vấn nhiều ngày chỉ đọc index.
+- Aggregate của 1 khoảng bất kỳ (mean, std = RMS phần AC, rms, min, max, p2p, % gap) suy ra
+  từ các bucket bằng phép vector (prefix sum + reduceat) -> khoảng truy vấn phải khớp biên bucket
+  (cửa sổ / max_interval_s là bội số của bucket; join: bucket chia hết 1s vì giờ RS485 tính theo giây).
+
+    store = LogStore(["/data/logs"])
+    df = store.join(datetime(2024, 5, 1), datetime(2024, 5, 3))      # 1 hàng / kỳ RS485
+    df = store.windows(datetime(2024, 5, 1), datetime(2024, 5, 3), window_s=600)
+"""
+import io
+import json
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    ADXL_G_PER_LSB,
+    ADXL_HEADERS,
+    ADXL_LOG_RATE_HZ,
+    CSV_AUTO_DIR,
+    INTERVAL_US,
+    QUERY_BUCKET_S,
+    QUERY_MAX_INTERVAL_S,
+)
+from .metrics import REGISTRY
+from .sensors.adxl import anchor_path
+
+LOGSTORE_INDEXED_ROWS = REGISTRY.counter("logstore_indexed_rows_total", "ADXL log rows added to query indexes")
+LOGSTORE_ERRORS = REGISTRY.counter("logstore_errors_total", "Failed LogStore index refreshes / exports",
+                                   ("op", "error"))
+LOGSTORE_QUERY_SECONDS = REGISTRY.histogram("logstore_query_seconds", "LogStore query time", ("kind",),
+                                            buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+
+SESSION_RE = re.compile(r"^(adxl345_log|rs485_log)_(.+)\.csv$")
+SESSION_TIME_FMT = "%Y-%m-%d_%H-%M-%S"
+RS485_TIME_FMT = "%Y-%m-%d %H:%M:%S"
+RS485_FIELDS = ("time_local", "temp_c", "hum_pct", "wind_dir_deg", "wind_spd_ms")
+INDEX_VERSION = 1
+
+
+# ================= SESSIONS ==================
+class LogSession:
+    """1 phiên log: name (hậu tố file) + đường dẫn ADXL / RS485 (None nếu thiếu)."""
+    def __init__(self, name: str):
+        self.name = name
+        self.adxl = None
+        self.rs485 = None
+
+    def start_us(self):
+        """Giờ bắt đầu phiên theo tên file (giờ local), None nếu tên không đúng định dạng."""
+        try:
+            return int(datetime.strptime(self.name, SESSION_TIME_FMT).timestamp() * 1e6)
+        except ValueError:
+            return None
+
+
+def find_sessions(paths, pattern: str = None) -> list:
+    """File / thư mục -> danh sách LogSession theo thứ tự tên (= thời gian)."""
+    files = []
+    for p in map(Path, paths):
+        files.extend(sorted(p.iterdir()) if p.is_dir() else [p])
+    sessions = {}
+    for f in files:
+        m = SESSION_RE.match(f.name)
+        if m is None or (pattern and not re.search(pattern, m.group(2))):
+            continue
+        s = sessions.setdefault(m.group(2), LogSession(m.group(2)))
+        if m.group(1) == "adxl345_log":
+            s.adxl = f
+        else:
+            s.rs485 = f
+    return [sessions[k] for k in sorted(sessions)]
+
+
+# ================= LOG READERS ==================
+def read_complete_lines(f, chunk_bytes: int) -> list:
+    """Các dòng hoàn chỉnh (~chunk_bytes); dòng cuối dở dang (file còn đang ghi) để lần sau."""
+    lines = f.readlines(chunk_bytes)
+    if lines and not lines[-1].endswith(b"\n"):
+        f.seek(-len(lines[-1]), os.SEEK_CUR)
+        lines.pop()
+    return lines
+
+
+def skip_header(f, offset: int) -> int:
+    """offset 0 -> bỏ dòng header; trả về byte offset của hàng dữ liệu kế tiếp."""
+    if offset == 0:
+        f.readline()
+        return f.tell()
+    f.seek(offset)
+    return offset
+
+
+def load_anchors(csv_path, session: LogSession = None) -> tuple:
+    """
+    (anchors, approx_time): neo thời gian của log ADXL (dict row/index/t_us/fs_hz/drift_ppm).
+    Không có file neo -> 1 neo giả: hàng 0 lúc bắt đầu phiên (tên file), ADXL_LOG_RATE_HZ.
+    """
+    try:
+        with open(anchor_path(csv_path)) as f:
+            anchors = [json.loads(line) for line in f if line.strip()]
+        if anchors:
+            return anchors, False
+    except FileNotFoundError:
+        pass
+    t0 = session.start_us() if session is not None else None
+    if t0 is None:
+        t0 = int(Path(csv_path).stat().st_mtime * 1e6)
+    fs = float(ADXL_LOG_RATE_HZ or 1e6 / INTERVAL_US)
+    return [{"row": 0, "index": 0, "t_us": t0, "fs_hz": fs, "drift_ppm": 0.0}], True
+
+
+def row_times_us(anchors, rows: np.ndarray) -> np.ndarray:
+    """Thời gian (epoch µs) của các hàng CSV, theo neo gần nhất phía trước mỗi hàng."""
+    a_row = np.array([a["row"] for a in anchors], dtype=np.int64)
+    a_t = np.array([a["t_us"] for a in anchors], dtype=np.int64)
+    a_fs = np.array([a["fs_hz"] for a in anchors], dtype=np.float64)
+    k = np.maximum(np.searchsorted(a_row, rows, side="right") - 1, 0)
+    return a_t[k] + np.rint((rows - a_row[k]) * 1e6 / a_fs[k]).astype(np.int64)
+
+
+def iter_adxl_chunks(path, row: int = 0, offset: int = 0, chunk_bytes: int = 1 << 20):
+    """
+    Đọc log ADXL theo chunk từ (row, byte offset) -> (data (n, C) float64 gap=NaN, row đầu,
+    byte offset sau từng hàng). Dùng pandas C parser trên từng chunk dòng hoàn chỉnh.
+    """
+    with open(path, "rb") as f:
+        offset = skip_header(f, offset)
+        while True:
+            lines = read_complete_lines(f, chunk_bytes)
+            if not lines:
+                return
+            data = pd.read_csv(io.BytesIO(b"".join(lines)), header=None, names=ADXL_HEADERS,
+                               dtype=np.float64, skip_blank_lines=False).to_numpy()
+            if len(data) != len(lines):
+                raise ValueError(f"{Path(path).name}: malformed rows near data row {row}")
+            ends = offset + np.cumsum([len(line) for line in lines])
+            yield data, row, ends
+            row += len(data)
+            offset = int(ends[-1])
+
+
+def local_to_us(times) -> np.ndarray:
+    """Chuỗi giờ local RS485_TIME_FMT -> epoch µs (vector; offset UTC tính 1 lần mỗi giờ, đúng qua DST)."""
+    naive = pd.to_datetime(pd.Series(times), format=RS485_TIME_FMT, errors="coerce")
+    ok = naive.notna().to_numpy()
+    sec = np.zeros(len(ok), dtype=np.int64)
+    sec[ok] = naive[ok].to_numpy().astype("datetime64[s]").astype(np.int64)
+    hours, inv = np.unique(sec // 3600, return_inverse=True)
+    off = np.array([h * 3600 - time.mktime(time.gmtime(int(h) * 3600)[:8] + (-1,)) for h in hours], dtype=np.int64)
+    out = (sec - off[inv]) * 1_000_000
+    out[~ok] = -1
+    return out
+
+
+def read_rs485(path) -> pd.DataFrame:
+    """rs485_log_*.csv -> DataFrame t_us + RS485_FIELDS (ô rỗng = NaN), bỏ hàng giờ hỏng."""
+    df = pd.read_csv(path, header=0, names=list(RS485_FIELDS), dtype={"time_local": str}, on_bad_lines="skip")
+    df.insert(0, "t_us", local_to_us(df["time_local"]))
+    return df[df["t_us"] >= 0].reset_index(drop=True)
+
+
+def _us(seconds) -> int:
+    return int(round(float(seconds) * 1e6))
+
+
+# ================= BUCKET STATS ==================
+_STATS = ("rows", "count", "sum", "sumsq", "min", "max")
+
+
+def _combine(b: np.ndarray, st: dict) -> tuple:
+    """Gộp các dòng cùng bucket (b không cần sắp xếp) -> (bucket tăng dần, stats)."""
+    if len(b) and np.any(b[1:] < b[:-1]):
+        order = np.argsort(b, kind="stable")
+        b = b[order]
+        st = {k: v[order] for k, v in st.items()}
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]]) if len(b) else np.empty(0, dtype=np.intp)
+    if len(starts) == len(b):
+        return b, st
+    out = {k: np.add.reduceat(st[k], starts, axis=0) for k in ("rows", "count", "sum", "sumsq")}
+    out["min"] = np.minimum.reduceat(st["min"], starts, axis=0)
+    out["max"] = np.maximum.reduceat(st["max"], starts, axis=0)
+    return b[starts], out
+
+
+def _row_stats(data: np.ndarray) -> dict:
+    ok = ~np.isnan(data)
+    x = np.where(ok, data, 0.0)
+    return {"rows": np.ones(len(data), dtype=np.int64), "count": ok.astype(np.int64), "sum": x, "sumsq": x * x,
+            "min": np.where(ok, data, np.inf), "max": np.where(ok, data, -np.inf)}
+
+
+def _empty_stats(C: int) -> dict:
+    return {"rows": np.empty(0, dtype=np.int64), "count": np.empty((0, C), dtype=np.int64),
+            "sum": np.empty((0, C)), "sumsq": np.empty((0, C)), "min": np.empty((0, C)), "max": np.empty((0, C))}
+
+
+# ================= ADXL INDEX ==================
+def index_path(csv_path, bucket_us: int = None) -> Path:
+    """adxl345_log_X.csv -> adxl345_log_X.idx.npz (bucket khác mặc định: adxl345_log_X.idx-<µs>us.npz)"""
+    if bucket_us is None or bucket_us == _us(QUERY_BUCKET_S):
+        return Path(csv_path).with_suffix(".idx.npz")
+    return Path(csv_path).with_suffix(f".idx-{bucket_us}us.npz")
+
+
+class AdxlIndex:
+    """
+    Aggregate theo bucket giờ thực của 1 log ADXL (buckets = epoch // bucket_us, tăng dần),
+    lưu ở <log>.idx.npz cùng (row, byte offset) đã index; update() chỉ đọc phần ghi thêm.
+    """
+    def __init__(self, csv_path, session: LogSession = None, bucket_s: float = QUERY_BUCKET_S):
+        self.csv_path = Path(csv_path)
+        self.session = session
+        self.bucket_us = _us(bucket_s)
+        self.path = index_path(csv_path, self.bucket_us)
+        self.C = len(ADXL_HEADERS)
+        self.row = 0
+        self.offset = 0
+        self.approx_time = False
+        self.buckets = np.empty(0, dtype=np.int64)
+        self.stats = _empty_stats(self.C)
+        self._load()
+
+    def _load(self):
+        try:
+            with np.load(self.path) as z:
+                meta = json.loads(str(z["meta"]))
+                if (meta.get("version") != INDEX_VERSION or meta.get("bucket_us") != self.bucket_us
+                        or meta["offset"] > self.csv_path.stat().st_size):
+                    return      # index cũ / log bị thay -> xây lại từ đầu
+                self.buckets = z["buckets"]
+                self.stats = {k: z[k] for k in _STATS}
+        except (OSError, ValueError, KeyError):
+            return
+        self.row, self.offset, self.approx_time = meta["row"], meta["offset"], meta["approx_time"]
+
+    def save(self):
+        meta = {"version": INDEX_VERSION, "bucket_us": self.bucket_us, "row": self.row,
+                "offset": self.offset, "approx_time": self.approx_time}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), buckets=self.buckets, **self.stats)
+        os.replace(tmp, self.path)
+
+    def update(self) -> int:
+        """Index phần log ghi thêm từ lần trước; trả về số hàng mới."""
+        if self.csv_path.stat().st_size <= self.offset:
+            return 0
+        anchors, self.approx_time = load_anchors(self.csv_path, self.session)
+        row0 = self.row
+        bs, parts = [self.buckets], [self.stats]
+        for data, row, ends in iter_adxl_chunks(self.csv_path, self.row, self.offset):
+            t = row_times_us(anchors, np.arange(row, row + len(data), dtype=np.int64))
+            b, st = _combine(t // self.bucket_us, _row_stats(data))
+            bs.append(b)
+            parts.append(st)
+            self.row, self.offset = row + len(data), int(ends[-1])
+        if self.row == row0:
+            return 0
+        self.buckets, self.stats = _combine(np.concatenate(bs), {k: np.concatenate([p[k] for p in parts])
+                                                                 for k in _STATS})
+        self.save()
+        LOGSTORE_INDEXED_ROWS.inc(self.row - row0)
+        return self.row - row0
+
+    def select(self, b0=None, b1=None) -> tuple:
+        """(buckets, stats) trong [b0, b1) (None = không giới hạn)."""
+        lo = 0 if b0 is None else np.searchsorted(self.buckets, b0)
+        hi = len(self.buckets) if b1 is None else np.searchsorted(self.buckets, b1)
+        return self.buckets[lo:hi], {k: v[lo:hi] for k, v in self.stats.items()}
+
+
+# ================= QUERY ==================
+def _to_us(t):
+    """None | datetime (naive = giờ local) | chuỗi ISO | epoch µs -> epoch µs."""
+    if t is None:
+        return None
+    if isinstance(t, str):
+        t = datetime.fromisoformat(t)
+    if isinstance(t, datetime):
+        return int(t.timestamp() * 1e6)
+    return int(t)
+
+
+def _circular_mean_deg(deg: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """Trung bình hướng (độ) theo nhóm bằng vector sin/cos, bỏ NaN."""
+    ok = ~np.isnan(deg)
+    r = np.deg2rad(deg[ok])
+    s = np.bincount(group[ok], np.sin(r), n_groups)
+    c = np.bincount(group[ok], np.cos(r), n_groups)
+    out = np.rad2deg(np.arctan2(s, c)) % 360.0
+    out = np.where(out >= 360.0, 0.0, out)     # -1e-14 % 360 == 360.0
+    out[np.bincount(group[ok], minlength=n_groups) == 0] = np.nan
+    return out
+
+
+class LogStore:
+    """
+    Truy vấn các phiên log trong paths (file / thư mục). Index ADXL được cache trong object
+    và cập nhật tăng dần mỗi lần truy vấn (phiên đang ghi vẫn truy vấn được).
+    Giá trị ADXL đổi sang g theo scale; kênh không có mẫu trong khoảng -> NaN.
+    """
+    def __init__(self, paths=(CSV_AUTO_DIR,), bucket_s: float = QUERY_BUCKET_S, scale: float = ADXL_G_PER_LSB,
+                 max_interval_s: float = QUERY_MAX_INTERVAL_S, channels=ADXL_HEADERS):
+        self.paths = [Path(p) for p in paths]
+        self.bucket_us = _us(bucket_s)
+        self.scale = float(scale)
+        self.max_interval_us = _us(max_interval_s)
+        if self.bucket_us <= 0:
+            raise ValueError(f"bucket_s must be > 0 (got {bucket_s})")
+        self._check_aligned("max_interval_s", self.max_interval_us)
+        self.channels = tuple(channels)
+        self._indexes = {}
+
+    def _check_aligned(self, name: str, us: int):
+        """Aggregate chỉ chính xác trên nguyên bucket -> khoảng phải là bội số dương của bucket."""
+        if us <= 0 or us % self.bucket_us:
+            raise ValueError(f"{name} must be a positive multiple of the index bucket "
+                             f"({self.bucket_us / 1e6:g}s), got {us / 1e6:g}s")
+
+    def sessions(self, start=None, end=None, pattern: str = None) -> list:
+        """Phiên có thể giao [start, end): phiên i được coi là kéo dài tới lúc phiên i+1 bắt đầu."""
+        start, end = _to_us(start), _to_us(end)
+        found = find_sessions(self.paths, pattern)
+        out = []
+        for i, s in enumerate(found):
+            t0 = s.start_us()
+            t1 = found[i + 1].start_us() if i + 1 < len(found) else None
+            if t0 is not None and end is not None and t0 >= end:
+                continue
+            if t1 is not None and start is not None and t1 <= start:
+                continue
+            out.append(s)
+        return out
+
+    def index(self, session: LogSession, update: bool = True) -> AdxlIndex:
+        idx = self._indexes.get(session.adxl)
+        if idx is None:
+            idx = self._indexes[session.adxl] = AdxlIndex(session.adxl, session, self.bucket_us / 1e6)
+        if update:
+            idx.update()
+        return idx
+
+    def refresh(self, pattern: str = None) -> int:
+        """Cập nhật index mọi phiên (khớp pattern); trả về số hàng mới được index."""
+        return sum(self.index(s, update=False).update() for s in self.sessions(pattern=pattern) if s.adxl is not None)
+
+    def rs485(self, start=None, end=None) -> pd.DataFrame:
+        """Các hàng RS485 trong [start, end), sắp theo thời gian, cột session + t_us + RS485_FIELDS."""
+        start, end = _to_us(start), _to_us(end)
+        frames = []
+        for s in self.sessions(start, end):
+            if s.rs485 is None:
+                continue
+            df = read_rs485(s.rs485)
+            if start is not None:
+                df = df[df["t_us"] >= start]
+            if end is not None:
+                df = df[df["t_us"] < end]
+            df.insert(0, "session", s.name)
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=["session", "t_us", *RS485_FIELDS])
+        df = pd.concat(frames, ignore_index=True)
+        return df.sort_values("t_us", kind="stable").drop_duplicates("t_us").reset_index(drop=True)
+
+    def adxl_buckets(self, start=None, end=None) -> tuple:
+        """(buckets, stats) gộp từ index các phiên ADXL trong [start, end)."""
+        start, end = _to_us(start), _to_us(end)
+        b0 = None if start is None else start // self.bucket_us
+        b1 = None if end is None else -(-end // self.bucket_us)
+        bs, parts = [], []
+        for s in self.sessions(start, end):
+            if s.adxl is None:
+                continue
+            b, st = self.index(s).select(b0, b1)
+            bs.append(b)
+            parts.append(st)
+        if not bs:
+            return np.empty(0, dtype=np.int64), _empty_stats(len(self.channels))
+        return _combine(np.concatenate(bs), {k: np.concatenate([p[k] for p in parts]) for k in _STATS})
+
+    def _aggregate(self, buckets, st, t0_us: np.ndarray, t1_us: np.ndarray) -> dict:
+        """
+        Aggregate ADXL cho từng khoảng [t0, t1) (mảng, không chồng nhau, tăng dần) -> cột theo kênh.
+        t0 / t1 phải nằm trên biên bucket (xem _check_aligned), nếu không bucket ở biên bị tính 2 lần.
+        """
+        lo = np.searchsorted(buckets, t0_us // self.bucket_us)
+        hi = np.searchsorted(buckets, t1_us // self.bucket_us)
+        rows = np.r_[0, np.cumsum(st["rows"])]
+        rows = rows[hi] - rows[lo]
+        out = {"adxl_rows": rows}
+        n = np.zeros((len(lo), len(self.channels)))
+        mean = std = rms = vmin = vmax = np.full_like(n, np.nan)
+        if len(buckets):
+            def span(k):
+                p = np.concatenate((np.zeros((1,) + st[k].shape[1:]), np.cumsum(st[k], axis=0)))
+                return p[hi] - p[lo]
+            n = span("count")
+            # min/max: reduceat trên cặp chỉ số [lo, hi) (thêm 1 dòng canh cuối để hi = len hợp lệ)
+            pairs = np.column_stack((lo, hi)).ravel()
+            vmin = np.minimum.reduceat(np.vstack((st["min"], np.full((1, n.shape[1]), np.inf))), pairs)[::2]
+            vmax = np.maximum.reduceat(np.vstack((st["max"], np.full((1, n.shape[1]), -np.inf))), pairs)[::2]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = span("sum") / n
+                ms = span("sumsq") / n
+                std = np.sqrt(np.maximum(ms - mean * mean, 0.0))
+                rms = np.sqrt(ms)
+            empty = n == 0
+            vmin = np.where(empty, np.nan, vmin)
+            vmax = np.where(empty, np.nan, vmax)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            gap = 100.0 * (1.0 - n / rows[:, None])
+        for c, ch in enumerate(self.channels):
+            out[f"{ch}_n"] = n[:, c].astype(np.int64)
+            out[f"{ch}_gap_pct"] = np.round(gap[:, c], 2)
+            out[f"{ch}_mean_g"] = mean[:, c] * self.scale
+            out[f"{ch}_std_g"] = std[:, c] * self.scale
+            out[f"{ch}_rms_g"] = rms[:, c] * self.scale
+            out[f"{ch}_min_g"] = vmin[:, c] * self.scale
+            out[f"{ch}_max_g"] = vmax[:, c] * self.scale
+            out[f"{ch}_p2p_g"] = (vmax[:, c] - vmin[:, c]) * self.scale
+        return out
+
+    def join(self, start=None, end=None) -> pd.DataFrame:
+        """
+        1 hàng / lần đọc RS485 trong [start, end): giá trị RS485 + aggregate ADXL trong kỳ của nó
+        [t_i, t_i+1), tối đa max_interval_s (mất mẫu RS485 không kéo dài kỳ).
+        """
+        if 1_000_000 % self.bucket_us:
+            raise ValueError(f"join needs an index bucket that divides 1s (RS485 times are whole seconds), "
+                             f"got {self.bucket_us / 1e6:g}s")
+        t_start = time.perf_counter()
+        df = self.rs485(start, end)
+        t = df["t_us"].to_numpy(dtype=np.int64)
+        t_end = np.minimum(np.r_[t[1:], np.iinfo(np.int64).max], t + self.max_interval_us)
+        if len(t):
+            buckets, st = self.adxl_buckets(int(t[0]), int(t_end[-1]))
+        else:
+            buckets, st = self.adxl_buckets(0, 0)
+        df.insert(2, "dur_s", (t_end - t) / 1e6)
+        agg = pd.DataFrame(self._aggregate(buckets, st, t, t_end), index=df.index)
+        LOGSTORE_QUERY_SECONDS.labels(kind="join").observe(time.perf_counter() - t_start)
+        return pd.concat((df, agg), axis=1)
+
+    def windows(self, start, end, window_s: float) -> pd.DataFrame:
+        """
+        Cửa sổ cố định window_s (bội số của bucket) phủ [start, end), căn theo epoch: RS485 trung bình
+        (hướng gió trung bình vector, thêm gió giật max) + aggregate ADXL, cả hai trên nguyên cửa sổ.
+        """
+        w_us = _us(window_s)
+        self._check_aligned("window_s", w_us)
+        t_start = time.perf_counter()
+        start, end = _to_us(start), _to_us(end)
+        t0 = np.arange(start // w_us * w_us, end, w_us, dtype=np.int64)
+        t1 = t0 + w_us
+        out = {"t_us": t0, "time_local": [datetime.fromtimestamp(x / 1e6).strftime(RS485_TIME_FMT) for x in t0]}
+        if len(t0):
+            start, end = int(t0[0]), int(t1[-1])
+
+        rs = self.rs485(start, end)
+        g = ((rs["t_us"].to_numpy(dtype=np.int64) - t0[0]) // w_us) if len(t0) else np.empty(0, dtype=np.int64)
+        cnt = np.bincount(g, minlength=len(t0))
+        out["rs485_n"] = cnt
+        for f in ("temp_c", "hum_pct", "wind_spd_ms"):
+            v = rs[f].to_numpy(dtype=np.float64)
+            ok = ~np.isnan(v)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[f] = np.bincount(g[ok], v[ok], len(t0)) / np.bincount(g[ok], minlength=len(t0))
+        gust = np.full(len(t0), -np.inf)
+        v = rs["wind_spd_ms"].to_numpy(dtype=np.float64)
+        ok = ~np.isnan(v)
+        np.maximum.at(gust, g[ok], v[ok])
+        out["wind_gust_ms"] = np.where(np.isinf(gust), np.nan, gust)
+        out["wind_dir_deg"] = _circular_mean_deg(rs["wind_dir_deg"].to_numpy(dtype=np.float64), g, len(t0))
+
+        buckets, st = self.adxl_buckets(start, end)
+        out.update(self._aggregate(buckets, st, t0, t1))
+        LOGSTORE_QUERY_SECONDS.labels(kind="windows").observe(time.perf_counter() - t_start)
+        return pd.DataFrame(out)
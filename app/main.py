@@ -1,12 +1,54 @@
+import signal
+import socket
 import sys
+from datetime import datetime
 
+from PySide6.QtCore import QSocketNotifier
 from PySide6.QtWidgets import QApplication
 
+from . import tracing
+from .config import CSV_AUTO_DIR, METRICS_HOST, METRICS_PORT
+from .metrics import MetricsServer
 from .ui.dashboard import Dashboard
 
 
 def main():
+    if METRICS_PORT:
+        try:
+            MetricsServer(METRICS_HOST, METRICS_PORT).start()
+        except OSError:
+            # cổng bận -> chạy tiếp không có endpoint metrics
+            pass
+
     app = QApplication(sys.argv)
+
+    # kill -USR1 <pid> -> ghi trace_<time>.json (khi TRACE=1)
+    # handler Python chỉ chạy khi interpreter lấy lại quyền, mà app.exec() nằm trong C++;
+    # set_wakeup_fd ghi số hiệu signal vào socket -> QSocketNotifier đánh thức event loop
+    # và dump chạy ở đó (gọi tracing.dump ngay trong handler có thể kẹt _buffers_lock)
+    if hasattr(signal, "SIGUSR1"):
+        rsock, wsock = socket.socketpair()
+        rsock.setblocking(False)
+        wsock.setblocking(False)
+        signal.set_wakeup_fd(wsock.fileno())
+        signal.signal(signal.SIGUSR1, lambda signum, frame: None)
+
+        def _dump_trace():
+            try:
+                signums = rsock.recv(64)
+            except OSError:
+                return
+            if signal.SIGUSR1 not in signums:
+                return
+            try:
+                tracing.dump(CSV_AUTO_DIR / f"trace_{datetime.now():%Y-%m-%d_%H-%M-%S}.json")
+            except Exception:
+                pass
+
+        notifier = QSocketNotifier(rsock.fileno(), QSocketNotifier.Type.Read)
+        notifier.activated.connect(_dump_trace)
+        app._trace_signal = (rsock, wsock, notifier)   # giữ tham chiếu suốt vòng đời app
+
     w = Dashboard()
     w.show()
     sys.exit(app.exec())
@@ -0,0 +1,288 @@
+"""
+Metrics runtime nhẹ (counter / gauge / histogram bucket cố định) + endpoint Prometheus text.
+
+    from .metrics import REGISTRY
+    I2C_ERRORS = REGISTRY.counter("adxl_i2c_errors_total", "I2C read errors", ("channel",))
+    I2C_ERRORS.labels(channel="1").inc()
+
+Mỗi series có lock riêng -> cập nhật từ nhiều thread an toàn, chi phí ~ 1 lần lấy lock.
+"""
+import bisect
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# bucket mặc định (giây) cho độ trễ: 0.5ms .. 10s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _fmt_labels(names, values, extra=()):
+    pairs = [f'{k}="{v}"' for k, v in zip(names, values)] + [f'{k}="{v}"' for k, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt_num(v) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+# ================= SERIES ==================
+class _CounterSeries:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+
+class _GaugeSeries:
+    __slots__ = ("_lock", "value", "fn")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+        self.fn = None
+
+    def set(self, v):
+        with self._lock:
+            self.value = v
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+    def dec(self, n=1):
+        with self._lock:
+            self.value -= n
+
+    def set_function(self, fn):
+        """Giá trị tính lúc scrape (vd. độ sâu buffer)."""
+        self.fn = fn
+
+    def get(self):
+        if self.fn is not None:
+            try:
+                return self.fn()
+            except Exception:
+                return float("nan")
+        return self.value
+
+
+class _HistogramSeries:
+    __slots__ = ("_lock", "bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self._lock = threading.Lock()
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)     # bucket cuối = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v):
+        i = bisect.bisect_left(self.bounds, v)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += v
+            self.count += 1
+
+    def quantile(self, q: float):
+        """Ước lượng quantile bằng nội suy tuyến tính trong bucket (như histogram_quantile)."""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return None
+        rank = q * total
+        acc = 0
+        for i, c in enumerate(counts):
+            if acc + c >= rank and c > 0:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                if i >= len(self.bounds):
+                    return lo
+                return lo + (self.bounds[i] - lo) * (rank - acc) / c
+            acc += c
+        return self.bounds[-1]
+
+
+# ================= METRIC FAMILIES ==================
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+        if not self.labelnames:
+            self._default = self._get(())
+
+    def _new(self):
+        raise NotImplementedError
+
+    def _get(self, key):
+        s = self._series.get(key)
+        if s is None:
+            with self._lock:
+                s = self._series.setdefault(key, self._new())
+        return s
+
+    def labels(self, **kw):
+        return self._get(tuple(str(kw[k]) for k in self.labelnames))
+
+    def series(self):
+        with self._lock:
+            return list(self._series.items())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new(self):
+        return _CounterSeries()
+
+    def inc(self, n=1):
+        self._default.inc(n)
+
+    def total(self):
+        return sum(s.value for _, s in self.series())
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new(self):
+        return _GaugeSeries()
+
+    def set(self, v):
+        self._default.set(v)
+
+    def inc(self, n=1):
+        self._default.inc(n)
+
+    def dec(self, n=1):
+        self._default.dec(n)
+
+    def set_function(self, fn):
+        self._default.set_function(fn)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new(self):
+        return _HistogramSeries(self.bounds)
+
+    def observe(self, v):
+        self._default.observe(v)
+
+    def quantile(self, q: float):
+        return self._default.quantile(q)
+
+
+# ================= REGISTRY ==================
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, cls, name, help, labelnames, **kw):
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = self._metrics[name] = cls(name, help, labelnames, **kw)
+            elif not isinstance(m, cls):
+                raise ValueError(f"metric {name} already registered as {m.kind}")
+            return m
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._register(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets=buckets)
+
+    def get(self, name: str):
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for key, s in m.series():
+                if m.kind == "counter":
+                    lines.append(f"{m.name}{_fmt_labels(m.labelnames, key)} {_fmt_num(s.value)}")
+                elif m.kind == "gauge":
+                    lines.append(f"{m.name}{_fmt_labels(m.labelnames, key)} {_fmt_num(s.get())}")
+                else:
+                    with s._lock:
+                        counts, total, ssum = list(s.counts), s.count, s.sum
+                    acc = 0
+                    for b, c in zip(m.bounds + (float("inf"),), counts):
+                        acc += c
+                        lines.append(f"{m.name}_bucket{_fmt_labels(m.labelnames, key, (('le', _fmt_num(b)),))} {acc}")
+                    lines.append(f"{m.name}_sum{_fmt_labels(m.labelnames, key)} {_fmt_num(ssum)}")
+                    lines.append(f"{m.name}_count{_fmt_labels(m.labelnames, key)} {total}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ================= SCRAPE ENDPOINT ==================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/trace":
+            # dump ring buffer tracing hiện tại (Chrome / Perfetto JSON)
+            from . import tracing
+            data = json.dumps(tracing.to_chrome_trace()).encode()
+            ctype = "application/json"
+        elif path in ("/metrics", "/"):
+            data = self.server.registry.render().encode()
+            ctype = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """GET /metrics -> REGISTRY.render(), GET /trace -> trace JSON; chạy ở thread nền."""
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9108, registry: Registry = REGISTRY):
+        super().__init__((host, port), _MetricsHandler)
+        self.registry = registry
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1 @@
+"""Xử lý tín hiệu ADXL theo block (features, ...)."""
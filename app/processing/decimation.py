@@ -0,0 +1,97 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# ================= FIR DESIGN ==================
+def design_lowpass(num_taps: int, cutoff_hz: float, fs_hz: float, beta: float = 6.0) -> np.ndarray:
+    """Low-pass FIR pha tuyến tính (windowed-sinc, cửa sổ Kaiser), hệ số DC = 1."""
+    n = np.arange(num_taps) - (num_taps - 1) / 2.0
+    fc = cutoff_hz / fs_hz
+    h = 2 * fc * np.sinc(2 * fc * n) * np.kaiser(num_taps, beta)
+    return h / h.sum()
+
+
+# ================= DECIMATOR ==================
+class Decimator:
+    """
+    Hạ tần số lấy mẫu theo hệ số nguyên, lọc chống alias trước khi bỏ mẫu.
+    Dạng polyphase: chỉ tính các mẫu ra được giữ lại (1/factor), mỗi mẫu là 1 tích
+    vô hướng với FIR, cả block tính một lần (vector hoá).
+    Giữ num_taps-1 mẫu cuối + pha giữa các block -> nối block liền mạch.
+    Mẫu NaN (gap) được giữ bằng mẫu hợp lệ trước đó khi lọc; nếu phần trọng số |tap| rơi vào gap
+    vượt max_gap_weight thì mẫu ra là NaN (lỗi I2C lẻ tẻ không xoá cả luồng đã hạ tần số).
+    """
+    def __init__(self, fs_in_hz: float, fs_out_hz: float, n_channels: int = 3,
+                 taps_per_phase: int = 16, passband: float = 0.8, max_gap_weight: float = 0.1):
+        ratio = float(fs_in_hz) / float(fs_out_hz)
+        factor = int(round(ratio))
+        if factor < 1 or abs(ratio - factor) > 1e-9:
+            raise ValueError(f"fs_in_hz / fs_out_hz must be an integer ({fs_in_hz} / {fs_out_hz})")
+        self.fs_in_hz = float(fs_in_hz)
+        self.fs_out_hz = float(fs_out_hz)
+        self.factor = factor
+
+        if factor == 1:
+            self.taps = np.ones(1)
+        else:
+            # cắt ở passband * Nyquist mới
+            num_taps = taps_per_phase * factor + 1
+            self.taps = design_lowpass(num_taps, passband * self.fs_out_hz / 2.0, self.fs_in_hz)
+        self._rtaps = self.taps[::-1].copy()
+        self.delay = (len(self.taps) - 1) / 2.0     # trễ nhóm (mẫu vào), pha tuyến tính
+        self._rabs = np.abs(self._rtaps) / np.abs(self._rtaps).sum()
+        self.max_gap_weight = float(max_gap_weight)
+        L = len(self.taps)
+        self._state = np.zeros((L - 1, n_channels))
+        self._gap_state = np.zeros((L - 1, n_channels), dtype=bool)
+        self._last = np.zeros(n_channels)
+        self._phase = 0      # chỉ số (trong block tới) của mẫu vào ứng với mẫu ra kế tiếp
+
+    def reset(self, start_index: int = 0):
+        """start_index: chỉ số mẫu vào kế tiếp -> mẫu ra luôn rơi vào các chỉ số chia hết cho factor."""
+        self._state[:] = 0.0
+        self._gap_state[:] = False
+        self._last[:] = 0.0
+        self._phase = -int(start_index) % self.factor
+
+    def next_output(self, block_start: int) -> int:
+        """Chỉ số mẫu vào (chưa trừ trễ nhóm) của mẫu ra đầu tiên nếu block kế tiếp bắt đầu ở block_start."""
+        return int(block_start) + self._phase
+
+    def process(self, block) -> np.ndarray:
+        """block: (n, C) -> (m, C) float ở fs_out_hz."""
+        x = np.asarray(block, dtype=np.float64)
+        if self.factor == 1:
+            return x
+        n = x.shape[0]
+        L = len(self.taps)
+        gap = np.isnan(x)
+        if gap.any():
+            # giữ mẫu hợp lệ gần nhất (forward fill theo trục mẫu, nối tiếp block trước)
+            last = np.where(gap, -1, np.arange(n)[:, None])
+            np.maximum.accumulate(last, axis=0, out=last)
+            x = np.where(last < 0, self._last, np.take_along_axis(x, np.maximum(last, 0), axis=0))
+        if n:
+            self._last = x[-1].copy()
+        buf = np.vstack((self._state, x))
+        gbuf = np.vstack((self._gap_state, gap))
+        idx = np.arange(self._phase, n, self.factor)
+        if idx.size:
+            win = sliding_window_view(buf, L, axis=0)[idx]        # (m, C, L), kết thúc tại mẫu idx
+            y = win @ self._rtaps
+            if gbuf.any():
+                gwin = sliding_window_view(gbuf, L, axis=0)[idx].astype(np.float64)
+                y[gwin @ self._rabs > self.max_gap_weight] = np.nan
+        else:
+            y = np.empty((0, x.shape[1]))
+        self._phase = int(idx[-1] + self.factor - n) if idx.size else self._phase - n
+        self._state = buf[-(L - 1):]
+        self._gap_state = gbuf[-(L - 1):]
+        return y
+
+
+def make_decimator(fs_in_hz: float, fs_out_hz, n_channels: int = 3):
+    """None nếu không cần hạ tần số (fs_out_hz None hoặc bằng fs_in_hz)."""
+    if fs_out_hz is None or float(fs_out_hz) >= float(fs_in_hz):
+        return None
+    return Decimator(fs_in_hz, fs_out_hz, n_channels)
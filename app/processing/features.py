@@ -0,0 +1,215 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .. import tracing
+from ..metrics import REGISTRY
+
+FEATURE_WINDOWS = REGISTRY.counter("features_windows_total", "Feature windows computed")
+PENDING_BLOCKS = REGISTRY.gauge("processing_pending_blocks", "Blocks queued for a processing stage", ("stage",))
+
+
+# ================= FEATURE PLAN ==================
+class FeaturePlan:
+    """
+    Tính sẵn mọi thứ không đổi giữa các cửa sổ: Hann window + hệ số chuẩn hoá Welch,
+    trục tần số rfft, chỉ số bin cho từng band. Mỗi cửa sổ chỉ còn lại phép tính vector.
+    """
+    def __init__(self, fs_hz: float, window: int = 1024, nperseg: int = 256,
+                 bands_hz=((0.5, 5), (5, 20), (20, 50), (50, 100), (100, 250)), top_k: int = 3):
+        if nperseg > window:
+            raise ValueError("nperseg must be <= window")
+        self.fs_hz = float(fs_hz)
+        self.window = int(window)
+        self.nperseg = int(nperseg)
+        self.seg_hop = self.nperseg // 2          # Welch 50% overlap
+        self.top_k = int(top_k)
+
+        self.taper = np.hanning(self.nperseg)
+        # PSD một phía (density): |X|^2 / (fs * sum(w^2)), nhân đôi trừ DC / Nyquist
+        scale = np.full(self.nperseg // 2 + 1, 2.0 / (self.fs_hz * np.sum(self.taper ** 2)))
+        scale[0] /= 2.0
+        if self.nperseg % 2 == 0:
+            scale[-1] /= 2.0
+        self.psd_scale = scale
+        self.freqs = np.fft.rfftfreq(self.nperseg, d=1.0 / self.fs_hz)
+        self.df = self.freqs[1] - self.freqs[0]
+
+        self.bands_hz = tuple((float(lo), float(hi)) for lo, hi in bands_hz)
+        # ma trận (n_band x n_bin) để tính mọi band bằng 1 phép nhân
+        self.band_matrix = np.array(
+            [(self.freqs >= lo) & (self.freqs < hi) for lo, hi in self.bands_hz], dtype=np.float64
+        ) * self.df
+
+    def welch(self, x: np.ndarray) -> np.ndarray:
+        """x: (N, C) -> PSD (C, n_bin), trung bình các đoạn Hann chồng 50%."""
+        seg = sliding_window_view(x, self.nperseg, axis=0)[::self.seg_hop]    # (n_seg, C, nperseg)
+        seg = seg - seg.mean(axis=-1, keepdims=True)
+        spec = np.fft.rfft(seg * self.taper, axis=-1)
+        return (spec.real ** 2 + spec.imag ** 2).mean(axis=0) * self.psd_scale
+
+
+def compute_features(plan: FeaturePlan, x: np.ndarray) -> dict:
+    """
+    Đặc trưng của 1 cửa sổ x (N, C) cho tất cả kênh cùng lúc.
+    Trả về dict các mảng theo kênh (đã bỏ thành phần DC).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    ac = x - x.mean(axis=0)
+
+    m2 = np.mean(ac ** 2, axis=0)
+    rms = np.sqrt(m2)
+    peak = np.max(np.abs(ac), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        crest = np.where(rms > 0, peak / rms, 0.0)
+        kurt = np.where(m2 > 0, np.mean(ac ** 4, axis=0) / (m2 ** 2), 0.0)
+
+    psd = plan.welch(x)                                  # (C, n_bin)
+    band_power = psd @ plan.band_matrix.T                # (C, n_band)
+
+    # đỉnh phổ: cực đại địa phương (bỏ DC), lấy top-k theo công suất
+    inner = psd[:, 1:-1]
+    is_peak = (inner > psd[:, :-2]) & (inner >= psd[:, 2:])
+    cand = np.where(is_peak, inner, -np.inf)
+    k = min(plan.top_k, cand.shape[1])
+    idx = np.argsort(cand, axis=1)[:, ::-1][:, :k]
+    pk_pow = np.take_along_axis(cand, idx, axis=1)
+    pk_freq = plan.freqs[idx + 1]
+
+    return {
+        "rms": rms,
+        "p2p": np.ptp(x, axis=0),
+        "crest": crest,
+        "kurtosis": kurt,
+        "band_power": band_power,
+        "peak_freq": np.where(np.isfinite(pk_pow), pk_freq, np.nan),
+        "peak_power": np.where(np.isfinite(pk_pow), pk_pow, np.nan),
+    }
+
+
+def _r(a, nd=5):
+    """Mảng -> list số tròn, NaN -> None (JSON gọn)."""
+    a = np.round(np.asarray(a, dtype=np.float64), nd)
+    return np.where(np.isnan(a), None, a).tolist()
+
+
+# ================= VIBRATION ANALYZER THREAD ==================
+class VibrationAnalyzer(threading.Thread):
+    """
+    Nhận block mẫu ADXL (push_block) từ ADXLLogger, cắt cửa sổ chồng nhau
+    và tính đặc trưng (RMS, p2p, crest, kurtosis, Welch band power, top-k peaks).
+    Kết quả:
+    - get_latest() cho UI
+    - realtime_sender.push_features(msg) (type "adxl_features") nếu có sender
+    - ghi 1 dòng JSON / cửa sổ vào log_path (nếu có)
+    Chạy ở thread riêng để không làm chậm vòng lặp 500Hz.
+    Kênh có gap (NaN) trong cửa sổ -> đặc trưng của kênh đó là NaN (null trong JSON).
+    """
+    def __init__(self, fs_hz: float, window: int = 1024, overlap: float = 0.5,
+                 nperseg: int = 256, bands_hz=((0.5, 5), (5, 20), (20, 50), (50, 100), (100, 250)),
+                 top_k: int = 3, scale: float = 1.0, channels=("Z1", "Z2", "Z3"),
+                 realtime_sender=None, log_path: Path = None):
+        super().__init__(daemon=True)
+        self.plan = FeaturePlan(fs_hz, window, nperseg, bands_hz, top_k)
+        self.hop = max(1, int(round(self.plan.window * (1.0 - float(overlap)))))
+        self.scale = float(scale)   # counts -> đơn vị vật lý (g)
+        self.channels = tuple(channels)
+        self.realtime_sender = realtime_sender
+        self.log_path = log_path
+
+        self._running = True
+        self._lock = threading.Lock()
+        self._pending = []      # list[np.ndarray (n, C)]
+        self._residual = np.empty((0, len(self.channels)))
+        self._res_index = 0     # chỉ số mẫu đầu tiên của _residual
+        self._stamp = None      # BlockStamp gần nhất (chỉ số -> thời gian thực)
+        self._latest = None     # dict features gần nhất
+        PENDING_BLOCKS.labels(stage="features").set_function(lambda: len(self._pending))
+
+    def stop(self):
+        self._running = False
+
+    def push_block(self, block, stamp=None):
+        # gọi từ thread đọc sensor -> chỉ append
+        with self._lock:
+            self._pending.append((block, stamp))
+
+    def get_latest(self):
+        with self._lock:
+            return self._latest
+
+    def _to_message(self, feats: dict, start_index: int) -> dict:
+        return {
+            "fs_hz": self.plan.fs_hz,
+            "n": self.plan.window,
+            "start_index": start_index,
+            "t_us": None if self._stamp is None else self._stamp.time_us(start_index),
+            "channels": list(self.channels),
+            "rms": _r(feats["rms"]),
+            "p2p": _r(feats["p2p"]),
+            "crest": _r(feats["crest"], 3),
+            "kurtosis": _r(feats["kurtosis"], 3),
+            "bands_hz": [list(b) for b in self.plan.bands_hz],
+            "band_power": _r(feats["band_power"], 8),
+            "peak_freq": _r(feats["peak_freq"], 2),
+            "peak_power": _r(feats["peak_power"], 8),
+        }
+
+    def process(self, samples: np.ndarray, stamp=None):
+        """
+        Xử lý đồng bộ (dùng cho run() và cho script/benchmark).
+        stamp: BlockStamp của samples[0]; chỉ số không nối tiếp phần dư -> bỏ phần dư (cửa sổ không vắt qua chỗ đứt).
+        """
+        if stamp is not None:
+            if stamp.index != self._res_index + len(self._residual):
+                self._residual = self._residual[:0]
+            if not self._residual.size:
+                self._res_index = stamp.index
+            self._stamp = stamp
+        buf = np.concatenate((self._residual, samples * self.scale)) if self._residual.size else samples * self.scale
+        w = self.plan.window
+        start = 0
+        while start + w <= len(buf):
+            with tracing.span("features"):
+                feats = compute_features(self.plan, buf[start:start + w])
+            win_start = self._res_index + start
+            start += self.hop
+            FEATURE_WINDOWS.inc()
+            msg = self._to_message(feats, win_start)
+            with self._lock:
+                self._latest = feats
+            if self.realtime_sender is not None:
+                try:
+                    self.realtime_sender.push_features(msg, msg["t_us"])
+                except Exception:
+                    pass
+            if self.log_path is not None:
+                try:
+                    with open(self.log_path, "a") as f:
+                        f.write(json.dumps(msg) + "\n")
+                except Exception:
+                    pass
+        self._residual = buf[start:]
+        self._res_index += start
+
+    def _drain(self) -> int:
+        with self._lock:
+            blocks, self._pending = self._pending, []
+        for block, stamp in blocks:
+            try:
+                self.process(np.asarray(block, dtype=np.float64), stamp)
+            except Exception:
+                # bỏ qua block lỗi, không dừng thread
+                self._residual = np.empty((0, len(self.channels)))
+        return len(blocks)
+
+    def run(self):
+        while self._running:
+            if not self._drain():
+                time.sleep(0.01)
+        # stop(): xử lý nốt block đã nhận trước khi thoát
+        self._drain()
@@ -0,0 +1,292 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .. import tracing
+from ..metrics import REGISTRY
+from ..sensors.rows import int_rows
+from .features import PENDING_BLOCKS
+
+TRIGGER_EVENTS = REGISTRY.counter("trigger_events_total", "Trigger events emitted")
+
+
+# ================= DETECTORS ==================
+def _hysteresis(on: np.ndarray, off: np.ndarray, state0: np.ndarray) -> np.ndarray:
+    """
+    Trạng thái bật/tắt có trễ, vector hoá theo trục 0 (mẫu).
+    on/off: (n, C) bool, state0: (C,) trạng thái trước block. Ưu tiên `on` nếu cả hai cùng True.
+    """
+    n = on.shape[0]
+    idx = np.arange(1, n + 1)[:, None]
+    changed = on | off
+    # chỉ số mẫu gần nhất có thay đổi (0 = chưa có -> dùng state0)
+    last = np.maximum.accumulate(np.where(changed, idx, 0), axis=0)
+    val = np.take_along_axis(np.vstack((state0[None, :], on)), last, axis=0)
+    return val.astype(bool)
+
+
+class StaLtaDetector:
+    """
+    STA/LTA cổ điển trên năng lượng (x - DC)^2, tính bằng cumsum trên (đuôi LTA + block).
+    Bật khi ratio > on_ratio, tắt khi ratio < off_ratio.
+    """
+    def __init__(self, n_channels: int, nsta: int, nlta: int, on_ratio: float, off_ratio: float):
+        if nsta >= nlta:
+            raise ValueError("nsta must be < nlta")
+        self.nsta = int(nsta)
+        self.nlta = int(nlta)
+        self.on_ratio = float(on_ratio)
+        self.off_ratio = float(off_ratio)
+        self._tail = np.empty((0, n_channels))   # năng lượng nlta mẫu gần nhất
+        self._state = np.zeros(n_channels, dtype=bool)
+
+    def update(self, ac: np.ndarray):
+        """ac: (n, C) tín hiệu đã bỏ DC -> (active (n, C), ratio (n, C))."""
+        e = np.vstack((self._tail, ac ** 2))
+        c = np.concatenate((np.zeros((1, e.shape[1])), np.cumsum(e, axis=0)))
+        n = ac.shape[0]
+        end = np.arange(e.shape[0] - n + 1, e.shape[0] + 1)      # chỉ số kết thúc (exclusive) trong c
+        sta = (c[end] - c[np.maximum(end - self.nsta, 0)]) / self.nsta
+        lta = (c[end] - c[np.maximum(end - self.nlta, 0)]) / self.nlta
+        ready = (end >= self.nlta)[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.where(ready & (lta > 0), sta / lta, 0.0)
+        active = _hysteresis(ratio > self.on_ratio, ratio < self.off_ratio, self._state)
+        self._state = active[-1]
+        self._tail = e[-self.nlta:]
+        return active, ratio
+
+
+class ThresholdDetector:
+    """|x - DC| vượt ngưỡng riêng từng kênh."""
+    def __init__(self, levels):
+        self.levels = np.asarray(levels, dtype=np.float64)
+
+    def update(self, ac: np.ndarray):
+        mag = np.abs(ac)
+        return mag > self.levels, mag
+
+
+# ================= TRIGGER ENGINE ==================
+class TriggerEngine(threading.Thread):
+    """
+    Nhận block mẫu ADXL (push_block), chạy detector ngưỡng + STA/LTA theo từng kênh.
+    Khi detector bật: cắt event gồm pre_s giây trước trigger và post_s giây sau lần
+    kích hoạt cuối (trigger lại trong lúc event đang mở -> gộp vào cùng event),
+    tối đa max_event_s giây / event.
+    Event record (dict) được:
+    - realtime_sender.push_event(record) (type "adxl_event")
+    - ghi 1 dòng JSON vào event_log_path (nếu có)
+    """
+    def __init__(self, fs_hz: float, channels=("Z1", "Z2", "Z3"), scale: float = 1.0,
+                 level=None, sta_s: float = 0.05, lta_s: float = 5.0,
+                 on_ratio: float = 4.0, off_ratio: float = 1.5,
+                 pre_s: float = 0.5, post_s: float = 1.0, max_event_s: float = 10.0,
+                 dc_alpha: float = 0.01, realtime_sender=None, event_log_path: Path = None):
+        super().__init__(daemon=True)
+        self.fs_hz = float(fs_hz)
+        self.channels = tuple(channels)
+        self.scale = float(scale)                 # counts -> g (ngưỡng tính theo g)
+        C = len(self.channels)
+
+        self.detectors = []
+        if level is not None:
+            self.detectors.append(("threshold", ThresholdDetector(np.broadcast_to(level, (C,)))))
+        if sta_s and lta_s:
+            self.detectors.append(("sta_lta", StaLtaDetector(
+                C, max(1, int(sta_s * self.fs_hz)), int(lta_s * self.fs_hz), on_ratio, off_ratio)))
+
+        self.pre_n = int(pre_s * self.fs_hz)
+        self.post_n = int(post_s * self.fs_hz)
+        self.max_n = int(max_event_s * self.fs_hz)
+        self.dc_alpha = float(dc_alpha)
+
+        self.realtime_sender = realtime_sender
+        self.event_log_path = event_log_path
+
+        self._running = True
+        self._lock = threading.Lock()
+        self._pending = []
+
+        self._n = 0                                # chỉ số mẫu toàn cục kế tiếp (theo BlockStamp nếu có)
+        self._stamp = None                         # BlockStamp gần nhất: chỉ số -> thời gian thực
+        self._dc = None                            # DC từng kênh (trung bình trượt theo block)
+        self._recent = np.empty((0, C), dtype=np.int32)   # pre-trigger buffer
+        self._event = None                         # event đang mở
+        self._last_end = 0                         # end của event trước (event không chồng nhau)
+        self._prev_active = False
+        self._event_seq = 0
+        self.events_emitted = 0
+        PENDING_BLOCKS.labels(stage="triggers").set_function(lambda: len(self._pending))
+
+    def stop(self):
+        self._running = False
+
+    def push_block(self, block, stamp=None):
+        with self._lock:
+            self._pending.append((block, stamp))
+
+    # ---- event state ----
+    def _open(self, trig_idx: int, buf_start: int, buf: np.ndarray, hits):
+        start = max(trig_idx - self.pre_n, buf_start, self._last_end)
+        self._event_seq += 1
+        self._event = {
+            "start": start,
+            "trigger": trig_idx,
+            "end": trig_idx + 1 + self.post_n,
+            "parts": [buf[start - buf_start:trig_idx - buf_start]],
+            "filled": trig_idx,
+            "triggers": hits,
+            "retriggers": 0,
+        }
+
+    def _close(self):
+        ev = self._event
+        self._event = None
+        self._last_end = ev["end"]
+        samples = np.concatenate(ev["parts"])
+        record = {
+            "event_id": self._event_seq,
+            "fs_hz": self.fs_hz,
+            "channels": list(self.channels),
+            "start_index": ev["start"],
+            "trigger_index": ev["trigger"],
+            "end_index": ev["end"],
+            "start_us": self._time_us(ev["start"]),
+            "trigger_us": self._time_us(ev["trigger"]),
+            "pre_samples": ev["trigger"] - ev["start"],
+            "retriggers": ev["retriggers"],
+            "triggers": ev["triggers"],
+            "samples": int_rows(samples),
+        }
+        self.events_emitted += 1
+        TRIGGER_EVENTS.inc()
+        if self.realtime_sender is not None:
+            try:
+                self.realtime_sender.push_event(record, record["trigger_us"])
+            except Exception:
+                pass
+        if self.event_log_path is not None:
+            try:
+                with open(self.event_log_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+            except Exception:
+                pass
+
+    def _hits(self, i: int, per_det):
+        """Danh sách detector/kênh đang bật tại mẫu i (chỉ số trong block)."""
+        out = []
+        for name, active, value in per_det:
+            for c in np.flatnonzero(active[i]):
+                out.append({"detector": name, "channel": self.channels[c],
+                            "value": round(float(value[i, c]), 5)})
+        return out
+
+    def _time_us(self, i: int):
+        return None if self._stamp is None else self._stamp.time_us(i)
+
+    def process(self, block: np.ndarray, stamp=None):
+        """Xử lý đồng bộ 1 block (n, C) counts; stamp: BlockStamp của block[0]."""
+        if stamp is not None:
+            if stamp.index != self._n:
+                # trục thời gian đứt (tick bị bỏ không điền gap): đóng event dở, bỏ pre-trigger buffer
+                if self._event is not None:
+                    self._event["end"] = self._event["filled"]
+                    self._close()
+                self._recent = self._recent[:0]
+                self._n = self._last_end = stamp.index
+            self._stamp = stamp
+        block = np.asarray(block)
+        n = block.shape[0]
+        x = block.astype(np.float64) * self.scale
+        # gap (mẫu lỗi I2C, NaN): bỏ khỏi trung bình DC, detector thấy 0 -> không kích hoạt
+        gap = np.isnan(x)
+        cnt = n - gap.sum(axis=0)
+        mean = np.where(cnt > 0, np.where(gap, 0.0, x).sum(axis=0) / np.maximum(cnt, 1), np.nan)
+        if self._dc is None:
+            self._dc = mean
+        ac = np.nan_to_num(x - self._dc)
+        self._dc = np.where(np.isnan(self._dc), mean,
+                            np.where(cnt > 0, self._dc + self.dc_alpha * (mean - self._dc), self._dc))
+
+        per_det = []
+        any_active = np.zeros(n, dtype=bool)
+        for name, det in self.detectors:
+            active, value = det.update(ac)
+            per_det.append((name, active, value))
+            any_active |= active.any(axis=1)
+        rise = any_active & ~np.concatenate(([self._prev_active], any_active[:-1]))
+        if n:
+            self._prev_active = bool(any_active[-1])
+
+        b0 = self._n
+        buf_start = b0 - len(self._recent)
+        buf = np.vstack((self._recent, block))
+        act = b0 + np.flatnonzero(any_active)      # chỉ số mẫu toàn cục đang kích hoạt
+        pos = b0                                    # mẫu đầu tiên chưa xét
+
+        while True:
+            if self._event is None:
+                k = np.searchsorted(act, pos)
+                if k >= len(act):
+                    break
+                g = int(act[k])
+                self._open(g, buf_start, buf, self._hits(g - b0, per_det))
+                pos = g
+
+            ev = self._event
+            limit = ev["start"] + self.max_n
+            later = act[(act >= pos) & (act < limit)]
+            # chuỗi kích hoạt nối tiếp: khoảng cách <= post + pre thì cửa sổ chồng nhau -> gộp
+            if later.size and later[0] < ev["end"] + self.pre_n:
+                brk = np.flatnonzero(np.diff(later) > self.post_n + self.pre_n)
+                chain = later[:brk[0] + 1] if brk.size else later
+                ev["end"] = min(max(ev["end"], int(chain[-1]) + 1 + self.post_n), limit)
+                ev["retriggers"] += int(np.count_nonzero(rise[chain - b0] & (chain != ev["trigger"])))
+
+            take_to = min(b0 + n, ev["end"])
+            if take_to > ev["filled"]:
+                ev["parts"].append(buf[ev["filled"] - buf_start:take_to - buf_start])
+                ev["filled"] = take_to
+
+            # chờ thêm pre_n mẫu sau end để biết có cần gộp không (trừ khi đã chạm max)
+            decide = ev["end"] if ev["end"] >= limit else ev["end"] + self.pre_n
+            if b0 + n < decide:
+                break
+            pos = max(pos, ev["end"])
+            self._close()
+
+        self._n = b0 + n
+        self._recent = buf[-self.pre_n:] if self.pre_n > 0 else buf[:0]
+
+    def flush(self):
+        """Đóng event đang mở, cắt ở mẫu cuối đã nhận (gọi khi dừng)."""
+        if self._event is not None:
+            self._event["end"] = self._event["filled"]
+            self._close()
+
+    def _drain(self) -> int:
+        with self._lock:
+            blocks, self._pending = self._pending, []
+        for b, stamp in blocks:
+            try:
+                with tracing.span("triggers"):
+                    self.process(b, stamp)
+            except Exception:
+                # lỗi xử lý 1 block: bỏ event đang mở, tiếp tục
+                self._event = None
+        return len(blocks)
+
+    def run(self):
+        while self._running:
+            if not self._drain():
+                time.sleep(0.01)
+        # stop(): xử lý nốt block đã nhận (kể cả block dở logger xả khi dừng) rồi phát event dở
+        self._drain()
+        try:
+            self.flush()
+        except Exception:
+            pass
@@ -1,22 +1,46 @@
 import threading
 import time
-from datetime import datetime
+from collections import deque
 
 import requests
 
+from . import tracing
+from .metrics import REGISTRY
+from .sensors.rows import int_rows
+from .timebase import BlockStamp, now_us, utc_iso
+
+UPLOAD_REQUESTS = REGISTRY.counter("upload_requests_total", "POST /ingest by message type and HTTP status (or exception)",
+                                   ("type", "status"))
+UPLOAD_LATENCY = REGISTRY.histogram("upload_latency_seconds", "POST /ingest round-trip time", ("type",))
+UPLOAD_DROPPED = REGISTRY.counter("upload_dropped_samples_total", "ADXL samples in batches that failed to upload")
+UPLOAD_BACKLOG = REGISTRY.gauge("upload_backlog", "Items waiting in RealtimeSender", ("queue",))
+
 
 # ================= REALTIME SENDER (ADD) ==================
 class RealtimeSender(threading.Thread):
     """
     - RS485: gửi mỗi 1s (mỗi lần read_all gọi push_rs485)
-    - ADXL: nhận từng mẫu 500Hz (push_adxl_sample) rồi gửi theo batch (ADXL_BATCH_SIZE)
+    - ADXL: nhận từng mẫu (push_adxl_sample) hoặc cả block (push_adxl_block)
+      ở tần số adxl_fs_hz rồi gửi theo batch (ADXL_BATCH_SIZE)
+    - ADXL features: mỗi cửa sổ phân tích (push_features) -> type "adxl_features"
+    - ADXL event: mỗi event trigger (push_event) -> type "adxl_event"
     Endpoint: POST {SERVER_URL}/ingest
     Header: X-API-Key: API_KEY
+    "ts" là thời điểm đo (không phải lúc gửi), "sent_us" là lúc gửi (epoch µs).
+    session (tên phiên log, vd. "2024-05-01_08-00-00") + chunk_start_index / seq xác định duy nhất
+    từng mẫu -> server bỏ được bản trùng khi upload lại (app/tools/replay.py).
+    retries: số lần thử lại message lỗi trước khi bỏ (0 = như cũ); on_result(body, ok) sau mỗi message.
+    Batch ADXL chỉ gồm mẫu liên tục: chunk_start_index (chỉ số mẫu ở fs_hz) + chunk_start_us
+    lấy từ BlockStamp của ADXLLogger; block không có stamp được nối tiếp theo adxl_fs_hz.
     """
     def __init__(self, server_url: str, api_key: str, device_id: str,
                  timeout: float = 2.0,
                  adxl_batch_size: int = 50,
-                 adxl_flush_interval_s: float = 0.15):
+                 adxl_flush_interval_s: float = 0.15,
+                 adxl_fs_hz: float = 500.0,
+                 session: str = None,
+                 retries: int = 0,
+                 on_result=None):
         super().__init__(daemon=True)
         self.server_url = server_url.rstrip("/")
         self.api_key = api_key
@@ -25,37 +49,144 @@ class RealtimeSender(threading.Thread):
 
         self.adxl_batch_size = int(adxl_batch_size)
         self.adxl_flush_interval_s = float(adxl_flush_interval_s)
+        self.adxl_fs_hz = float(adxl_fs_hz)
+        self.session = session
+        self.retries = int(retries)
+        self.on_result = on_result
 
         self._running = True
         self._lock = threading.Lock()
 
-        self._rs485_buf = []   # list[dict]
+        self._rs485_buf = []   # list[(t_us, dict, seq)]
         self._adxl_buf = []    # list[[z1, z2, z3]]
+        self._adxl_meta = deque()   # [BlockStamp, n] cho các đoạn của _adxl_buf
+        self._adxl_next = None      # stamp nối tiếp cho block không có stamp
+        self._feat_buf = []    # list[(t_us, dict)] (VibrationAnalyzer)
+        self._event_buf = []   # list[(t_us, dict)] (TriggerEngine)
         self._adxl_last_flush = time.time()
+        self._inflight = 0     # message đã lấy khỏi buffer, đang gửi
 
         self._sess = requests.Session()
         self._headers = {"X-API-Key": self.api_key}
 
+        UPLOAD_BACKLOG.labels(queue="rs485").set_function(lambda: len(self._rs485_buf))
+        UPLOAD_BACKLOG.labels(queue="adxl").set_function(lambda: len(self._adxl_buf))
+        UPLOAD_BACKLOG.labels(queue="features").set_function(lambda: len(self._feat_buf))
+        UPLOAD_BACKLOG.labels(queue="events").set_function(lambda: len(self._event_buf))
+
     def stop(self):
         self._running = False
 
-    def push_rs485(self, sample: dict):
-        # ít dữ liệu -> buffer list là đủ
+    def push_rs485(self, sample: dict, t_us: int = None, seq: int = None):
+        # ít dữ liệu -> buffer list là đủ; t_us = lúc đọc (mặc định: bây giờ), seq = số hàng trong log phiên
         with self._lock:
-            self._rs485_buf.append(sample)
+            self._rs485_buf.append((now_us() if t_us is None else t_us, sample, seq))
 
     def push_adxl_sample(self, z1: int, z2: int, z3: int):
         # 500Hz -> chỉ append, không network tại thread đọc sensor
+        self.push_adxl_block([[int(z1), int(z2), int(z3)]])
+
+    def push_adxl_block(self, block, stamp: BlockStamp = None):
+        # block (n, 3) đã ở adxl_fs_hz; gap (NaN) -> null
+        rows = int_rows(block)
+        if not rows:
+            return
+        with self._lock:
+            if stamp is None:
+                # không có timebase: nối tiếp đoạn trước nếu khớp giờ (±1s), không thì neo mẫu cuối vào lúc push
+                t_first = now_us() - int((len(rows) - 1) * 1e6 / self.adxl_fs_hz)
+                stamp = self._adxl_next
+                if stamp is None or abs(stamp.t_us - t_first) > 1e6:
+                    stamp = BlockStamp(0 if stamp is None else stamp.index, t_first, self.adxl_fs_hz)
+            self._adxl_buf.extend(rows)
+            self._adxl_meta.append([stamp, len(rows)])
+            self._adxl_next = stamp.shifted(len(rows))
+
+    def push_features(self, features: dict, t_us: int = None):
+        # ~1 message/s -> buffer list là đủ; t_us = đầu cửa sổ
         with self._lock:
-            self._adxl_buf.append([int(z1), int(z2), int(z3)])
+            self._feat_buf.append((now_us() if t_us is None else t_us, features))
+
+    def push_event(self, event: dict, t_us: int = None):
+        # t_us = thời điểm trigger
+        with self._lock:
+            self._event_buf.append((now_us() if t_us is None else t_us, event))
+
+    def _take_adxl(self):
+        """Lấy tối đa adxl_batch_size mẫu liên tục (cùng fs, chỉ số và giờ nối tiếp) -> (stamp, rows)."""
+        first = self._adxl_meta[0][0]
+        take = 0
+        while self._adxl_meta and take < self.adxl_batch_size:
+            m = self._adxl_meta[0]
+            if take and (m[0].index != first.index + take or m[0].fs_hz != first.fs_hz
+                         or abs(m[0].t_us - first.time_us(m[0].index)) > 5e5 / first.fs_hz):
+                # đứt chỉ số / đổi tần số / neo giờ nhảy (NTP step) -> batch mới
+                break
+            k = min(m[1], self.adxl_batch_size - take)
+            take += k
+            if k == m[1]:
+                self._adxl_meta.popleft()
+            else:
+                m[0], m[1] = m[0].shifted(k), m[1] - k
+        rows = self._adxl_buf[:take]
+        del self._adxl_buf[:take]
+        return first, rows
+
+    def adxl_backlog(self) -> int:
+        """Số mẫu ADXL đang chờ gửi."""
+        with self._lock:
+            return len(self._adxl_buf)
+
+    def pending(self) -> int:
+        """Tổng số mục chưa gửi xong (mẫu ADXL + message khác + message đang gửi)."""
+        with self._lock:
+            return (len(self._adxl_buf) + len(self._rs485_buf) + len(self._feat_buf) + len(self._event_buf)
+                    + self._inflight)
 
     def _post(self, body: dict):
-        self._sess.post(
-            f"{self.server_url}/ingest",
-            json=body,
-            headers=self._headers,
-            timeout=self.timeout
-        )
+        kind = body.get("type", "")
+        t0 = time.perf_counter()
+        try:
+            with tracing.span("http_post", type=kind):
+                resp = self._sess.post(
+                    f"{self.server_url}/ingest",
+                    json=body,
+                    headers=self._headers,
+                    timeout=self.timeout
+                )
+        except Exception as ex:
+            UPLOAD_REQUESTS.labels(type=kind, status=type(ex).__name__).inc()
+            raise
+        finally:
+            UPLOAD_LATENCY.labels(type=kind).observe(time.perf_counter() - t0)
+        UPLOAD_REQUESTS.labels(type=kind, status=resp.status_code).inc()
+        return resp
+
+    def _send(self, body: dict) -> bool:
+        """POST 1 message, thử lại tối đa `retries` lần (lỗi mạng / 5xx / 429); báo kết quả qua on_result."""
+        if self.session is not None:
+            body["session"] = self.session
+        delay = 0.5
+        for attempt in range(self.retries + 1):
+            body["sent_us"] = now_us()
+            try:
+                status = self._post(body).status_code
+            except Exception:
+                status = None
+            ok = status is not None and status < 300
+            retryable = status is None or status >= 500 or status == 429
+            if ok or not retryable or attempt == self.retries or not self._running:
+                break
+            time.sleep(delay)
+            delay = min(2 * delay, 5.0)
+        if self.on_result is not None:
+            try:
+                self.on_result(body, ok)
+            except Exception:
+                pass
+        with self._lock:
+            self._inflight -= 1
+        return ok
 
     def run(self):
         while self._running:
@@ -64,18 +195,19 @@ class RealtimeSender(threading.Thread):
             with self._lock:
                 if self._rs485_buf:
                     rs_item = self._rs485_buf.pop(0)
+                    self._inflight += 1
 
             if rs_item is not None:
+                t_us, sample, seq = rs_item
                 body = {
                     "device_id": self.device_id,
-                    "ts": datetime.utcnow().isoformat() + "Z",
+                    "ts": utc_iso(t_us),
                     "type": "rs485",
-                    "sample": rs_item
+                    "sample": sample
                 }
-                try:
-                    self._post(body)
-                except Exception:
-                    pass
+                if seq is not None:
+                    body["seq"] = seq
+                self._send(body)
 
             # ---- 2) flush ADXL batch ----
             now = time.time()
@@ -84,23 +216,52 @@ class RealtimeSender(threading.Thread):
                 need_flush = (len(self._adxl_buf) >= self.adxl_batch_size) or \
                              ((now - self._adxl_last_flush) >= self.adxl_flush_interval_s and len(self._adxl_buf) > 0)
                 if need_flush:
-                    take = min(self.adxl_batch_size, len(self._adxl_buf))
-                    chunk = self._adxl_buf[:take]
-                    del self._adxl_buf[:take]
+                    stamp, chunk = self._take_adxl()
+                    self._inflight += 1
                     self._adxl_last_flush = now
 
             if chunk is not None:
                 body = {
                     "device_id": self.device_id,
-                    "ts": datetime.utcnow().isoformat() + "Z",
+                    "ts": utc_iso(stamp.t_us),
                     "type": "adxl_batch",
-                    "fs_hz": 500,
-                    "chunk_start_us": int(chunk[0][0]),
+                    "fs_hz": stamp.fs_hz,
+                    "chunk_start_index": stamp.index,
+                    "chunk_start_us": stamp.t_us,
+                    "drift_ppm": round(stamp.drift_ppm, 3),
                     "samples": chunk
                 }
-                try:
-                    self._post(body)
-                except Exception:
-                    pass
+                if not self._send(body):
+                    UPLOAD_DROPPED.inc(len(chunk))
+
+            # ---- 3) gửi ADXL features nếu có ----
+            feat_item = None
+            with self._lock:
+                if self._feat_buf:
+                    feat_item = self._feat_buf.pop(0)
+                    self._inflight += 1
+
+            if feat_item is not None:
+                self._send({
+                    "device_id": self.device_id,
+                    "ts": utc_iso(feat_item[0]),
+                    "type": "adxl_features",
+                    "features": feat_item[1]
+                })
+
+            # ---- 4) gửi ADXL event nếu có ----
+            ev_item = None
+            with self._lock:
+                if self._event_buf:
+                    ev_item = self._event_buf.pop(0)
+                    self._inflight += 1
+
+            if ev_item is not None:
+                self._send({
+                    "device_id": self.device_id,
+                    "ts": utc_iso(ev_item[0]),
+                    "type": "adxl_event",
+                    "event": ev_item[1]
+                })
 
             time.sleep(0.001)
@@ -1,27 +1,85 @@
+import contextlib
 import csv
+import json
 import threading
 import time
+from collections import deque
 from pathlib import Path
 
-from smbus2 import SMBus  # <-- thêm để dùng ADXL I2C
+import numpy as np
+
+try:
+    from smbus2 import SMBus  # <-- thêm để dùng ADXL I2C
+except ImportError:  # máy dev không có smbus2 -> chỉ dùng được backend "sim"
+    SMBus = None
 
 from ..config import (
     ADXL_ADDR,
+    ADXL_ANCHOR_S,
+    ADXL_BLOCK_SIZE,
+    ADXL_BUS_FAIL_LIMIT,
+    ADXL_CHANNEL_FAIL_LIMIT,
     ADXL_HEADERS,
+    ADXL_HEALTH_CHECK_S,
+    ADXL_MAX_CATCHUP_TICKS,
+    ADXL_MAX_GAP_FILL_S,
+    ADXL_OFFSET_SAMPLES,
+    ADXL_RETRY_MAX_S,
+    ADXL_RETRY_MIN_S,
     CH_ADXL1,
     CH_ADXL2,
     CH_ADXL3,
+    HW_BACKEND,
     INTERVAL_US,
     MUX_ADDR,
+    SIM_I2C_ERROR_RATE,
+    SIM_I2C_LATENCY_S,
 )
+from .. import tracing
+from ..metrics import REGISTRY
+from ..processing.decimation import make_decimator
+from ..timebase import Timebase
+from .rows import int_rows
+
+ADXL_SAMPLES = REGISTRY.counter("adxl_samples_total", "ADXL ticks sampled (all channels per tick)")
+ADXL_I2C_ERRORS = REGISTRY.counter("adxl_i2c_errors_total", "ADXL Z read errors", ("channel",))
+ADXL_TICKS_MISSED = REGISTRY.counter("adxl_ticks_missed_total", "Sampling ticks serviced more than one interval late")
+ADXL_TICK_LATENESS = REGISTRY.histogram(
+    "adxl_tick_lateness_seconds", "Delay between a tick's scheduled time and the start of its reads",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.05))
+ADXL_TICK_SECONDS = REGISTRY.histogram(
+    "adxl_tick_seconds", "Time to select and read all channels in one tick",
+    buckets=(0.0005, 0.001, 0.0015, 0.002, 0.003, 0.005, 0.01, 0.02, 0.05))
+ADXL_OUTPUT_ERRORS = REGISTRY.counter("adxl_output_errors_total", "Exceptions from ADXL block outputs", ("output",))
+ADXL_GAP_SAMPLES = REGISTRY.counter("adxl_gap_samples_total", "Samples emitted as gaps (read error, channel down, "
+                                    "not calibrated, skipped tick)", ("channel",))
+ADXL_TICKS_SKIPPED = REGISTRY.counter("adxl_ticks_skipped_total", "Ticks not sampled because the loop fell too far behind")
+ADXL_CHANNEL_UP = REGISTRY.gauge("adxl_channel_up", "1 while the channel is sampled, 0 while down", ("channel",))
+ADXL_CHANNEL_REINITS = REGISTRY.counter("adxl_channel_reinits_total", "ADXL345 re-init attempts",
+                                        ("channel", "reason", "result"))
+ADXL_BUS_OPENS = REGISTRY.counter("adxl_bus_opens_total", "I2C bus open attempts (startup and resets)", ("result",))
+ADXL_LOGGER_RESTARTS = REGISTRY.counter("adxl_logger_restarts_total",
+                                        "Unexpected exceptions in the acquisition loop (resumed after bus reset)",
+                                        ("error",))
 
 
 # ================= ADXL HELPERS (copy tối giản từ adxl.py) ==================
+def open_bus():
+    """Mở bus I2C theo HW_BACKEND ("hw" -> SMBus(1), "sim" -> FakeSMBus)."""
+    if HW_BACKEND == "sim":
+        from .sim import FakeSMBus
+        return FakeSMBus(1, latency_s=SIM_I2C_LATENCY_S, error_rate=SIM_I2C_ERROR_RATE)
+    if SMBus is None:
+        raise RuntimeError("smbus2 is not installed (set SENSOR_BACKEND=sim to use the simulator)")
+    return SMBus(1)
+
+
 def tca9548a_select(bus: SMBus, channel: int):
     if not (0 <= channel <= 7):
         raise ValueError("Channel must be 0..7")
-    bus.write_byte(MUX_ADDR, 1 << channel)
-    time.sleep(0.0005)
+    with tracing.span("mux_select", channel=channel):
+        bus.write_byte(MUX_ADDR, 1 << channel)
+        time.sleep(0.0005)
 
 
 def adxl_write_reg(bus: SMBus, reg: int, val: int) -> int:
@@ -34,7 +92,8 @@ def adxl_write_reg(bus: SMBus, reg: int, val: int) -> int:
 
 def adxl_read_multi(bus: SMBus, reg: int, length: int):
     try:
-        data = bus.read_i2c_block_data(ADXL_ADDR, reg, length)
+        with tracing.span("i2c_read", reg=reg):
+            data = bus.read_i2c_block_data(ADXL_ADDR, reg, length)
         if len(data) != length:
             return 5, []
         return 0, data
@@ -52,13 +111,56 @@ def adxl_read_z(bus: SMBus):
     return 0, z
 
 
-def adxl_init_on_current_channel(bus: SMBus):
+def adxl_init_on_current_channel(bus: SMBus) -> int:
     # BW_RATE ~ 400 Hz
-    adxl_write_reg(bus, 0x2C, 0x0C)
+    err = adxl_write_reg(bus, 0x2C, 0x0C)
     # ±8g, full-res
-    adxl_write_reg(bus, 0x31, 0x0A)
+    err |= adxl_write_reg(bus, 0x31, 0x0A)
     # Measure=1
-    adxl_write_reg(bus, 0x2D, 0x08)
+    err |= adxl_write_reg(bus, 0x2D, 0x08)
+    return err
+
+
+def adxl_is_measuring(bus: SMBus):
+    """(err, measuring): đọc POWER_CTL; Measure=0 nghĩa là sensor đã reset (brown-out) về standby."""
+    err, buf = adxl_read_multi(bus, 0x2D, 1)
+    if err != 0:
+        return err, False
+    return 0, bool(buf[0] & 0x08)
+
+
+def anchor_path(csv_path) -> Path:
+    """File neo thời gian cạnh log CSV ADXL: adxl345_log_X.csv -> adxl345_log_X.time.jsonl."""
+    return Path(csv_path).with_suffix(".time.jsonl")
+
+
+# ================= CHANNEL HEALTH ==================
+class _Channel:
+    """Trạng thái 1 ADXL345 trên mux: offset, lỗi liên tiếp, up/down, lịch re-init (backoff)."""
+    __slots__ = ("ch", "col", "offset", "cal", "up", "fails", "backoff", "next_retry", "err_metric", "gap_metric")
+
+    def __init__(self, ch: int, col: int):
+        self.ch = ch
+        self.col = col                  # cột trong block (Z1, Z2, Z3)
+        self.offset = None              # None -> chưa hiệu chuẩn, mẫu là gap
+        self.cal = []                   # mẫu hiệu chuẩn online (kênh hỏng lúc khởi động)
+        self.up = False
+        self.fails = 0
+        self.backoff = ADXL_RETRY_MIN_S
+        self.next_retry = 0.0
+        self.err_metric = ADXL_I2C_ERRORS.labels(channel=ch)
+        self.gap_metric = ADXL_GAP_SAMPLES.labels(channel=ch)
+        ADXL_CHANNEL_UP.labels(channel=ch).set(0)
+
+    def set_up(self, up: bool, now: float = 0.0):
+        self.up = up
+        self.fails = 0
+        if up:
+            self.backoff = ADXL_RETRY_MIN_S
+        else:
+            self.next_retry = now + self.backoff
+            self.backoff = min(2 * self.backoff, ADXL_RETRY_MAX_S)
+        ADXL_CHANNEL_UP.labels(channel=self.ch).set(1 if up else 0)
 
 
 # ================= ADXL LOGGER THREAD ==================
@@ -66,22 +168,62 @@ class ADXLLogger(threading.Thread):
     """
     Đọc 3 ADXL345 qua TCA9548A và ghi CSV riêng.
     Không liên quan UI.
+    Mẫu được gom theo block (ADXL_BLOCK_SIZE); mỗi đầu ra có tần số riêng
+    (log / upload / display), hạ tần số bằng Decimator (lọc chống alias):
+    None = giữ nguyên tần số lấy mẫu (1e6 / INTERVAL_US).
+
+    Lỗi bus không dừng thread: mẫu lỗi là gap (NaN trong block, CSV rỗng, JSON null).
+    Kênh lỗi ADXL_CHANNEL_FAIL_LIMIT lần liên tiếp bị bỏ khỏi vòng đọc và re-init theo backoff
+    (tối đa 1 lần / tick) trong khi các kênh khác vẫn đọc đủ tần số. Brown-out (POWER_CTL.Measure = 0)
+    được kiểm tra luân phiên mỗi ADXL_HEALTH_CHECK_S. Không kênh nào đọc được trong
+    ADXL_BUS_FAIL_LIMIT tick -> reset mux, đóng / mở lại bus, re-init tất cả.
+
+    Thời gian: mỗi tick có chỉ số mẫu đơn điệu (kể cả tick gap), nhịp theo time.monotonic;
+    self.timebase ánh xạ chỉ số -> thời gian thực. Mỗi block giao kèm BlockStamp
+    (push_block(block, stamp), push_adxl_block(block, stamp)); log CSV có file neo
+    <log>.time.jsonl (hàng CSV -> chỉ số, t_us) ghi mỗi ADXL_ANCHOR_S và khi trục thời gian bị đứt.
     """
-    def __init__(self, csv_path: Path, realtime_sender=None):
+    def __init__(self, csv_path: Path = None, realtime_sender=None, block_consumers=(),
+                 log_rate_hz: float = None, upload_rate_hz: float = None,
+                 display_rate_hz: float = None, display_seconds: float = 10.0,
+                 bus_factory=open_bus):
         super().__init__(daemon=True)
         self.csv_path = csv_path
+        self.bus_factory = bus_factory
         self._running = True
 
+        self.fs_hz = 1e6 / INTERVAL_US
+        self._log_dec = make_decimator(self.fs_hz, log_rate_hz)
+        self._upload_dec = make_decimator(self.fs_hz, upload_rate_hz)
+        self._display_dec = make_decimator(self.fs_hz, display_rate_hz)
+        self.display_rate_hz = float(display_rate_hz or self.fs_hz)
+        self._display = deque(maxlen=max(1, int(display_seconds * self.display_rate_hz)))
+        self.timebase = Timebase(self.fs_hz)
+
         self.offsetZ1 = 0
         self.offsetZ2 = 0
         self.offsetZ3 = 0
 
         self._lock = threading.Lock()
-        self._latest = None  # (z1, z2, z3)
+        self._latest = None  # (z1, z2, z3), None = gap
+
+        self._block = np.full((ADXL_BLOCK_SIZE, 3), np.nan)
+        self._block_n = 0
+        self._index = 0              # chỉ số mẫu kế tiếp (mọi tick, kể cả gap)
+        self._previous_us = None     # nhịp tick (monotonic µs), giữ qua các lần reset bus
+        self._anchor_f = None        # <log>.time.jsonl
+        self._log_row = 0            # số hàng dữ liệu đã ghi CSV
+        self._log_next = None        # chỉ số (luồng log) mong đợi của hàng CSV kế tiếp
+        self._anchor_next = None
+        self._anchor_steps = 0
+        self._bus_backoff = ADXL_RETRY_MIN_S
 
         # ===== ADD: realtime sender =====
         self.realtime_sender = realtime_sender
 
+        # các bộ xử lý nhận block (ADXL_BLOCK_SIZE x 3) qua push_block()
+        self.block_consumers = list(block_consumers)
+
     def stop(self):
         self._running = False
 
@@ -89,100 +231,330 @@ class ADXLLogger(threading.Thread):
         with self._lock:
             return self._latest
 
-    def run(self):
+    def get_display(self):
+        """Mẫu gần nhất ở display_rate_hz: np.ndarray (n, 3)."""
+        with self._lock:
+            return np.array(self._display, dtype=np.float64).reshape(-1, 3)
+
+    @staticmethod
+    def _resample(dec, block):
+        if dec is None:
+            return block
+        return np.rint(dec.process(block))
+
+    def _stamp(self, dec, start: int):
+        """Stamp của mẫu ra đầu tiên mà dec sẽ tạo từ block bắt đầu ở chỉ số start (gọi trước process)."""
+        if dec is None:
+            return self.timebase.stamp(start)
+        return self.timebase.stamp(dec.next_output(start) // dec.factor, dec.factor, dec.delay)
+
+    def _write_anchor(self, stamp, reason: str):
+        rec = {"row": self._log_row, "reason": reason}
+        rec.update(stamp.as_dict())
+        self._anchor_f.write(json.dumps(rec) + "\n")
+        self._anchor_f.flush()
+        self._anchor_next = stamp.index + int(ADXL_ANCHOR_S * stamp.fs_hz)
+        self._anchor_steps = self.timebase.steps
+
+    def _log_block(self, block, start: int, writer):
+        stamp = self._stamp(self._log_dec, start)
+        rows = int_rows(self._resample(self._log_dec, block))
+        if not rows:
+            return
+        if self._anchor_f is not None:
+            if self._log_next is None:
+                self._write_anchor(stamp, "start")
+            elif stamp.index != self._log_next:
+                self._write_anchor(stamp, "jump")
+            elif self.timebase.steps != self._anchor_steps:
+                self._write_anchor(stamp, "step")
+            elif stamp.index >= self._anchor_next:
+                self._write_anchor(stamp, "periodic")
+        writer.writerows(rows)
+        self._log_row += len(rows)
+        self._log_next = stamp.index + len(rows)
+
+    def _emit_block(self, block, writer):
+        """Phân phối 1 block (n, 3) cho log / upload / display / block consumers."""
+        start = self._index - len(block)
+        if writer is not None:
+            try:
+                with tracing.span("log_write"):
+                    self._log_block(block, start, writer)
+            except Exception:
+                # vd. đầy đĩa: không dừng đọc sensor
+                ADXL_OUTPUT_ERRORS.labels(output="log").inc()
+
+        # ===== ADD: realtime push (theo block, ở upload rate) =====
+        if self.realtime_sender is not None:
+            try:
+                with tracing.span("publish", output="upload"):
+                    stamp = self._stamp(self._upload_dec, start)
+                    self.realtime_sender.push_adxl_block(self._resample(self._upload_dec, block), stamp)
+            except Exception:
+                ADXL_OUTPUT_ERRORS.labels(output="upload").inc()
+
+        disp = block if self._display_dec is None else self._display_dec.process(block)
+        with self._lock:
+            self._display.extend(disp.tolist())
+
+        stamp = self.timebase.stamp(start)
+        for consumer in self.block_consumers:
+            try:
+                with tracing.span("publish", output=type(consumer).__name__):
+                    consumer.push_block(block.copy(), stamp)
+            except Exception:
+                ADXL_OUTPUT_ERRORS.labels(output=type(consumer).__name__).inc()
+
+    # ---------- block ----------
+    def _push_gap(self, n: int, chans, writer):
+        """Điền n tick toàn gap (tick bị bỏ qua khi vòng lặp trễ quá xa)."""
+        for c in chans:
+            c.gap_metric.inc(n)
+        while n > 0:
+            take = min(n, ADXL_BLOCK_SIZE - self._block_n)
+            self._block[self._block_n:self._block_n + take] = np.nan
+            self._block_n += take
+            self._index += take
+            n -= take
+            if self._block_n == ADXL_BLOCK_SIZE:
+                self._emit_block(self._block, writer)
+                self._block_n = 0
+
+    def _jump(self, n: int, writer):
+        """Bỏ qua n tick không điền gap (trễ quá lâu): xả block dở, luồng đầu ra bắt đầu đoạn mới."""
+        if self._block_n:
+            self._emit_block(self._block[:self._block_n], writer)
+            self._block_n = 0
+        self._index += n
+        for dec in (self._log_dec, self._upload_dec, self._display_dec):
+            if dec is not None:
+                dec.reset(self._index)
+
+    # ---------- sensor / bus ----------
+    def _recover(self, bus, c: _Channel, reason: str, now: float) -> bool:
+        """Chọn kênh + init lại ADXL345 + kiểm tra Measure; lỗi -> lùi lịch theo backoff."""
         try:
-            with SMBus(1) as bus:
-                time.sleep(0.2)
-
-                # init 3 sensors
-                tca9548a_select(bus, CH_ADXL1)
-                adxl_init_on_current_channel(bus)
-
-                tca9548a_select(bus, CH_ADXL2)
-                adxl_init_on_current_channel(bus)
+            tca9548a_select(bus, c.ch)
+            err = adxl_init_on_current_channel(bus)
+            if err == 0:
+                err, measuring = adxl_is_measuring(bus)
+                err = err or not measuring
+        except OSError:
+            err = 1
+        ADXL_CHANNEL_REINITS.labels(channel=c.ch, reason=reason, result="error" if err else "ok").inc()
+        c.set_up(not err, now)
+        return not err
+
+    def _calibrate(self, bus, c: _Channel, discard: int = 20, dt: float = 0.001):
+        """Offset Z của 1 kênh (bỏ mẫu warm-up, median để chặn spike); lỗi -> offset None."""
+        try:
+            tca9548a_select(bus, c.ch)
+            # discard a few samples after switching mux / enabling measure
+            for _ in range(discard):
+                adxl_read_z(bus)
+                time.sleep(dt)
+            vals = []
+            for _ in range(ADXL_OFFSET_SAMPLES):
+                err, z = adxl_read_z(bus)
+                if err == 0:
+                    vals.append(z)
+                time.sleep(dt)
+        except OSError:
+            vals = []
+        if vals:
+            self._set_offset(c, int(np.median(vals)))
+
+    def _set_offset(self, c: _Channel, offset: int):
+        c.offset = offset
+        c.cal = []
+        setattr(self, f"offsetZ{c.col + 1}", offset)
+
+    def _open_bus(self, chans):
+        try:
+            bus = self.bus_factory()
+        except Exception:
+            ADXL_BUS_OPENS.labels(result="error").inc()
+            raise
+        ADXL_BUS_OPENS.labels(result="ok").inc()
+        time.sleep(0.2)
+        now = time.monotonic()
+        for c in chans:
+            self._recover(bus, c, "open", now)
+        for c in chans:
+            if c.up and c.offset is None:
+                self._calibrate(bus, c)
+        return bus
+
+    @staticmethod
+    def _close_bus(bus):
+        if bus is None:
+            return None
+        # TCA9548A không có lệnh reset qua I2C: tắt mọi kênh rồi đóng fd
+        for fn in (lambda: bus.write_byte(MUX_ADDR, 0), bus.close):
+            try:
+                fn()
+            except Exception:
+                pass
+        return None
+
+    def _sleep(self, seconds: float):
+        deadline = time.monotonic() + seconds
+        while self._running and time.monotonic() < deadline:
+            time.sleep(min(0.05, seconds))
+
+    # ---------- sampling loop ----------
+    def _check_health(self, bus, c: _Channel, now: float) -> bool:
+        """Brown-out: sensor về standby (Measure = 0, dữ liệu 0) -> init lại. True nếu sensor vẫn đang đo."""
+        try:
+            tca9548a_select(bus, c.ch)
+            err, measuring = adxl_is_measuring(bus)
+        except OSError:
+            err, measuring = 1, False
+        if err:
+            c.err_metric.inc()
+            c.fails += 1
+            if c.fails >= ADXL_CHANNEL_FAIL_LIMIT:
+                c.set_up(False, now)
+            return False
+        if not measuring:
+            self._recover(bus, c, "brownout", now)
+        return measuring
+
+    def _acquire(self, bus, chans, writer):
+        """Vòng lấy mẫu; trả về khi stop() hoặc khi bus cần reset."""
+        bus_fails = 0
+        next_check = time.monotonic() + ADXL_HEALTH_CHECK_S
+        check_i = 0
+        if self._previous_us is None:
+            self._previous_us = time.monotonic_ns() // 1000
+            self.timebase.start(self._previous_us + INTERVAL_US)
+
+        while self._running:
+            current_us = time.monotonic_ns() // 1000
+            lag = current_us - self._previous_us
+            if lag < INTERVAL_US:
+                # nhường CPU chút
+                time.sleep(0.0002)
+                continue
+            if lag >= 2 * INTERVAL_US:
+                ADXL_TICKS_MISSED.inc()
+            due = lag // INTERVAL_US
+            if due > ADXL_MAX_CATCHUP_TICKS:
+                # trễ quá xa (reset bus, CPU bận): bỏ qua, giữ đúng số tick bằng gap rồi bắt nhịp lại
+                skip = due - 1
+                ADXL_TICKS_SKIPPED.inc(skip)
+                if skip * INTERVAL_US <= ADXL_MAX_GAP_FILL_S * 1e6:
+                    self._push_gap(skip, chans, writer)
+                else:
+                    self._jump(skip, writer)
+                self._previous_us += skip * INTERVAL_US
+            self._previous_us += INTERVAL_US
+            ADXL_TICK_LATENESS.observe((current_us - self._previous_us) / 1e6)
+            self.timebase.maybe_discipline(current_us)
+            t_tick = time.perf_counter()
+            now = time.monotonic()
+
+            row = self._block[self._block_n]
+            row[:] = np.nan
+            attempted = ok = 0
+            for c in chans:
+                if not c.up:
+                    continue
+                attempted += 1
+                try:
+                    tca9548a_select(bus, c.ch)
+                    err, z = adxl_read_z(bus)
+                except OSError:
+                    err, z = 1, 0
+                if err:
+                    c.err_metric.inc()
+                    c.fails += 1
+                    if c.fails >= ADXL_CHANNEL_FAIL_LIMIT:
+                        c.set_up(False, now)
+                    continue
+                ok += 1
+                c.fails = 0
+                if z == 0 and not self._check_health(bus, c, now):
+                    # 0 tuyệt đối ~ dữ liệu standby sau brown-out -> gap
+                    continue
+                if c.offset is None:
+                    c.cal.append(z)
+                    if len(c.cal) >= ADXL_OFFSET_SAMPLES:
+                        self._set_offset(c, int(np.median(c.cal)))
+                    continue
+                row[c.col] = z - c.offset
+
+            # kênh down: tối đa 1 lần re-init / tick để giới hạn thời gian tick
+            for c in chans:
+                if not c.up and now >= c.next_retry:
+                    attempted += 1
+                    ok += self._recover(bus, c, "errors", now)
+                    break
+
+            if now >= next_check:
+                next_check = now + ADXL_HEALTH_CHECK_S
+                up = [c for c in chans if c.up]
+                if up:
+                    check_i = (check_i + 1) % len(up)
+                    self._check_health(bus, up[check_i], now)
+
+            ADXL_TICK_SECONDS.observe(time.perf_counter() - t_tick)
+            ADXL_SAMPLES.inc()
+
+            latest = []
+            for c in chans:
+                v = row[c.col]
+                if v != v:
+                    c.gap_metric.inc()
+                    latest.append(None)
+                else:
+                    latest.append(int(v))
+            with self._lock:
+                self._latest = tuple(latest)
+
+            self._block_n += 1
+            self._index += 1
+            if self._block_n == ADXL_BLOCK_SIZE:
+                self._emit_block(self._block, writer)
+                self._block_n = 0
+
+            if ok:
+                bus_fails = 0
+                self._bus_backoff = ADXL_RETRY_MIN_S
+            elif attempted or not any(c.up for c in chans):
+                bus_fails += 1
+                if bus_fails >= ADXL_BUS_FAIL_LIMIT:
+                    return
 
-                tca9548a_select(bus, CH_ADXL3)
-                adxl_init_on_current_channel(bus)
+    def run(self):
+        chans = [_Channel(ch, i) for i, ch in enumerate((CH_ADXL1, CH_ADXL2, CH_ADXL3))]
 
-                # read offsets (improve stability: discard warm-up + average many samples)
-                def _calc_offset(channel: int, discard: int = 20, samples: int = 200, dt: float = 0.001):
-                    """Return (err, offset) for Z-axis on a given mux channel."""
-                    try:
-                        tca9548a_select(bus, channel)
-                        # discard a few samples after switching mux / enabling measure
-                        for _ in range(discard):
-                            adxl_read_z(bus)
-                            time.sleep(dt)
-                        vals = []
-                        for _ in range(samples):
-                            err, z = adxl_read_z(bus)
-                            if err == 0:
-                                vals.append(z)
-                            time.sleep(dt)
-                        if not vals:
-                            return 1, 0
-                        vals.sort()
-                        # use median to suppress spikes
-                        offset = vals[len(vals)//2]
-                        return 0, int(offset)
-                    except Exception:
-                        return 1, 0
-
-                e1, z1_off = _calc_offset(CH_ADXL1)
-                e2, z2_off = _calc_offset(CH_ADXL2)
-                e3, z3_off = _calc_offset(CH_ADXL3)
-
-                # nếu lỗi offset thì vẫn set 0 để chạy tiếp
-                self.offsetZ1 = z1_off if e1 == 0 else 0
-                self.offsetZ2 = z2_off if e2 == 0 else 0
-                self.offsetZ3 = z3_off if e3 == 0 else 0
-
-                # open csv
+        # open csv (csv_path=None -> không ghi raw, vd. chế độ "events") + file neo thời gian
+        with contextlib.ExitStack() as stack:
+            writer = None
+            if self.csv_path is not None:
                 self.csv_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(self.csv_path, "w", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(ADXL_HEADERS)
-
-                    previous_us = time.time_ns() // 1000
-                    total_us = 0
-
-                    # sampling loop
-                    while self._running:
-                        current_us = time.time_ns() // 1000
-                        if current_us - previous_us >= INTERVAL_US:
-                            previous_us += INTERVAL_US
-
-                            # Z1
-                            tca9548a_select(bus, CH_ADXL1)
-                            err1, z1_raw = adxl_read_z(bus)
-                            z1 = z1_raw - self.offsetZ1
-
-                            # Z2
-                            tca9548a_select(bus, CH_ADXL2)
-                            err2, z2_raw = adxl_read_z(bus)
-                            z2 = z2_raw - self.offsetZ2
-
-                            # Z3
-                            tca9548a_select(bus, CH_ADXL3)
-                            err3, z3_raw = adxl_read_z(bus)
-                            z3 = z3_raw - self.offsetZ3
-
-                            with self._lock:
-                                self._latest = (z1, z2, z3)
-
-                            writer.writerow([z1, z2, z3])
-
-                            # ===== ADD: realtime push per sample (500Hz) =====
-                            if self.realtime_sender is not None:
-                                try:
-                                    self.realtime_sender.push_adxl_sample(z1, z2, z3)
-                                except Exception:
-                                    pass
-
-                        else:
-                            # nhường CPU chút
-                            time.sleep(0.0002)
+                writer = csv.writer(stack.enter_context(open(self.csv_path, "w", newline="")))
+                writer.writerow(ADXL_HEADERS)
+                self._anchor_f = stack.enter_context(open(anchor_path(self.csv_path), "w"))
 
-        except Exception:
-            # im lặng để không phá UI
-            return
+            bus = None
+            try:
+                while self._running:
+                    try:
+                        if bus is None:
+                            bus = self._open_bus(chans)
+                        self._acquire(bus, chans, writer)
+                    except Exception as ex:
+                        # không để thread chết im lặng: đếm lại rồi reset bus
+                        ADXL_LOGGER_RESTARTS.labels(error=type(ex).__name__).inc()
+                    bus = self._close_bus(bus)
+                    if self._running:
+                        self._sleep(self._bus_backoff)
+                        self._bus_backoff = min(2 * self._bus_backoff, ADXL_RETRY_MAX_S)
+            finally:
+                # block dở (< ADXL_BLOCK_SIZE mẫu) lúc dừng: vẫn ghi CSV / gửi / giao consumer trước khi đóng file
+                if self._block_n:
+                    self._emit_block(self._block[:self._block_n], writer)
+                    self._block_n = 0
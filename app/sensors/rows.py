@@ -0,0 +1,14 @@
+"""Định dạng hàng mẫu ADXL cho đầu ra CSV / JSON (logger, realtime sender, trigger event)."""
+import numpy as np
+
+
+def int_rows(block) -> list:
+    """Block (n, C) -> list các hàng số nguyên (làm tròn), NaN (gap) -> None (CSV rỗng / JSON null)."""
+    a = np.asarray(block)
+    if a.dtype.kind != "f":
+        return a.tolist()
+    gap = np.isnan(a)
+    out = np.rint(np.where(gap, 0.0, a)).astype(np.int64).astype(object)
+    if gap.any():
+        out[gap] = None
+    return out.tolist()
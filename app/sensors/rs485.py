@@ -1,10 +1,43 @@
-import minimalmodbus
+import time
 
-from ..config import BAUD, PORT
+try:
+    import minimalmodbus
+except ImportError:  # máy dev không có minimalmodbus -> chỉ dùng được backend "sim"
+    minimalmodbus = None
+
+from .sim import NoResponseError   # = minimalmodbus.NoResponseError khi có minimalmodbus
+
+from ..config import (
+    BAUD,
+    HW_BACKEND,
+    ID_TEMP_HUM,
+    ID_WIND_DIR,
+    ID_WIND_SPD,
+    PORT,
+    SIM_MODBUS_LATENCY_S,
+    SIM_MODBUS_TIMEOUT_RATE,
+)
+from .. import tracing
+from ..metrics import REGISTRY
+
+_sim_slaves = None   # tập slave giả dùng chung cho mọi FakeInstrument
+
+MODBUS_TRANSACTIONS = REGISTRY.counter("modbus_transactions_total", "Modbus register reads by slave and result",
+                                       ("slave", "result"))
+MODBUS_SECONDS = REGISTRY.histogram("modbus_transaction_seconds", "Modbus register read time", ("slave",))
 
 
 # ================= HELPER ==================
 def make_instrument(addr: int):
+    if HW_BACKEND == "sim":
+        global _sim_slaves
+        from .sim import FakeInstrument, default_slaves
+        if _sim_slaves is None:
+            _sim_slaves = default_slaves()
+        return FakeInstrument(PORT, addr, _sim_slaves, latency_s=SIM_MODBUS_LATENCY_S,
+                              timeout_rate=SIM_MODBUS_TIMEOUT_RATE)
+    if minimalmodbus is None:
+        raise RuntimeError("minimalmodbus is not installed (set SENSOR_BACKEND=sim to use the simulator)")
     inst = minimalmodbus.Instrument(PORT, addr)
     inst.serial.baudrate = BAUD
     inst.serial.bytesize = 8
@@ -17,6 +50,47 @@ def make_instrument(addr: int):
     return inst
 
 
+def _read_register(inst, reg: int):
+    """read_register (FC3) + đếm kết quả / thời gian theo slave."""
+    slave = inst.address
+    t0 = time.perf_counter()
+    try:
+        with tracing.span("modbus_transaction", slave=slave, reg=reg):
+            v = inst.read_register(reg, functioncode=3)
+    except Exception as ex:
+        result = "timeout" if isinstance(ex, NoResponseError) else "error"
+        MODBUS_TRANSACTIONS.labels(slave=slave, result=result).inc()
+        raise
+    finally:
+        MODBUS_SECONDS.labels(slave=slave).observe(time.perf_counter() - t0)
+    MODBUS_TRANSACTIONS.labels(slave=slave, result="ok").inc()
+    return v
+
+
+def poll_rs485(inst_temp, inst_spd, inst_dir, gap_s: float = 0.05):
+    """
+    1 chu kỳ đọc RS485 (nhiệt, ẩm, tốc độ gió, hướng gió), nghỉ gap_s giữa các transaction.
+    Trả về (raw_temp, raw_hum, raw_wspd, raw_wdir); lỗi bất kỳ -> tất cả None.
+    """
+    try:
+        inst_temp.address = ID_TEMP_HUM
+        raw_temp = _read_register(inst_temp, 0)
+        time.sleep(gap_s)
+        raw_hum = _read_register(inst_temp, 1)
+        time.sleep(gap_s)
+
+        inst_spd.address = ID_WIND_SPD
+        raw_wspd = _read_register(inst_spd, 0)
+        time.sleep(gap_s)
+
+        inst_dir.address = ID_WIND_DIR
+        raw_wdir = _read_register(inst_dir, 0)
+        time.sleep(gap_s)
+    except Exception:
+        return None, None, None, None
+    return raw_temp, raw_hum, raw_wspd, raw_wdir
+
+
 def deg_to_cardinal(deg: float) -> str:
     try:
         d = float(deg) % 360.0
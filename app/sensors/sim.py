@@ -0,0 +1,276 @@
+"""
+Backend phần cứng giả lập để chạy / đo hiệu năng trên máy dev (không cần SMBus(1), /dev/ttyUSB0):
+- FakeSMBus: bus I2C với TCA9548A + các ADXL345 (mô hình thanh ghi, dạng sóng tổng hợp)
+- FakeInstrument: thay minimalmodbus.Instrument, đọc từ tập slave Modbus giả
+Chọn backend bằng SENSOR_BACKEND=sim (xem config.HW_BACKEND).
+"""
+import errno
+import math
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from ..config import (
+    ADXL_ADDR,
+    BAUD,
+    CH_ADXL1,
+    CH_ADXL2,
+    CH_ADXL3,
+    ID_TEMP_HUM,
+    ID_WIND_DIR,
+    ID_WIND_SPD,
+    MUX_ADDR,
+)
+
+try:
+    from minimalmodbus import NoResponseError
+except ImportError:  # không có minimalmodbus -> lớp tương đương để phân loại timeout theo kiểu
+    class NoResponseError(IOError):
+        """Slave không trả lời (tương đương minimalmodbus.NoResponseError)."""
+
+
+# ================= WAVEFORM ==================
+class Waveform:
+    """
+    Gia tốc trục Z (g) theo thời gian: trọng lực + các tone (Hz, biên độ g) + nhiễu trắng
+    + xung va đập định kỳ (dao động tắt dần).
+    """
+    def __init__(self, gravity_g: float = 1.0, tones=((30.0, 0.05),), noise_g: float = 0.002,
+                 impulse_every_s: float = 0.0, impulse_g: float = 0.5, impulse_hz: float = 80.0,
+                 impulse_decay_s: float = 0.05, phase: float = 0.0, seed: int = None):
+        self.gravity_g = float(gravity_g)
+        self.tones = tuple((float(f), float(a)) for f, a in tones)
+        self.noise_g = float(noise_g)
+        self.impulse_every_s = float(impulse_every_s)
+        self.impulse_g = float(impulse_g)
+        self.impulse_hz = float(impulse_hz)
+        self.impulse_decay_s = float(impulse_decay_s)
+        self.phase = float(phase)
+        self._rng = random.Random(seed)
+
+    def value(self, t: float) -> float:
+        v = self.gravity_g
+        for f, a in self.tones:
+            v += a * math.sin(2 * math.pi * f * t + self.phase)
+        if self.noise_g:
+            v += self._rng.gauss(0.0, self.noise_g)
+        if self.impulse_every_s > 0:
+            dt = t % self.impulse_every_s
+            if dt < 10 * self.impulse_decay_s:
+                v += self.impulse_g * math.exp(-dt / self.impulse_decay_s) * math.sin(2 * math.pi * self.impulse_hz * dt)
+        return v
+
+
+# ================= ADXL345 REGISTER MODEL ==================
+class FakeADXL345:
+    """
+    Mô hình thanh ghi tối giản của ADXL345:
+    DEVID (0x00) = 0xE5, BW_RATE (0x2C), POWER_CTL (0x2D), DATA_FORMAT (0x31), DATAX0..DATAZ1 (0x32..0x37).
+    Chỉ xuất dữ liệu khi POWER_CTL.Measure = 1, giữ mẫu theo ODR của BW_RATE.
+    """
+    def __init__(self, waveform: Waveform = None, clock=time.monotonic):
+        self.waveform = waveform or Waveform()
+        self.clock = clock
+        self.regs = bytearray(0x40)
+        self.reset()
+
+    def reset(self):
+        """Trạng thái sau cấp nguồn (standby)."""
+        self.regs[:] = bytes(0x40)
+        self.regs[0x00] = 0xE5
+        self.regs[0x2C] = 0x0A
+        self._held_t = None
+        self._held = (0, 0, 0)
+
+    def write(self, reg: int, val: int):
+        if reg == 0x00 or not (0 <= reg < 0x40):
+            raise OSError(errno.EIO, "write to read-only/invalid register")
+        self.regs[reg] = val & 0xFF
+
+    def _lsb_per_g(self) -> float:
+        fmt = self.regs[0x31]
+        if fmt & 0x08:            # FULL_RES
+            return 256.0
+        return 256.0 / (1 << (fmt & 0x03))
+
+    def _limit(self) -> int:
+        fmt = self.regs[0x31]
+        if fmt & 0x08:
+            bits = 10 + (fmt & 0x03)
+        else:
+            bits = 10
+        return (1 << (bits - 1)) - 1
+
+    def _sample(self):
+        if not (self.regs[0x2D] & 0x08):
+            return (0, 0, 0)
+        odr = 3200.0 / (1 << (0x0F - (self.regs[0x2C] & 0x0F)))
+        t = math.floor(self.clock() * odr) / odr
+        if t != self._held_t:
+            lim = self._limit()
+            z = int(round(self.waveform.value(t) * self._lsb_per_g()))
+            self._held = (0, 0, max(-lim - 1, min(lim, z)))
+            self._held_t = t
+        return self._held
+
+    def read(self, reg: int, length: int):
+        out = bytearray(self.regs[reg:reg + length])
+        # vùng dữ liệu 0x32..0x37 tính theo thời điểm đọc
+        if reg <= 0x37 and reg + length > 0x32:
+            data = bytearray()
+            for v in self._sample():
+                data += (v & 0xFFFF).to_bytes(2, "little")
+            for i in range(max(reg, 0x32), min(reg + length, 0x38)):
+                out[i - reg] = data[i - 0x32]
+        return list(out)
+
+
+# ================= FAKE SMBUS ==================
+class FakeSMBus:
+    """
+    Thay smbus2.SMBus: TCA9548A ở MUX_ADDR, ADXL345 ở ADXL_ADDR trên từng kênh mux.
+    latency_s: thời gian mỗi transaction I2C; error_rate: xác suất NACK (OSError).
+    Kênh không có sensor / không chọn kênh nào -> OSError như bus thật.
+    """
+    def __init__(self, bus: int = 1, sensors: dict = None, latency_s: float = 0.0002,
+                 error_rate: float = 0.0, seed: int = None):
+        self.bus = bus
+        if sensors is None:
+            sensors = {
+                CH_ADXL1: FakeADXL345(Waveform(tones=((30.0, 0.05),), seed=seed)),
+                CH_ADXL2: FakeADXL345(Waveform(tones=((12.0, 0.03), (80.0, 0.02)), phase=1.0, seed=seed)),
+                CH_ADXL3: FakeADXL345(Waveform(tones=((45.0, 0.04),), phase=2.0, seed=seed)),
+            }
+        self.sensors = sensors
+        self.latency_s = float(latency_s)
+        self.error_rate = float(error_rate)
+        self._rng = random.Random(seed)
+        self._mask = 0
+        self._lock = threading.Lock()
+        self.transactions = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    def _transact(self, addr: int):
+        self.transactions += 1
+        if self.latency_s > 0:
+            time.sleep(self.latency_s)
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            raise OSError(errno.EREMOTEIO, f"NACK from 0x{addr:02x}")
+
+    def _device(self, addr: int):
+        if addr != ADXL_ADDR:
+            raise OSError(errno.EREMOTEIO, f"no device at 0x{addr:02x}")
+        devs = [s for ch, s in self.sensors.items() if self._mask & (1 << ch)]
+        if len(devs) != 1:
+            # không có thiết bị hoặc 2 thiết bị cùng địa chỉ -> bus lỗi
+            raise OSError(errno.EREMOTEIO, f"no single device at 0x{addr:02x} (mux=0x{self._mask:02x})")
+        return devs[0]
+
+    def write_byte(self, addr: int, value: int):
+        with self._lock:
+            self._transact(addr)
+            if addr == MUX_ADDR:
+                self._mask = value & 0xFF
+                return
+            self._device(addr)
+
+    def read_byte(self, addr: int) -> int:
+        with self._lock:
+            self._transact(addr)
+            if addr == MUX_ADDR:
+                return self._mask
+            return self._device(addr).read(0, 1)[0]
+
+    def write_byte_data(self, addr: int, reg: int, value: int):
+        with self._lock:
+            self._transact(addr)
+            self._device(addr).write(reg, value)
+
+    def read_byte_data(self, addr: int, reg: int) -> int:
+        with self._lock:
+            self._transact(addr)
+            return self._device(addr).read(reg, 1)[0]
+
+    def read_i2c_block_data(self, addr: int, reg: int, length: int):
+        with self._lock:
+            self._transact(addr)
+            return self._device(addr).read(reg, length)
+
+
+# ================= FAKE MODBUS ==================
+class FakeSlave:
+    """Slave Modbus giả: registers = {địa chỉ: callable(t) -> int}."""
+    def __init__(self, registers: dict):
+        self.registers = registers
+
+    def read(self, reg: int, t: float) -> int:
+        if reg not in self.registers:
+            raise ValueError(f"Illegal data address {reg}")
+        return int(self.registers[reg](t)) & 0xFFFF
+
+
+def default_slaves(seed: int = None) -> dict:
+    """Cảm biến nhiệt ẩm, tốc độ gió, hướng gió như ngoài hiện trường (x10 theo cách đọc của Dashboard)."""
+    rng = random.Random(seed)
+    return {
+        ID_TEMP_HUM: FakeSlave({
+            0: lambda t: 280 + 40 * math.sin(2 * math.pi * t / 86400) + rng.randint(-2, 2),
+            1: lambda t: 650 - 100 * math.sin(2 * math.pi * t / 86400) + rng.randint(-5, 5),
+        }),
+        ID_WIND_SPD: FakeSlave({
+            0: lambda t: max(0, 35 + 20 * math.sin(2 * math.pi * t / 600) + rng.randint(-8, 8)),
+        }),
+        ID_WIND_DIR: FakeSlave({
+            0: lambda t: (200 + 40 * math.sin(2 * math.pi * t / 900) + rng.randint(-10, 10)) % 360,
+        }),
+    }
+
+
+class FakeInstrument:
+    """
+    Thay minimalmodbus.Instrument (chỉ phần Dashboard dùng).
+    Mỗi transaction tốn latency_s + thời gian truyền frame RTU ở baudrate hiện tại.
+    Slave không tồn tại / timeout giả lập -> chờ serial.timeout rồi raise NoResponseError như minimalmodbus.
+    """
+    _REQ_BYTES = 8
+    _RESP_BYTES = 7
+
+    def __init__(self, port: str, slaveaddress: int, slaves: dict = None, latency_s: float = 0.005,
+                 timeout_rate: float = 0.0, seed: int = None):
+        self.port = port
+        self.address = slaveaddress
+        self.slaves = default_slaves(seed) if slaves is None else slaves
+        self.latency_s = float(latency_s)
+        self.timeout_rate = float(timeout_rate)
+        self._rng = random.Random(seed)
+        self.serial = SimpleNamespace(baudrate=BAUD, bytesize=8, parity="N", stopbits=1, timeout=1.0)
+        self.mode = "rtu"
+        self.clear_buffers_before_each_transaction = True
+        self.close_port_after_each_call = True
+        self.transactions = 0
+
+    def _frame_time(self) -> float:
+        bits = 1 + self.serial.bytesize + self.serial.stopbits + (0 if self.serial.parity == "N" else 1)
+        return (self._REQ_BYTES + self._RESP_BYTES) * bits / float(self.serial.baudrate)
+
+    def read_register(self, registeraddress: int, number_of_decimals: int = 0,
+                      functioncode: int = 3, signed: bool = False) -> int:
+        self.transactions += 1
+        slave = self.slaves.get(self.address)
+        if slave is None or (self.timeout_rate > 0 and self._rng.random() < self.timeout_rate):
+            time.sleep(self.serial.timeout)
+            raise NoResponseError("No communication with the instrument (no answer)")
+        time.sleep(self.latency_s + self._frame_time())
+        v = slave.read(registeraddress, time.time())
+        if signed and v & 0x8000:
+            v -= 0x10000
+        return v / (10 ** number_of_decimals) if number_of_decimals else v
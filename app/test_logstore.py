@@ -0,0 +1,135 @@
+"""
+So sánh LogStore (aggregate từ index bucket) với tính trực tiếp trên từng hàng log giả lập.
+
+    python -m pytest -q app/test_logstore.py
+"""
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from .config import ADXL_HEADERS
+from .logstore import SESSION_TIME_FMT, LogStore, _circular_mean_deg, index_path
+
+SESSION = "2024-05-01_08-00-00"
+FS_HZ = 500
+SECONDS = 60
+ROWS = FS_HZ * SECONDS
+
+
+@pytest.fixture
+def logs(tmp_path):
+    """60s log ADXL 500Hz (có gap) + RS485 1Hz (thiếu 1 hàng) -> (thư mục, t0_us, t_row_us, data)."""
+    rng = np.random.default_rng(0)
+    start = datetime.strptime(SESSION, SESSION_TIME_FMT)
+    t0 = int(start.timestamp() * 1e6)
+    data = rng.integers(-300, 300, size=(ROWS, len(ADXL_HEADERS))).astype(np.float64)
+    data[rng.random(data.shape) < 0.05] = np.nan
+    data[1000:1700, 1] = np.nan                     # gap dài trên 1 kênh
+    csv = tmp_path / f"adxl345_log_{SESSION}.csv"
+    with open(csv, "w") as f:
+        f.write(",".join(ADXL_HEADERS) + "\n")
+        for row in data:
+            f.write(",".join("" if np.isnan(v) else str(int(v)) for v in row) + "\n")
+    with open(csv.with_suffix(".time.jsonl"), "w") as f:
+        f.write(json.dumps({"row": 0, "index": 0, "t_us": t0, "fs_hz": FS_HZ, "drift_ppm": 0.0}) + "\n")
+    with open(tmp_path / f"rs485_log_{SESSION}.csv", "w") as f:
+        f.write("Time,Temperature (°C),Humidity (%),Wind Direction (°),Wind Speed (m/s)\n")
+        for k in range(SECONDS):
+            if k == 30:
+                continue                            # mất 1 lần đọc -> kỳ 29 bị cắt ở max_interval
+            t = (start + timedelta(seconds=k)).strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"{t},25.0,60.0,{(k * 7) % 360},{k % 10}\n")
+    t_row = t0 + np.arange(ROWS, dtype=np.int64) * (1_000_000 // FS_HZ)
+    return tmp_path, t0, t_row, data
+
+
+def brute_force(t_row, data, t0_us, t1_us, scale):
+    """Aggregate từng khoảng [t0, t1) trực tiếp trên các hàng."""
+    out = []
+    for a, b in zip(t0_us, t1_us):
+        x = data[(t_row >= a) & (t_row < b)]
+        r = {"adxl_rows": len(x)}
+        for c, ch in enumerate(ADXL_HEADERS):
+            v = x[:, c][~np.isnan(x[:, c])]
+            r[f"{ch}_n"] = len(v)
+            r[f"{ch}_gap_pct"] = round(100.0 * (1 - len(v) / len(x)), 2) if len(x) else np.nan
+            r[f"{ch}_mean_g"] = v.mean() * scale if len(v) else np.nan
+            r[f"{ch}_std_g"] = v.std() * scale if len(v) else np.nan
+            r[f"{ch}_rms_g"] = np.sqrt(np.mean(v * v)) * scale if len(v) else np.nan
+            r[f"{ch}_min_g"] = v.min() * scale if len(v) else np.nan
+            r[f"{ch}_max_g"] = v.max() * scale if len(v) else np.nan
+            r[f"{ch}_p2p_g"] = (v.max() - v.min()) * scale if len(v) else np.nan
+        out.append(r)
+    return out
+
+
+def assert_matches(df, expected):
+    assert len(df) == len(expected)
+    for i, exp in enumerate(expected):
+        for k, v in exp.items():
+            np.testing.assert_allclose(df[k].iloc[i], v, rtol=1e-9, atol=1e-12, err_msg=f"row {i} {k}")
+
+
+@pytest.mark.parametrize("bucket_s,window_s", [(1.0, 1.0), (1.0, 7.0), (0.5, 0.5), (0.5, 1.5)])
+def test_windows_match_brute_force(logs, bucket_s, window_s):
+    path, t0, t_row, data = logs
+    store = LogStore([path], bucket_s=bucket_s, max_interval_s=2.0)
+    start, end = t0 + 3_000_000, t0 + 50_000_000
+    df = store.windows(start, end, window_s)
+    w_us = int(window_s * 1e6)
+    a = df["t_us"].to_numpy()
+    assert a[0] <= start and a[-1] + w_us >= end
+    assert_matches(df, brute_force(t_row, data, a, a + w_us, store.scale))
+
+
+def test_windows_cover_each_row_once(logs):
+    path, t0, _, _ = logs
+    store = LogStore([path], bucket_s=0.5)
+    assert store.windows(t0, t0 + SECONDS * 1_000_000, 1.5)["adxl_rows"].sum() == ROWS
+    assert store.windows(t0, t0 + SECONDS * 1_000_000, 0.5)["adxl_rows"].sum() == ROWS
+
+
+def test_join_matches_brute_force(logs):
+    path, t0, t_row, data = logs
+    store = LogStore([path], bucket_s=0.5, max_interval_s=0.5)
+    df = store.join()
+    t = df["t_us"].to_numpy()
+    t_end = np.minimum(np.r_[t[1:], np.iinfo(np.int64).max], t + 500_000)
+    np.testing.assert_allclose(df["dur_s"], 0.5)
+    assert_matches(df, brute_force(t_row, data, t, t_end, store.scale))
+
+    df = LogStore([path], max_interval_s=2.0).join()
+    gap = df.index[df["t_us"] == t0 + 29_000_000][0]
+    assert df["dur_s"].iloc[gap] == 2.0 and df["adxl_rows"].iloc[gap] == 2 * FS_HZ
+    assert df["adxl_rows"].sum() == ROWS
+
+
+def test_misaligned_intervals_rejected(logs):
+    path, t0, _, _ = logs
+    with pytest.raises(ValueError):
+        LogStore([path], bucket_s=1.0).windows(t0, t0 + 10_000_000, 1.5)
+    with pytest.raises(ValueError):
+        LogStore([path], bucket_s=1.0, max_interval_s=0.5)
+    with pytest.raises(ValueError):
+        LogStore([path], bucket_s=2.0, max_interval_s=2.0).join()
+
+
+def test_index_per_bucket_size(logs):
+    path, t0, _, _ = logs
+    csv = path / f"adxl345_log_{SESSION}.csv"
+    LogStore([path]).refresh()
+    mtime = index_path(csv).stat().st_mtime_ns
+    assert LogStore([path], bucket_s=0.5).refresh() == ROWS
+    assert index_path(csv, 500_000).exists()
+    assert index_path(csv).stat().st_mtime_ns == mtime
+    assert LogStore([path]).refresh() == 0          # index mặc định vẫn dùng được, không xây lại
+
+
+def test_circular_mean_stays_below_360():
+    deg = np.array([350.0, 10.0, 359.0, 1.0, 90.0, np.nan])
+    out = _circular_mean_deg(deg, np.array([0, 0, 1, 1, 2, 3]), 4)
+    assert np.all((out[:3] >= 0.0) & (out[:3] < 360.0))
+    np.testing.assert_allclose(out[:3], [0.0, 0.0, 90.0], atol=1e-9)
+    assert np.isnan(out[3])
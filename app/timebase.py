@@ -0,0 +1,144 @@
+"""
+Trục thời gian lấy mẫu ADXL: chỉ số mẫu đơn điệu + neo đồng hồ thực được hiệu chỉnh định kỳ.
+
+Mẫu thứ i lên lịch tại  mono0 + i / fs  theo time.monotonic (không nhảy khi chỉnh giờ; trên Linux
+tần số của nó cũng được NTP hiệu chỉnh). Thời gian thực của mẫu = monotonic + offset, với
+offset = wall - monotonic đo lại mỗi TIMEBASE_DISCIPLINE_S:
+- lệch nhỏ: làm mượt (alpha), tốc độ thay đổi offset -> drift_ppm
+- lệch > TIMEBASE_STEP_US (NTP step, Pi không RTC sync giờ sau boot): nhảy neo ngay, đếm step
+Mỗi block mang BlockStamp(index, t_us, fs_hz, drift_ppm) -> log, upload, features, events
+dùng chung 1 trục thời gian thay vì giờ lúc gửi.
+"""
+import time
+
+from .config import TIMEBASE_ALPHA, TIMEBASE_DISCIPLINE_S, TIMEBASE_STEP_US
+from .metrics import REGISTRY
+
+TIMEBASE_STEPS = REGISTRY.counter("timebase_steps_total", "Wall clock steps detected against the monotonic clock")
+TIMEBASE_DRIFT_PPM = REGISTRY.gauge("timebase_drift_ppm", "Rate of change of (wall - monotonic) offset")
+TIMEBASE_ERROR_US = REGISTRY.gauge("timebase_offset_error_us", "Last measured offset minus the predicted offset")
+
+
+def now_us() -> int:
+    return time.time_ns() // 1000
+
+
+def utc_iso(t_us: int) -> str:
+    """Epoch µs -> ISO 8601 UTC kiểu 2024-01-01T00:00:00.000000Z (giống trường "ts" cũ)."""
+    s, us = divmod(int(t_us), 1_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(s)) + f".{us:06d}Z"
+
+
+# ================= BLOCK STAMP ==================
+class BlockStamp:
+    """
+    Thời gian 1 block / 1 luồng mẫu: mẫu có chỉ số `index` (của luồng ở fs_hz) xảy ra lúc t_us
+    (epoch µs). Mẫu khác trong cùng đoạn liên tục: time_us(i).
+    """
+    __slots__ = ("index", "t_us", "fs_hz", "drift_ppm")
+
+    def __init__(self, index: int, t_us: int, fs_hz: float, drift_ppm: float = 0.0):
+        self.index = int(index)
+        self.t_us = int(t_us)
+        self.fs_hz = float(fs_hz)
+        self.drift_ppm = float(drift_ppm)
+
+    def time_us(self, i) -> int:
+        return self.t_us + int(round((i - self.index) * 1e6 / self.fs_hz))
+
+    def shifted(self, n: int) -> "BlockStamp":
+        """Stamp của mẫu thứ n tính từ đầu block."""
+        return BlockStamp(self.index + n, self.time_us(self.index + n), self.fs_hz, self.drift_ppm)
+
+    def as_dict(self) -> dict:
+        return {"index": self.index, "t_us": self.t_us, "fs_hz": self.fs_hz, "drift_ppm": round(self.drift_ppm, 3)}
+
+    def __repr__(self):
+        return f"BlockStamp(index={self.index}, t_us={self.t_us}, fs_hz={self.fs_hz}, drift_ppm={self.drift_ppm:.3f})"
+
+
+# ================= TIMEBASE ==================
+class Timebase:
+    """
+    Ánh xạ chỉ số mẫu (ở fs_hz) -> thời gian monotonic / thời gian thực.
+    Chỉ thread lấy mẫu gọi start()/maybe_discipline(); stamp()/wall_us() đọc trạng thái đơn giản.
+    """
+    def __init__(self, fs_hz: float, discipline_s: float = TIMEBASE_DISCIPLINE_S,
+                 alpha: float = TIMEBASE_ALPHA, step_us: float = TIMEBASE_STEP_US):
+        self.fs_hz = float(fs_hz)
+        self.period_us = 1e6 / self.fs_hz
+        self.discipline_s = float(discipline_s)
+        self.alpha = float(alpha)
+        self.step_us = float(step_us)
+
+        self.mono0_us = None        # thời điểm monotonic của mẫu 0
+        self.offset_us = None       # wall - monotonic (đã làm mượt)
+        self.drift_ppm = 0.0
+        self.steps = 0
+        self._last = None           # (mono_us, offset đo) lần đo trước (tính drift)
+        self._t_us = None           # mono_us của lần hiệu chỉnh trước
+        self._next_us = 0
+
+    @staticmethod
+    def measure_offset_us() -> tuple:
+        """(mono_us, wall - mono) lấy cặp đọc có khoảng cách ngắn nhất trong 3 lần."""
+        best = None
+        for _ in range(3):
+            m0 = time.monotonic_ns()
+            w = time.time_ns()
+            m1 = time.monotonic_ns()
+            if best is None or m1 - m0 < best[0]:
+                best = (m1 - m0, (m0 + m1) // 2, w)
+        _, mono_ns, wall_ns = best
+        return mono_ns / 1000.0, (wall_ns - mono_ns) / 1000.0
+
+    def start(self, mono0_us: float):
+        self.mono0_us = float(mono0_us)
+        self.discipline()
+
+    def discipline(self):
+        mono_us, meas = self.measure_offset_us()
+        self._next_us = mono_us + self.discipline_s * 1e6
+        if self.offset_us is None:
+            self.offset_us = meas
+            self._t_us = mono_us
+            self._last = (mono_us, meas)
+            return
+        # dự đoán theo drift rồi sửa một phần sai số (vòng khoá bậc 2: drift đều -> sai số về 0)
+        pred = self.offset_us + self.drift_ppm * (mono_us - self._t_us) / 1e6
+        self._t_us = mono_us
+        err = meas - pred
+        TIMEBASE_ERROR_US.set(round(err, 1))
+        if abs(err) > self.step_us:
+            # chỉnh giờ: neo lại ngay, drift giữ nguyên (đo tiếp từ neo mới)
+            self.offset_us = meas
+            self.steps += 1
+            TIMEBASE_STEPS.inc()
+            self._last = (mono_us, meas)
+            return
+        self.offset_us = pred + self.alpha * err
+        last_mono, last_meas = self._last
+        if mono_us - last_mono >= 1e6:
+            ppm = (meas - last_meas) / (mono_us - last_mono) * 1e6
+            self.drift_ppm += self.alpha * (ppm - self.drift_ppm)
+            TIMEBASE_DRIFT_PPM.set(round(self.drift_ppm, 3))
+            self._last = (mono_us, meas)
+
+    def maybe_discipline(self, mono_us: float) -> bool:
+        if mono_us < self._next_us:
+            return False
+        self.discipline()
+        return True
+
+    def mono_us(self, index) -> float:
+        return self.mono0_us + index * self.period_us
+
+    def wall_us(self, index) -> int:
+        return int(round(self.mono_us(index) + self.offset_us))
+
+    def stamp(self, index: int, factor: int = 1, delay: float = 0.0) -> BlockStamp:
+        """
+        Stamp cho luồng hạ tần số `factor` lần: mẫu ra k ứng với mẫu vào k * factor,
+        trễ nhóm của bộ lọc `delay` (mẫu vào). index ở đây là chỉ số mẫu ra.
+        """
+        return BlockStamp(index, self.wall_us(index * factor - delay), self.fs_hz / factor, self.drift_ppm)
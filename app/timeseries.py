@@ -0,0 +1,190 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+
+# ================= RING BUFFER ==================
+class _Ring:
+    """
+    Vùng nhớ cấp phát sẵn (capacity x n_cols) dạng vòng.
+    Chỉ ghi đè phần tử cũ nhất, không bao giờ cấp phát lại.
+    """
+    def __init__(self, capacity: int, n_cols: int):
+        self.capacity = int(capacity)
+        self.times = np.full(self.capacity, np.nan, dtype=np.float64)
+        self.values = np.full((self.capacity, n_cols), np.nan, dtype=np.float64)
+        self.head = 0    # vị trí ghi tiếp theo
+        self.count = 0
+
+    def append(self, t: float, row):
+        i = self.head
+        self.times[i] = t
+        self.values[i] = row
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def tail(self, n: int):
+        """Trả về (times, values) của n phần tử mới nhất theo thứ tự thời gian (bản copy)."""
+        n = min(int(n), self.count)
+        if n <= 0:
+            return self.times[:0].copy(), self.values[:0].copy()
+        start = self.head - n
+        if start >= 0:
+            return self.times[start:self.head].copy(), self.values[start:self.head].copy()
+        # quấn vòng: 2 đoạn
+        return (np.concatenate((self.times[start:], self.times[:self.head])),
+                np.concatenate((self.values[start:], self.values[:self.head])))
+
+
+# ================= ROLLUP LEVEL ==================
+class _Rollup:
+    """
+    Gộp dần (incremental) theo bucket cố định `resolution_s` giây.
+    Mỗi bucket lưu: min | mean | max cho từng field (cột 0..n-1, n..2n-1, 2n..3n-1).
+    Field góc (độ) được trung bình vector (sin/cos), min/max để NaN vì không có nghĩa.
+    """
+    def __init__(self, resolution_s: float, capacity: int, n_fields: int, angle_mask):
+        self.resolution_s = float(resolution_s)
+        self.n = n_fields
+        self.angle_mask = angle_mask
+        self.ring = _Ring(capacity, 3 * n_fields)
+        self._bucket = None
+        self._reset_acc()
+
+    def _reset_acc(self):
+        n = self.n
+        self._cnt = np.zeros(n)
+        self._sum = np.zeros(n)
+        self._sin = np.zeros(n)
+        self._cos = np.zeros(n)
+        self._min = np.full(n, np.inf)
+        self._max = np.full(n, -np.inf)
+
+    def _current_row(self):
+        has = self._cnt > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(has, self._sum / self._cnt, np.nan)
+            ang = np.degrees(np.arctan2(self._sin, self._cos)) % 360.0
+        mean = np.where(self.angle_mask & has, ang, mean)
+        vmin = np.where(has & ~self.angle_mask, self._min, np.nan)
+        vmax = np.where(has & ~self.angle_mask, self._max, np.nan)
+        return np.concatenate((vmin, mean, vmax))
+
+    def _finalize(self):
+        self.ring.append(self._bucket * self.resolution_s, self._current_row())
+        self._reset_acc()
+
+    def add(self, t: float, row):
+        b = math.floor(t / self.resolution_s)
+        if self._bucket is None:
+            self._bucket = b
+        elif b > self._bucket:
+            self._finalize()
+            self._bucket = b
+        elif b < self._bucket:
+            # mẫu đến trễ hơn bucket hiện tại -> bỏ qua khỏi rollup
+            return
+
+        ok = ~np.isnan(row)
+        if not ok.any():
+            return
+        v = np.where(ok, row, 0.0)
+        self._cnt += ok
+        self._sum += v
+        rad = np.radians(v)
+        self._sin += np.where(ok, np.sin(rad), 0.0)
+        self._cos += np.where(ok, np.cos(rad), 0.0)
+        self._min = np.where(ok, np.minimum(self._min, v), self._min)
+        self._max = np.where(ok, np.maximum(self._max, v), self._max)
+
+    def tail(self, n: int):
+        """n bucket mới nhất, gồm cả bucket đang gộp dở (để mức 1 h không trễ cả giờ)."""
+        if self._bucket is None:
+            return self.ring.tail(n)
+        t, v = self.ring.tail(n - 1)
+        return (np.append(t, self._bucket * self.resolution_s),
+                np.vstack((v, self._current_row())))
+
+
+# ================= TIME-SERIES STORE ==================
+class TimeSeriesStore:
+    """
+    Lưu lịch sử RS485 (hoặc bất kỳ chuỗi thời gian ít kênh nào) với bộ nhớ cố định:
+    - raw: ring buffer từng mẫu (NaN = không đọc được)
+    - rollups: các mức (độ phân giải s, số bucket) (min, mean, max) cập nhật dần theo từng mẫu
+    Truy vấn `window()` chọn mức mịn nhất có span / độ phân giải <= max_points, nên chi phí vẽ
+    không tăng theo độ dài lịch sử; độ phân giải các mức nên khớp các khung zoom để mỗi khung
+    được gần max_points điểm (xem config.HISTORY_ROLLUPS).
+    """
+    def __init__(self, fields, raw_capacity: int = 3600,
+                 rollups=((10, 720), (60, 720), (180, 960), (1200, 1008), (3600, 8760)),
+                 angle_fields=()):
+        self.fields = tuple(fields)
+        self._idx = {name: i for i, name in enumerate(self.fields)}
+        n = len(self.fields)
+        angle_mask = np.array([f in angle_fields for f in self.fields], dtype=bool)
+
+        self._lock = threading.Lock()
+        self._raw = _Ring(raw_capacity, n)
+        self._levels = [_Rollup(res, cap, n, angle_mask) for res, cap in sorted(rollups)]
+        self._row = np.empty(n, dtype=np.float64)
+
+    def __len__(self):
+        return self._raw.count
+
+    def append(self, t: float = None, **values):
+        """Thêm 1 mẫu. `t` là epoch giây (mặc định time.time()); field thiếu / None -> NaN."""
+        if t is None:
+            t = time.time()
+        row = self._row
+        for name, i in self._idx.items():
+            v = values.get(name)
+            row[i] = np.nan if v is None else float(v)
+        with self._lock:
+            self._raw.append(t, row)
+            for lvl in self._levels:
+                lvl.add(t, row)
+
+    def latest(self, n: int):
+        """n mẫu raw mới nhất: (times, {field: values})."""
+        with self._lock:
+            t, v = self._raw.tail(n)
+        return t, {name: v[:, i] for name, i in self._idx.items()}
+
+    def window(self, span_s: float, max_points: int = 600, now: float = None):
+        """
+        Dữ liệu trong [now - span_s, now] với tối đa ~max_points điểm.
+        Trả về (times, resolution_s, {field: (min, mean, max)}).
+        resolution_s = 0 nghĩa là mẫu raw (min = mean = max).
+        """
+        if now is None:
+            now = time.time()
+        t0 = now - float(span_s)
+
+        with self._lock:
+            # raw nếu cửa sổ có <= max_points mẫu và raw còn giữ đủ xa về quá khứ
+            t, v = self._raw.tail(max_points + 1)
+            covered = (t.size > 0 and t[0] < t0) or \
+                      (t.size <= max_points and self._raw.count < self._raw.capacity)
+            if covered:
+                keep = t >= t0
+                t, v = t[keep], v[keep]
+                cols = {name: (v[:, i], v[:, i], v[:, i]) for name, i in self._idx.items()}
+                return t, 0.0, cols
+
+            lvl = self._levels[-1]
+            for cand in self._levels:
+                if span_s / cand.resolution_s <= max_points:
+                    lvl = cand
+                    break
+            need = int(math.ceil(span_s / lvl.resolution_s)) + 1
+            t, v = lvl.tail(min(need, max_points))
+
+        keep = t >= t0 - lvl.resolution_s
+        t, v = t[keep], v[keep]
+        n = len(self.fields)
+        cols = {name: (v[:, i], v[:, n + i], v[:, 2 * n + i]) for name, i in self._idx.items()}
+        return t, lvl.resolution_s, cols
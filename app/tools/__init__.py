@@ -0,0 +1 @@
+"""Công cụ dev: server ingest giả lập, benchmark."""
@@ -0,0 +1,227 @@
+"""
+Benchmark đường đọc cảm biến trên backend giả lập (app/sensors/sim.py), không cần phần cứng:
+- adxl_tick:   chi phí 1 tick (3 x chọn mux + đọc Z) -> tần số tối đa đạt được
+- adxl_logger: ADXLLogger chạy thật với FakeSMBus -> tần số duy trì (mẫu không gap), tick bị bỏ qua,
+               lỗi I2C, gap, CPU
+- rs485_poll:  1 chu kỳ poll_rs485 (4 transaction Modbus) -> độ trễ chu kỳ
+Kết quả ghi JSON vào bench_results/ để so sánh giữa các phiên bản (--compare file.json).
+
+    python -m app.tools.bench_acquisition --i2c-latency-us 200 --duration 5
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from ..config import (
+    CH_ADXL1,
+    CH_ADXL2,
+    CH_ADXL3,
+    ID_TEMP_HUM,
+    ID_WIND_DIR,
+    ID_WIND_SPD,
+    INTERVAL_US,
+    PORT,
+)
+from ..sensors.adxl import (
+    ADXL_I2C_ERRORS,
+    ADXL_TICKS_MISSED,
+    ADXL_TICKS_SKIPPED,
+    ADXLLogger,
+    adxl_init_on_current_channel,
+    adxl_read_z,
+    tca9548a_select,
+)
+from ..sensors.rs485 import poll_rs485
+from ..sensors.sim import FakeInstrument, FakeSMBus, default_slaves
+
+RESULTS_DIR = Path("bench_results")
+
+
+def _stats_us(samples_s) -> dict:
+    a = np.asarray(samples_s, dtype=np.float64) * 1e6
+    if a.size == 0:
+        return {"n": 0}
+    return {"n": int(a.size), "mean": round(float(a.mean()), 1), "p50": round(float(np.percentile(a, 50)), 1),
+            "p99": round(float(np.percentile(a, 99)), 1), "max": round(float(a.max()), 1)}
+
+
+# ================= ADXL ==================
+def bench_adxl_tick(ticks: int = 2000, i2c_latency_s: float = 0.0002) -> dict:
+    bus = FakeSMBus(1, latency_s=i2c_latency_s, seed=0)
+    for ch in (CH_ADXL1, CH_ADXL2, CH_ADXL3):
+        tca9548a_select(bus, ch)
+        adxl_init_on_current_channel(bus)
+
+    cost = np.empty(ticks)
+    for i in range(ticks):
+        t0 = time.perf_counter()
+        for ch in (CH_ADXL1, CH_ADXL2, CH_ADXL3):
+            tca9548a_select(bus, ch)
+            adxl_read_z(bus)
+        cost[i] = time.perf_counter() - t0
+
+    st = _stats_us(cost)
+    st["max_rate_hz"] = round(1e6 / st["mean"], 1)
+    st["budget_us"] = INTERVAL_US
+    return st
+
+
+class _BlockCounter:
+    """Block consumer chỉ ghi lại thời điểm nhận block, số hàng và số mẫu gap (NaN) mỗi kênh."""
+    def __init__(self):
+        self.times = []
+        self.rows = []
+        self.gaps = []
+        self._lock = threading.Lock()
+
+    def push_block(self, block, stamp=None):
+        with self._lock:
+            self.times.append(time.perf_counter())
+            self.rows.append(len(block))
+            self.gaps.append(np.isnan(block).sum(axis=0))
+
+
+def _counters() -> tuple:
+    return ADXL_TICKS_SKIPPED.total(), ADXL_TICKS_MISSED.total(), ADXL_I2C_ERRORS.total()
+
+
+def bench_adxl_logger(duration_s: float = 5.0, i2c_latency_s: float = 0.0002, i2c_error_rate: float = 0.0) -> dict:
+    counter = _BlockCounter()
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = ADXLLogger(Path(tmp) / "adxl_bench.csv", block_consumers=[counter],
+                            bus_factory=lambda: FakeSMBus(1, latency_s=i2c_latency_s,
+                                                          error_rate=i2c_error_rate, seed=0))
+        logger.start()
+        # chờ hiệu chuẩn offset xong (block đầu tiên)
+        deadline = time.perf_counter() + 30.0
+        while not counter.times and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        n0, c0 = len(counter.times), _counters()
+        time.sleep(duration_s)
+        cpu1, wall1 = time.process_time(), time.perf_counter()
+        n1, c1 = len(counter.times), _counters()
+        logger.stop()
+        logger.join(timeout=2.0)
+
+    fs = 1e6 / INTERVAL_US
+    wall = wall1 - wall0
+    rows = int(np.sum(counter.rows[n0:n1]))
+    gaps = np.sum(counter.gaps[n0:n1], axis=0) if n1 > n0 else np.zeros(3)
+    skipped, late, i2c_errors = (b - a for a, b in zip(c0, c1))
+    # tick bị bỏ qua được điền gap -> chỉ mẫu không gap mới là tần số thực sự đạt được
+    return {
+        "target_rate_hz": fs,
+        "achieved_rate_hz": round(float(3 * rows - gaps.sum()) / 3 / wall, 1),
+        "ticks_emitted": rows,
+        "ticks_skipped": int(skipped),
+        "ticks_late": int(late),
+        "i2c_errors": int(i2c_errors),
+        "gap_pct": round(100.0 * float(gaps.sum()) / max(1, 3 * rows), 2),
+        "i2c_error_gap_pct": round(100.0 * i2c_errors / max(1, 3 * rows), 2),
+        "cpu_pct": round(100.0 * (cpu1 - cpu0) / wall, 1),
+        "block_interval": _stats_us(np.diff(counter.times[n0:n1])),
+    }
+
+
+# ================= RS485 ==================
+def bench_rs485_poll(cycles: int = 10, modbus_latency_s: float = 0.005, gap_s: float = 0.05) -> dict:
+    slaves = default_slaves(seed=0)
+    inst = {a: FakeInstrument(PORT, a, slaves, latency_s=modbus_latency_s, seed=0)
+            for a in (ID_TEMP_HUM, ID_WIND_SPD, ID_WIND_DIR)}
+    lat = np.empty(cycles)
+    cpu0 = time.process_time()
+    wall0 = time.perf_counter()
+    for i in range(cycles):
+        t0 = time.perf_counter()
+        poll_rs485(inst[ID_TEMP_HUM], inst[ID_WIND_SPD], inst[ID_WIND_DIR], gap_s=gap_s)
+        lat[i] = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+    st = _stats_us(lat)
+    st["gap_s"] = gap_s
+    st["cpu_pct"] = round(100.0 * cpu / (time.perf_counter() - wall0), 2)
+    return st
+
+
+# ================= REPORT ==================
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def _flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(_flatten(v, key + "."))
+        elif isinstance(v, (int, float)):
+            out[key] = v
+    return out
+
+
+def compare(old: dict, new: dict):
+    a, b = _flatten(old.get("results", {})), _flatten(new.get("results", {}))
+    print(f"{'metric':45s} {'old':>12s} {'new':>12s} {'delta%':>8s}")
+    for k in sorted(set(a) & set(b)):
+        d = (100.0 * (b[k] - a[k]) / a[k]) if a[k] else 0.0
+        print(f"{k:45s} {a[k]:12.1f} {b[k]:12.1f} {d:8.1f}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Acquisition hot-path benchmark on simulated hardware")
+    ap.add_argument("--duration", type=float, default=5.0, help="ADXLLogger run time (s)")
+    ap.add_argument("--ticks", type=int, default=2000)
+    ap.add_argument("--rs485-cycles", type=int, default=10)
+    ap.add_argument("--i2c-latency-us", type=float, default=200.0)
+    ap.add_argument("--i2c-error-rate", type=float, default=0.0, help="xác suất NACK mỗi transaction I2C")
+    ap.add_argument("--modbus-latency-ms", type=float, default=5.0)
+    ap.add_argument("--out", default=None, help="file JSON kết quả (mặc định bench_results/acquisition_<time>.json)")
+    ap.add_argument("--compare", default=None, help="so sánh với file kết quả trước")
+    args = ap.parse_args(argv)
+
+    i2c_s = args.i2c_latency_us / 1e6
+    res = {
+        "meta": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "git_rev": _git_rev(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "i2c_latency_us": args.i2c_latency_us,
+            "i2c_error_rate": args.i2c_error_rate,
+            "modbus_latency_ms": args.modbus_latency_ms,
+        },
+        "results": {
+            "adxl_tick": bench_adxl_tick(args.ticks, i2c_s),
+            "adxl_logger": bench_adxl_logger(args.duration, i2c_s, args.i2c_error_rate),
+            "rs485_poll": bench_rs485_poll(args.rs485_cycles, args.modbus_latency_ms / 1000.0),
+        },
+    }
+    print(json.dumps(res, indent=2))
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"acquisition_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(res, f, indent=2)
+    print(f"saved {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), res)
+
+
+if __name__ == "__main__":
+    main()
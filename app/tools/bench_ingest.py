@@ -0,0 +1,145 @@
+"""
+Benchmark end-to-end RealtimeSender -> /ingest (server local có giả lập lỗi).
+Đẩy mẫu ADXL giả ở tần số / số kênh tuỳ chọn, đo:
+- throughput duy trì (mẫu/s server nhận được trong thời gian chạy)
+- độ trễ end-to-end (push -> server nhận) p50/p95/p99/max
+- backlog trong RealtimeSender (max, cuối, tốc độ tăng)
+- mất mẫu (push nhưng server không nhận được sau thời gian drain)
+
+    python -m app.tools.bench_ingest --rate 500 --sensors 3 --duration 20 --latency-ms 40 --error-rate 0.01
+"""
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+from ..config import ADXL_BATCH_SIZE, ADXL_BLOCK_SIZE, ADXL_FLUSH_INTERVAL_S, API_KEY
+from ..realtime_sender import RealtimeSender
+from .ingest_server import FaultConfig, IngestServer
+
+
+def run_benchmark(rate_hz: float = 500.0, sensors: int = 3, duration_s: float = 10.0,
+                  batch_size: int = ADXL_BATCH_SIZE, flush_interval_s: float = ADXL_FLUSH_INTERVAL_S,
+                  block_size: int = ADXL_BLOCK_SIZE, timeout_s: float = 2.0, drain_s: float = 3.0,
+                  faults: FaultConfig = None) -> dict:
+    total = int(rate_hz * duration_s)
+    push_t = np.full(total, np.nan)          # thời điểm push theo số thứ tự mẫu
+    recv_t = np.full(total, np.nan)          # thời điểm server nhận (lần đầu)
+    dup = [0]
+    recv_lock = threading.Lock()
+
+    def on_ingest(body, t):
+        if body.get("type") != "adxl_batch":
+            return
+        seq = np.array([row[0] for row in body["samples"]], dtype=np.int64)
+        seq = seq[(seq >= 0) & (seq < total)]
+        with recv_lock:
+            seen = ~np.isnan(recv_t[seq])
+            dup[0] += int(seen.sum())
+            recv_t[seq[~seen]] = t
+
+    server = IngestServer("127.0.0.1", 0, API_KEY, faults, on_ingest=on_ingest).start()
+    sender = RealtimeSender(server.url, API_KEY, "bench-01", timeout=timeout_s,
+                            adxl_batch_size=batch_size, adxl_flush_interval_s=flush_interval_s,
+                            adxl_fs_hz=rate_hz)
+    sender.start()
+
+    backlog = []   # (t, n)
+    t0 = time.monotonic()
+    pushed = 0
+    next_probe = t0
+    try:
+        # producer: đẩy theo block đúng nhịp rate_hz (giống ADXLLogger)
+        while pushed < total:
+            now = time.monotonic()
+            if now >= next_probe:
+                backlog.append((now - t0, sender.adxl_backlog()))
+                next_probe += 0.25
+            n = min(block_size, total - pushed)
+            due_t = t0 + (pushed + n) / rate_hz
+            if now >= due_t:
+                block = np.zeros((n, sensors), dtype=np.int64)
+                block[:, 0] = np.arange(pushed, pushed + n)
+                push_t[pushed:pushed + n] = now
+                sender.push_adxl_block(block)
+                pushed += n
+            else:
+                time.sleep(max(0.0, min(due_t, next_probe) - now))
+        t_end = time.monotonic()
+        with recv_lock:
+            received_in_run = int(np.count_nonzero(recv_t <= t_end))
+
+        # drain: chờ backlog gửi nốt
+        deadline = t_end + drain_s
+        while time.monotonic() < deadline and sender.adxl_backlog() > 0:
+            time.sleep(0.05)
+        time.sleep(min(timeout_s, 0.5))
+        backlog.append((time.monotonic() - t0, sender.adxl_backlog()))
+    finally:
+        sender.stop()
+        server.stop()
+
+    with recv_lock:
+        got = ~np.isnan(recv_t)
+        lat_ms = (recv_t[got] - push_t[got]) * 1000.0
+        received = int(got.sum())
+
+    bl = np.array(backlog) if backlog else np.zeros((0, 2))
+    run_bl = bl[bl[:, 0] <= duration_s] if bl.size else bl
+    growth = float(np.polyfit(run_bl[:, 0], run_bl[:, 1], 1)[0]) if len(run_bl) >= 2 else 0.0
+    pct = (lambda q: round(float(np.percentile(lat_ms, q)), 2)) if lat_ms.size else (lambda q: None)
+
+    return {
+        "rate_hz": rate_hz,
+        "sensors": sensors,
+        "duration_s": duration_s,
+        "batch_size": batch_size,
+        "flush_interval_s": flush_interval_s,
+        "faults": (faults or FaultConfig()).as_dict(),
+        "pushed": pushed,
+        "received": received,
+        "duplicates": dup[0],
+        "lost": pushed - received,
+        "loss_pct": round(100.0 * (pushed - received) / max(1, pushed), 3),
+        "throughput_sps": round(received_in_run / duration_s, 1),
+        "latency_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99),
+                       "max": round(float(lat_ms.max()), 2) if lat_ms.size else None},
+        "backlog": {"max": int(bl[:, 1].max()) if bl.size else 0,
+                    "final": int(bl[-1, 1]) if bl.size else 0,
+                    "growth_sps": round(growth, 1)},
+        "server": server.stats.snapshot(),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="End-to-end RealtimeSender -> /ingest benchmark")
+    ap.add_argument("--rate", type=float, default=500.0, help="samples/s per sensor")
+    ap.add_argument("--sensors", type=int, default=3)
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--batch", type=int, default=ADXL_BATCH_SIZE)
+    ap.add_argument("--flush", type=float, default=ADXL_FLUSH_INTERVAL_S)
+    ap.add_argument("--timeout", type=float, default=2.0)
+    ap.add_argument("--drain", type=float, default=3.0)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--outage-every-s", type=float, default=0.0)
+    ap.add_argument("--outage-for-s", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--json", default=None, help="ghi kết quả ra file JSON")
+    args = ap.parse_args(argv)
+
+    faults = FaultConfig(args.latency_ms, args.jitter_ms, args.error_rate,
+                         args.outage_every_s, args.outage_for_s, seed=args.seed)
+    res = run_benchmark(args.rate, args.sensors, args.duration, args.batch, args.flush,
+                        timeout_s=args.timeout, drain_s=args.drain, faults=faults)
+    print(json.dumps(res, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(res, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Server /ingest chạy local thay cho server Windows (SERVER_URL), cùng hợp đồng với RealtimeSender:
+    POST /ingest, header X-API-Key, body JSON {"device_id", "ts", "type", ...}
+    200 {"ok": true} | 400 JSON lỗi | 401 sai API key | 404 sai path | 503 lỗi giả lập
+Có thể giả lập độ trễ, jitter, tỉ lệ lỗi và mất kết nối theo chu kỳ.
+
+    python -m app.tools.ingest_server --port 8080 --latency-ms 30 --jitter-ms 10 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..config import API_KEY
+
+
+# ================= FAULT MODEL ==================
+class FaultConfig:
+    """
+    latency_ms/jitter_ms: trễ trước khi trả lời (jitter phân bố đều ±jitter_ms)
+    error_rate: xác suất trả 503
+    outage_every_s/outage_for_s: cứ mỗi outage_every_s giây thì "sập" outage_for_s giây
+        (đóng kết nối không trả lời)
+    """
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 outage_every_s: float = 0.0, outage_for_s: float = 0.0, seed: int = None):
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self.outage_every_s = float(outage_every_s)
+        self.outage_for_s = float(outage_for_s)
+        self._rng = random.Random(seed)
+        self._t0 = time.monotonic()
+
+    def as_dict(self) -> dict:
+        return {"latency_ms": self.latency_ms, "jitter_ms": self.jitter_ms,
+                "error_rate": self.error_rate, "outage_every_s": self.outage_every_s,
+                "outage_for_s": self.outage_for_s}
+
+    def delay_s(self) -> float:
+        d = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, d) / 1000.0
+
+    def in_outage(self) -> bool:
+        if self.outage_every_s <= 0 or self.outage_for_s <= 0:
+            return False
+        return (time.monotonic() - self._t0) % self.outage_every_s < self.outage_for_s
+
+    def fail(self) -> bool:
+        return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+
+# ================= SERVER ==================
+class _IngestHandler(BaseHTTPRequestHandler):
+    server_version = "IngestStandIn/1.0"
+    protocol_version = "HTTP/1.1"
+    # header và body ghi 2 lần: để Nagle bật thì mỗi request keep-alive chờ delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _reply(self, code: int, obj: dict):
+        data = json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        srv = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        if srv.faults.in_outage():
+            srv.stats.record("outage")
+            self.close_connection = True
+            return
+
+        time.sleep(srv.faults.delay_s())
+
+        if self.path != "/ingest":
+            srv.stats.record("404")
+            return self._reply(404, {"ok": False, "error": "not found"})
+        if self.headers.get("X-API-Key") != srv.api_key:
+            srv.stats.record("401")
+            return self._reply(401, {"ok": False, "error": "bad api key"})
+        if srv.faults.fail():
+            srv.stats.record("503")
+            return self._reply(503, {"ok": False, "error": "injected failure"})
+        try:
+            body = json.loads(raw)
+            kind = body["type"]
+        except Exception:
+            srv.stats.record("400")
+            return self._reply(400, {"ok": False, "error": "bad json"})
+
+        srv.stats.record("200", kind, body)
+        if srv.on_ingest is not None:
+            try:
+                srv.on_ingest(body, time.monotonic())
+            except Exception:
+                pass
+        self._reply(200, {"ok": True})
+
+
+class IngestStats:
+    """Đếm request theo mã trả về, message theo type, số mẫu ADXL nhận được."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = {}
+        self.types = {}
+        self.adxl_samples = 0
+
+    def record(self, status: str, kind: str = None, body: dict = None):
+        with self._lock:
+            self.status[status] = self.status.get(status, 0) + 1
+            if kind is not None:
+                self.types[kind] = self.types.get(kind, 0) + 1
+                if kind == "adxl_batch":
+                    self.adxl_samples += len(body.get("samples") or [])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"status": dict(self.status), "types": dict(self.types),
+                    "adxl_samples": self.adxl_samples}
+
+
+class IngestServer(ThreadingHTTPServer):
+    """
+    Server /ingest có thể chạy trong cùng process (benchmark) hoặc độc lập (CLI).
+    on_ingest(body, t_monotonic) được gọi cho mỗi message hợp lệ.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, api_key: str = API_KEY,
+                 faults: FaultConfig = None, on_ingest=None, verbose: bool = False):
+        super().__init__((host, port), _IngestHandler)
+        self.api_key = api_key
+        self.faults = faults or FaultConfig()
+        self.on_ingest = on_ingest
+        self.verbose = verbose
+        self.stats = IngestStats()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Chạy serve_forever ở thread nền."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local stand-in for the /ingest server")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--api-key", default=API_KEY)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--outage-every-s", type=float, default=0.0)
+    ap.add_argument("--outage-for-s", type=float, default=0.0)
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    faults = FaultConfig(args.latency_ms, args.jitter_ms, args.error_rate,
+                         args.outage_every_s, args.outage_for_s)
+    srv = IngestServer(args.host, args.port, args.api_key, faults, verbose=args.verbose)
+    print(f"ingest stand-in listening on {srv.url}/ingest")
+    srv.start()
+    try:
+        while True:
+            time.sleep(5.0)
+            print(json.dumps(srv.stats.snapshot()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.stop()
+
+
+if __name__ == "__main__":
+    main()
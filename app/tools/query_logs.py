@@ -0,0 +1,75 @@
+"""
+Truy vấn log đã ghi: RS485 ghép với aggregate ADXL từng kênh (app/logstore.py).
+Lần đầu xây index <log>.idx.npz cho log ADXL (đọc hết CSV 1 lần), các lần sau chỉ đọc phần ghi thêm.
+--bucket khác mặc định dùng index riêng (<log>.idx-<µs>us.npz); --window / --max-interval phải là bội số của bucket.
+
+    python -m app.tools.query_logs /data/logs --build
+    python -m app.tools.query_logs /data/logs --start 2024-05-01 --end 2024-05-03 --out join.csv
+    python -m app.tools.query_logs /data/logs --start 2024-05-01 --end 2024-05-08 --window 600
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ..config import CSV_AUTO_DIR, QUERY_BUCKET_S, QUERY_MAX_INTERVAL_S
+from ..logstore import LogStore
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Time-aligned RS485 / ADXL query over recorded logs")
+    ap.add_argument("paths", nargs="*", default=[str(CSV_AUTO_DIR)], help="log files or directories")
+    ap.add_argument("--start", default=None, help="giờ local ISO, vd. 2024-05-01T08:00")
+    ap.add_argument("--end", default=None)
+    ap.add_argument("--window", type=float, default=None,
+                    help="cửa sổ cố định (s, bội số của --bucket); mặc định 1 hàng / kỳ RS485")
+    ap.add_argument("--bucket", type=float, default=QUERY_BUCKET_S,
+                    help="độ phân giải index (s); join cần bucket chia hết 1s")
+    ap.add_argument("--max-interval", type=float, default=QUERY_MAX_INTERVAL_S, help="bội số của --bucket (s)")
+    ap.add_argument("--build", action="store_true", help="chỉ xây / cập nhật index rồi thoát")
+    ap.add_argument("--out", default=None, help="ghi kết quả (.csv / .xlsx / .parquet)")
+    args = ap.parse_args(argv)
+
+    try:
+        store = LogStore(args.paths, bucket_s=args.bucket, max_interval_s=args.max_interval)
+    except ValueError as ex:
+        ap.error(str(ex))
+    t0 = time.perf_counter()
+    rows = store.refresh()
+    stats = {"sessions": len(store.sessions()), "indexed_rows": rows, "index_s": round(time.perf_counter() - t0, 3)}
+    if args.build:
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    t0 = time.perf_counter()
+    try:
+        if args.window:
+            if args.start is None or args.end is None:
+                ap.error("--window needs --start and --end")
+            df = store.windows(args.start, args.end, args.window)
+        else:
+            df = store.join(args.start, args.end)
+    except ValueError as ex:
+        ap.error(str(ex))
+    stats.update({"query_s": round(time.perf_counter() - t0, 3), "rows": len(df)})
+
+    if args.out:
+        out = Path(args.out)
+        if out.suffix == ".xlsx":
+            df.to_excel(out, index=False)
+        elif out.suffix == ".parquet":
+            df.to_parquet(out, index=False)
+        else:
+            df.to_csv(out, index=False)
+        stats["out"] = str(out)
+    else:
+        with pd.option_context("display.width", 200, "display.max_columns", 12):
+            print(df.head(20))
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,438 @@
+"""
+Replay log đã ghi (adxl345_log_*.csv + rs485_log_*.csv) qua RealtimeSender: backfill dữ liệu
+lên server sau khi máy offline, hoặc chạy lại dữ liệu thật qua phân tích (features / trigger)
+để benchmark.
+
+- Phiên = hậu tố tên file (vd. 2024-05-01_08-00-00, cũng là "session" trong message live).
+- Thời gian ADXL dựng lại từ file neo <log>.time.jsonl (hàng CSV -> chỉ số mẫu, t_us);
+  log cũ không có file neo: giờ trong tên file + ADXL_LOG_RATE_HZ (xấp xỉ, báo approx_time).
+  RS485: cột "Time" (giờ local, độ phân giải 1s).
+- Hai luồng được trộn theo thời gian đo; --speed N = N lần thời gian thực, 0 = nhanh nhất
+  có thể (chỉ bị giới hạn bởi backlog của sender, tức tốc độ đường truyền).
+- Chống trùng: mẫu ADXL xác định bởi (device_id, session, fs_hz, chunk_start_index + i),
+  mẫu RS485 bởi (device_id, session, seq = số hàng trong log) — giống hệt message live,
+  server bỏ bản trùng khi 1 phần phiên đã gửi live hoặc replay chạy lại từ checkpoint.
+- Checkpoint (JSON, ghi nguyên tử): mỗi file lưu hàng + byte offset đã được server xác nhận
+  liên tục; chạy lại -> seek tới offset đó. Message lỗi sau --retries lần -> dừng, exit 1.
+
+    python -m app.tools.replay /data/logs --speed 0 --server http://10.0.0.5:8080
+    python -m app.tools.replay adxl345_log_2024-05-01_08-00-00.csv --server local --analytics
+"""
+import argparse
+import bisect
+import csv
+import heapq
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from ..config import (
+    ADXL_BATCH_SIZE,
+    ADXL_FLUSH_INTERVAL_S,
+    ADXL_G_PER_LSB,
+    ADXL_HEADERS,
+    API_KEY,
+    CSV_AUTO_DIR,
+    DEVICE_ID,
+    FEATURE_BANDS_HZ,
+    FEATURE_OVERLAP,
+    FEATURE_TOP_K,
+    FEATURE_WELCH_NPERSEG,
+    FEATURE_WINDOW,
+    SERVER_URL,
+    TABLE_HEADERS,
+    TRIGGER_LEVEL_G,
+    TRIGGER_LTA_S,
+    TRIGGER_MAX_EVENT_S,
+    TRIGGER_OFF_RATIO,
+    TRIGGER_ON_RATIO,
+    TRIGGER_POST_S,
+    TRIGGER_PRE_S,
+    TRIGGER_STA_S,
+)
+from ..logstore import (
+    RS485_TIME_FMT,
+    LogSession,
+    find_sessions,
+    iter_adxl_chunks,
+    load_anchors,
+    read_complete_lines,
+    skip_header,
+)
+from ..metrics import REGISTRY
+from ..processing.features import VibrationAnalyzer
+from ..processing.triggers import TriggerEngine
+from ..realtime_sender import RealtimeSender
+from ..sensors.rs485 import deg_to_cardinal
+from ..timebase import BlockStamp
+from .ingest_server import IngestServer
+
+REPLAY_ROWS = REGISTRY.counter("replay_rows_total", "Log rows pushed by the replay tool", ("stream",))
+
+CHECKPOINT_NAME = "replay_checkpoint.json"
+
+
+# ================= LOG READERS ==================
+class AdxlLogReader:
+    """
+    Đọc adxl345_log_*.csv theo chunk từ hàng / byte offset cho trước, cắt thành block tối đa
+    block_rows hàng, không vắt qua hàng neo -> (block, BlockStamp, row_end, offset_end).
+    """
+    def __init__(self, path, session: LogSession = None, block_rows: int = ADXL_BATCH_SIZE,
+                 chunk_bytes: int = 1 << 20):
+        self.path = Path(path)
+        self.block_rows = int(block_rows)
+        self.chunk_bytes = int(chunk_bytes)
+        self.anchors, self.approx_time = load_anchors(self.path, session)
+        self._rows = [a["row"] for a in self.anchors]
+
+    def stamp(self, row: int) -> BlockStamp:
+        a = self.anchors[max(0, bisect.bisect_right(self._rows, row) - 1)]
+        base = BlockStamp(a["index"], a["t_us"], a["fs_hz"], a.get("drift_ppm", 0.0))
+        return base.shifted(row - a["row"])
+
+    def _next_break(self, row: int) -> int:
+        i = bisect.bisect_right(self._rows, row)
+        return self._rows[i] if i < len(self._rows) else None
+
+    def blocks(self, row: int = 0, offset: int = 0):
+        for data, row, ends in iter_adxl_chunks(self.path, row, offset, self.chunk_bytes):
+            i = 0
+            while i < len(data):
+                n = min(self.block_rows, len(data) - i)
+                brk = self._next_break(row)
+                if brk is not None:
+                    n = min(n, brk - row)
+                yield data[i:i + n], self.stamp(row), row + n, int(ends[i + n - 1])
+                i += n
+                row += n
+
+
+class Rs485LogReader:
+    """Đọc rs485_log_*.csv -> (t_us, sample dict giống push_rs485 live, seq = số hàng, offset_end)."""
+    def __init__(self, path, chunk_bytes: int = 1 << 18):
+        self.path = Path(path)
+        self.chunk_bytes = int(chunk_bytes)
+
+    @staticmethod
+    def _num(v):
+        return float(v) if v != "" else None
+
+    def rows(self, row: int = 0, offset: int = 0):
+        with open(self.path, "rb") as f:
+            offset = skip_header(f, offset)
+            while True:
+                lines = read_complete_lines(f, self.chunk_bytes)
+                if not lines:
+                    return
+                for line, rec in zip(lines, csv.reader(line.decode("utf-8") for line in lines)):
+                    offset += len(line)
+                    if len(rec) != len(TABLE_HEADERS):
+                        raise ValueError(f"{self.path.name}: malformed row {row}")
+                    time_str = rec[0]
+                    t_us = int(datetime.strptime(time_str, RS485_TIME_FMT).timestamp() * 1e6)
+                    wdir_deg = self._num(rec[3])
+                    yield t_us, {
+                        "time_local": time_str,
+                        "temp_c": self._num(rec[1]),
+                        "hum_pct": self._num(rec[2]),
+                        "wind_dir_deg": wdir_deg,
+                        "wind_dir_txt": "-" if wdir_deg is None else deg_to_cardinal(wdir_deg),
+                        "wind_spd_ms": self._num(rec[4]),
+                    }, row, offset
+                    row += 1
+
+
+# ================= CHECKPOINT ==================
+class Checkpoint:
+    """
+    {"files": {tên file: {"row", "offset"}}}: vị trí đã được server xác nhận liên tục.
+    on_result() chạy ở thread sender; message lỗi (sau retries) -> đóng băng, không tiến thêm
+    (các message sau nó có thể đã tới server, chạy lại sẽ gửi lại -> server bỏ trùng).
+    """
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else None
+        self.files = {}
+        self.failed = None          # type message lỗi đầu tiên
+        self._lock = threading.Lock()
+        self._adxl = deque()        # (chỉ số sau block, file, row, offset) đã push, chờ xác nhận
+        self._rs485 = deque()       # (seq, file, row, offset)
+        if self.path is not None and self.path.exists():
+            with open(self.path) as f:
+                self.files = json.load(f).get("files", {})
+
+    def position(self, path) -> tuple:
+        """(row, offset) đã xác nhận của file; file bị thay (ngắn hơn offset) -> đọc lại từ đầu."""
+        p = self.files.get(Path(path).name)
+        if p is None or p["offset"] > Path(path).stat().st_size:
+            return 0, 0
+        return p["row"], p["offset"]
+
+    def pushed_adxl(self, path, end_index: int, row: int, offset: int):
+        with self._lock:
+            self._adxl.append((end_index, Path(path).name, row, offset))
+
+    def pushed_rs485(self, path, seq: int, row: int, offset: int):
+        with self._lock:
+            self._rs485.append((seq, Path(path).name, row, offset))
+
+    def on_result(self, body: dict, ok: bool):
+        with self._lock:
+            if self.failed is not None:
+                return
+            if not ok:
+                self.failed = body.get("type")
+                return
+            kind = body.get("type")
+            if kind == "adxl_batch":
+                done, q = body["chunk_start_index"] + len(body["samples"]), self._adxl
+                while q and q[0][0] <= done:
+                    _, name, row, offset = q.popleft()
+                    self.files[name] = {"row": row, "offset": offset}
+            elif kind == "rs485" and body.get("seq") is not None:
+                q = self._rs485
+                while q and q[0][0] <= body["seq"]:
+                    _, name, row, offset = q.popleft()
+                    self.files[name] = {"row": row, "offset": offset}
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            data = {"updated": datetime.now().isoformat(timespec="seconds"), "files": dict(self.files)}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, self.path)
+
+
+# ================= ANALYTICS ==================
+class _Analytics:
+    """VibrationAnalyzer + TriggerEngine chạy đồng bộ (process) trên luồng replay, đo thời gian từng stage."""
+    def __init__(self, fs_hz: float, sender=None):
+        self.fs_hz = fs_hz
+        self.stages = {
+            "features": VibrationAnalyzer(
+                fs_hz, window=FEATURE_WINDOW, overlap=FEATURE_OVERLAP, nperseg=FEATURE_WELCH_NPERSEG,
+                bands_hz=FEATURE_BANDS_HZ, top_k=FEATURE_TOP_K, scale=ADXL_G_PER_LSB,
+                channels=ADXL_HEADERS, realtime_sender=sender),
+            "triggers": TriggerEngine(
+                fs_hz, channels=ADXL_HEADERS, scale=ADXL_G_PER_LSB, level=TRIGGER_LEVEL_G,
+                sta_s=TRIGGER_STA_S, lta_s=TRIGGER_LTA_S, on_ratio=TRIGGER_ON_RATIO,
+                off_ratio=TRIGGER_OFF_RATIO, pre_s=TRIGGER_PRE_S, post_s=TRIGGER_POST_S,
+                max_event_s=TRIGGER_MAX_EVENT_S, realtime_sender=sender),
+        }
+        self.seconds = dict.fromkeys(self.stages, 0.0)
+        self.samples = 0
+
+    def process(self, block, stamp):
+        self.samples += len(block)
+        for name, stage in self.stages.items():
+            t0 = time.perf_counter()
+            stage.process(block, stamp)
+            self.seconds[name] += time.perf_counter() - t0
+
+    def report(self) -> dict:
+        out = {"samples": self.samples, "events": self.stages["triggers"].events_emitted}
+        for name, sec in self.seconds.items():
+            out[name] = {"seconds": round(sec, 3),
+                         "samples_per_s": round(self.samples / sec, 1) if sec else None,
+                         "x_realtime": round(self.samples / self.fs_hz / sec, 1) if sec else None}
+        return out
+
+
+# ================= REPLAY ==================
+class Replayer:
+    """
+    Replay từng phiên qua 1 RealtimeSender riêng (session = tên phiên), trộn ADXL + RS485 theo thời gian.
+    sender_factory(session) -> RealtimeSender chưa start (None = không upload).
+    """
+    def __init__(self, sender_factory=None, checkpoint: Checkpoint = None, speed: float = 0.0,
+                 analytics: bool = False, block_rows: int = ADXL_BATCH_SIZE, max_backlog: int = None,
+                 max_idle_s: float = 1.0, checkpoint_s: float = 2.0):
+        self.sender_factory = sender_factory
+        self.checkpoint = checkpoint or Checkpoint()
+        self.speed = float(speed)
+        self.analytics = analytics
+        self.block_rows = int(block_rows)
+        self.max_backlog = int(max_backlog or 8 * self.block_rows)
+        self.max_idle_s = float(max_idle_s)
+        self.checkpoint_s = float(checkpoint_s)
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    def _streams(self, session: LogSession, report: dict):
+        streams = []
+        if session.adxl is not None:
+            reader = AdxlLogReader(session.adxl, session, self.block_rows)
+            report["approx_time"] = reader.approx_time
+            row, offset = self.checkpoint.position(session.adxl)
+            report["adxl_start_row"] = row
+            streams.append((stamp.t_us, "adxl", (block, stamp, end_row, end_off))
+                           for block, stamp, end_row, end_off in reader.blocks(row, offset))
+        if session.rs485 is not None:
+            row, offset = self.checkpoint.position(session.rs485)
+            report["rs485_start_row"] = row
+            streams.append((t_us, "rs485", (sample, seq, end_off))
+                           for t_us, sample, seq, end_off in Rs485LogReader(session.rs485).rows(row, offset))
+        return streams
+
+    def _pace(self, t_us: int, clock: list):
+        """clock = [t_us dữ liệu gốc, perf_counter gốc]; khoảng trống dữ liệu > max_idle_s -> neo lại."""
+        if self.speed <= 0:
+            return
+        if clock[0] is None:
+            clock[0], clock[1] = t_us, time.perf_counter()
+            return
+        wait = clock[1] + (t_us - clock[0]) / 1e6 / self.speed - time.perf_counter()
+        if wait > self.max_idle_s:
+            clock[0], clock[1] = t_us, time.perf_counter()
+        elif wait > 0:
+            time.sleep(wait)
+
+    def _wait_backlog(self, sender):
+        while sender.pending() > self.max_backlog and self._running and self.checkpoint.failed is None:
+            time.sleep(0.001)
+
+    def replay_session(self, session: LogSession) -> dict:
+        report = {"session": session.name, "adxl_rows": 0, "rs485_rows": 0, "approx_time": False}
+        sender = self.sender_factory(session.name) if self.sender_factory is not None else None
+        if sender is not None:
+            sender.on_result = self.checkpoint.on_result
+            sender.start()
+        analytics = None
+        ckpt = self.checkpoint
+        clock = [None, None]
+        t_first = t_last = None
+        wall0 = time.perf_counter()
+        last_save = wall0
+        try:
+            for t_us, kind, item in heapq.merge(*self._streams(session, report), key=lambda x: x[0]):
+                if not self._running or ckpt.failed is not None:
+                    break
+                self._pace(t_us, clock)
+                if sender is not None:
+                    self._wait_backlog(sender)
+                t_first = t_us if t_first is None else t_first
+                t_last = t_us
+                if kind == "adxl":
+                    block, stamp, end_row, end_off = item
+                    report["adxl_rows"] += len(block)
+                    REPLAY_ROWS.labels(stream="adxl").inc(len(block))
+                    if sender is not None:
+                        ckpt.pushed_adxl(session.adxl, stamp.index + len(block), end_row, end_off)
+                        sender.push_adxl_block(block, stamp)
+                    if self.analytics:
+                        if analytics is None or analytics.fs_hz != stamp.fs_hz:
+                            analytics = _Analytics(stamp.fs_hz, sender)
+                        analytics.process(block, stamp)
+                else:
+                    sample, seq, end_off = item
+                    report["rs485_rows"] += 1
+                    REPLAY_ROWS.labels(stream="rs485").inc()
+                    if sender is not None:
+                        ckpt.pushed_rs485(session.rs485, seq, seq + 1, end_off)
+                        sender.push_rs485(sample, t_us, seq=seq)
+                now = time.perf_counter()
+                if now - last_save >= self.checkpoint_s:
+                    ckpt.save()
+                    last_save = now
+            if sender is not None:
+                # chờ gửi hết (kể cả message đang gửi / thử lại) trước khi sang phiên khác
+                while sender.pending() and self._running and ckpt.failed is None:
+                    time.sleep(0.005)
+        finally:
+            if sender is not None:
+                sender.stop()
+                sender.join(timeout=5.0)
+            ckpt.save()
+
+        wall = time.perf_counter() - wall0
+        span_s = (t_last - t_first) / 1e6 if t_first is not None else 0.0
+        report.update({
+            "wall_s": round(wall, 3),
+            "data_span_s": round(span_s, 1),
+            "x_realtime": round(span_s / wall, 1) if wall > 0 else None,
+            "adxl_rows_per_s": round(report["adxl_rows"] / wall, 1) if wall > 0 else None,
+        })
+        if analytics is not None:
+            report["analytics"] = analytics.report()
+        return report
+
+    def run(self, sessions) -> list:
+        reports = []
+        for s in sessions:
+            if not self._running or self.checkpoint.failed is not None:
+                break
+            reports.append(self.replay_session(s))
+        return reports
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay recorded ADXL / RS485 logs through the upload pipeline")
+    ap.add_argument("paths", nargs="*", default=[str(CSV_AUTO_DIR)], help="log files or directories")
+    ap.add_argument("--session", default=None, help="regex lọc tên phiên (hậu tố file)")
+    ap.add_argument("--speed", type=float, default=0.0, help="hệ số thời gian thực, 0 = nhanh nhất có thể")
+    ap.add_argument("--server", default=SERVER_URL, help='URL server, "local" = server /ingest tạm trong process')
+    ap.add_argument("--api-key", default=API_KEY)
+    ap.add_argument("--device-id", default=DEVICE_ID)
+    ap.add_argument("--timeout", type=float, default=5.0)
+    ap.add_argument("--retries", type=int, default=5, help="số lần thử lại mỗi message trước khi dừng")
+    ap.add_argument("--batch-size", type=int, default=ADXL_BATCH_SIZE, help="mẫu ADXL / request")
+    ap.add_argument("--checkpoint", default=None, help=f"file checkpoint (mặc định <thư mục log>/{CHECKPOINT_NAME})")
+    ap.add_argument("--restart", action="store_true", help="bỏ qua checkpoint, replay từ đầu")
+    ap.add_argument("--no-upload", action="store_true", help="không gửi (chỉ đọc log / chạy analytics)")
+    ap.add_argument("--analytics", action="store_true", help="chạy features + trigger trên dữ liệu replay")
+    args = ap.parse_args(argv)
+
+    sessions = find_sessions(args.paths, args.session)
+    if not sessions:
+        print("no sessions found")
+        return 1
+
+    server = None
+    checkpoint = Checkpoint()
+    factory = None
+    if not args.no_upload:
+        url = args.server
+        if url == "local":
+            server = IngestServer("127.0.0.1", 0, args.api_key).start()
+            url = server.url
+        else:
+            first = Path(args.paths[0])
+            ck_path = Path(args.checkpoint) if args.checkpoint else (first if first.is_dir() else first.parent) / CHECKPOINT_NAME
+            if args.restart and ck_path.exists():
+                ck_path.unlink()
+            checkpoint = Checkpoint(ck_path)
+
+        def factory(session):
+            return RealtimeSender(url, args.api_key, args.device_id, timeout=args.timeout,
+                                  adxl_batch_size=args.batch_size, adxl_flush_interval_s=ADXL_FLUSH_INTERVAL_S,
+                                  session=session, retries=args.retries)
+
+    replayer = Replayer(factory, checkpoint, args.speed, args.analytics, block_rows=args.batch_size)
+    try:
+        reports = replayer.run(sessions)
+    except KeyboardInterrupt:
+        replayer.stop()
+        checkpoint.save()
+        return 130
+    finally:
+        if server is not None:
+            server.stop()
+
+    res = {"sessions": reports, "failed": checkpoint.failed}
+    if server is not None:
+        res["server"] = server.stats.snapshot()
+    print(json.dumps(res, indent=2))
+    return 1 if checkpoint.failed is not None else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,168 @@
+"""
+Tracing hot-path (opt-in) -> Chrome / Perfetto trace JSON.
+
+    from . import tracing
+    with tracing.span("i2c_read", channel=1):
+        ...
+
+Khi tắt (mặc định), span() trả về 1 object no-op dùng chung: chỉ tốn 1 lần kiểm tra cờ.
+Khi bật, mỗi thread ghi vào ring buffer riêng (không lock, ghi đè span cũ nhất).
+Buffer của thread đã kết thúc được bỏ sau lần dump kế tiếp (chưa dump: giữ tối đa TRACE_DEAD_BUFFERS).
+Dump: tracing.dump(path) / tracing.to_chrome_trace(), GET /trace trên MetricsServer,
+hoặc SIGUSR1 (xem app/main.py). Mở file bằng chrome://tracing hoặc ui.perfetto.dev.
+"""
+import json
+import os
+import threading
+import time
+import weakref
+
+from .config import TRACE_BUFFER_EVENTS, TRACE_DEAD_BUFFERS, TRACE_ENABLED
+
+_enabled = bool(TRACE_ENABLED)
+_capacity = int(TRACE_BUFFER_EVENTS)
+_local = threading.local()
+_max_dead = int(TRACE_DEAD_BUFFERS)
+_buffers = []                       # _ThreadBuffer theo thứ tự tạo (cả thread đã kết thúc, chưa dump)
+_buffers_lock = threading.Lock()
+_t0_ns = time.perf_counter_ns()
+
+
+# ================= PER-THREAD RING BUFFER ==================
+class _ThreadBuffer:
+    __slots__ = ("thread", "tid", "thread_name", "names", "start", "dur", "args", "head", "count")
+
+    def __init__(self, capacity: int):
+        t = threading.current_thread()
+        self.thread = weakref.ref(t)
+        self.tid = threading.get_native_id()
+        self.thread_name = t.name
+        self.names = [None] * capacity
+        self.start = [0] * capacity
+        self.dur = [0] * capacity
+        self.args = [None] * capacity
+        self.head = 0
+        self.count = 0
+
+    def add(self, name, start_ns, dur_ns, args):
+        i = self.head
+        self.names[i] = name
+        self.start[i] = start_ns
+        self.dur[i] = dur_ns
+        self.args[i] = args
+        self.head = (i + 1) % len(self.names)
+        if self.count < len(self.names):
+            self.count += 1
+
+    def alive(self) -> bool:
+        t = self.thread()
+        return t is not None and t.is_alive()
+
+    def events(self):
+        """Span theo thứ tự thời gian (snapshot best-effort, không khoá writer)."""
+        cap = len(self.names)
+        first = (self.head - self.count) % cap
+        for k in range(self.count):
+            i = (first + k) % cap
+            yield self.names[i], self.start[i], self.dur[i], self.args[i]
+
+
+def _buffer() -> _ThreadBuffer:
+    buf = getattr(_local, "buf", None)
+    if buf is None:
+        buf = _local.buf = _ThreadBuffer(_capacity)
+        with _buffers_lock:
+            # mỗi lần Start/Stop tạo thread mới: chỉ giữ _max_dead buffer của thread đã chết
+            dead = [b for b in _buffers if not b.alive()]
+            if len(dead) > _max_dead:
+                drop = set(map(id, dead[:len(dead) - _max_dead]))
+                _buffers[:] = [b for b in _buffers if id(b) not in drop]
+            _buffers.append(buf)
+    return buf
+
+
+# ================= SPANS ==================
+class _Span:
+    __slots__ = ("name", "args", "t0")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter_ns()
+        _buffer().add(self.name, self.t0, t1 - self.t0, self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **args):
+    """Context manager đo 1 đoạn code; no-op khi tracing tắt."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args or None)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def clear():
+    with _buffers_lock:
+        for b in _buffers:
+            b.head = b.count = 0
+
+
+# ================= EXPORT ==================
+def to_chrome_trace() -> dict:
+    """Trace Event Format: mỗi span là 1 event "X" (ts/dur tính bằng µs)."""
+    pid = os.getpid()
+    events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "rs485_adxl345"}}]
+    with _buffers_lock:
+        buffers = list(_buffers)
+        # thread đã kết thúc: span của nó có trong trace này -> bỏ buffer
+        _buffers[:] = [b for b in _buffers if b.alive()]
+    for b in buffers:
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": b.tid,
+                       "args": {"name": b.thread_name}})
+        for name, start_ns, dur_ns, args in b.events():
+            ev = {"name": name, "ph": "X", "pid": pid, "tid": b.tid,
+                  "ts": (start_ns - _t0_ns) / 1000.0, "dur": dur_ns / 1000.0}
+            if args:
+                ev["args"] = args
+            events.append(ev)
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def dump(path) -> int:
+    """Ghi trace JSON ra file, trả về số event."""
+    trace = to_chrome_trace()
+    with open(path, "w") as f:
+        json.dump(trace, f)
+    return len(trace["traceEvents"])
@@ -1,37 +1,73 @@
 import csv
+import re
+import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from PySide6.QtCore import QTimer, Qt
 from PySide6.QtGui import QColor
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QFileDialog, QTableWidget, QTableWidgetItem, QHeaderView,
-    QSizePolicy, QSpacerItem, QFrame, QMessageBox
+    QSizePolicy, QSpacerItem, QFrame, QMessageBox, QComboBox
 )
 
 from ..config import (
     ADXL_BATCH_SIZE,
+    ADXL_DISPLAY_RATE_HZ,
+    ADXL_DISPLAY_SECONDS,
     ADXL_FLUSH_INTERVAL_S,
+    ADXL_G_PER_LSB,
     ADXL_HEADERS,
+    ADXL_LOG_RATE_HZ,
+    ADXL_MODE,
+    ADXL_UPLOAD_RATE_HZ,
     API_KEY,
     CSV_AUTO_DIR,
     DEVICE_ID,
+    FEATURE_BANDS_HZ,
+    FEATURE_OVERLAP,
+    FEATURE_TOP_K,
+    FEATURE_WELCH_NPERSEG,
+    FEATURE_WINDOW,
+    HISTORY_MAX_POINTS,
+    HISTORY_RAW_CAPACITY,
+    HISTORY_ROLLUPS,
+    HISTORY_SPANS,
     ID_TEMP_HUM,
     ID_WIND_DIR,
     ID_WIND_SPD,
-    MAX_SAMPLES,
+    INTERVAL_US,
+    QUERY_EXPORT_WINDOW_S,
+    QUERY_INDEX_REFRESH_MS,
     READ_INTERVAL_MS,
     SERVER_URL,
     TABLE_HEADERS,
+    TRIGGER_LEVEL_G,
+    TRIGGER_LTA_S,
+    TRIGGER_MAX_EVENT_S,
+    TRIGGER_OFF_RATIO,
+    TRIGGER_ON_RATIO,
+    TRIGGER_POST_S,
+    TRIGGER_PRE_S,
+    TRIGGER_STA_S,
 )
+from .. import tracing
+from ..logstore import LOGSTORE_ERRORS, LogStore
+from ..metrics import REGISTRY
+from ..processing.features import VibrationAnalyzer
+from ..processing.triggers import TriggerEngine
 from ..realtime_sender import RealtimeSender
 from ..sensors.adxl import ADXLLogger
-from ..sensors.rs485 import deg_to_cardinal, make_instrument
+from ..sensors.rs485 import deg_to_cardinal, make_instrument, poll_rs485
+from ..timeseries import TimeSeriesStore
 from .plots import SimplePlot
 
+UI_REDRAW_SECONDS = REGISTRY.histogram("ui_redraw_seconds", "Dashboard plot redraw time")
+
 
 # ================= MAIN DASHBOARD ==================
 class Dashboard(QWidget):
@@ -44,15 +80,19 @@ class Dashboard(QWidget):
         self.inst_dir = make_instrument(ID_WIND_DIR)
         self.inst_spd = make_instrument(ID_WIND_SPD)
 
-        self.data_times = []
-        self.data_temp = []
-        self.data_hum = []
-        self.data_wdir_deg = []
-        self.data_wspd = []
+        # lịch sử RS485: ring buffer NumPy + rollup 1s/1min/1h (bộ nhớ cố định)
+        self.history = TimeSeriesStore(
+            ("temp", "hum", "wdir_deg", "wspd"),
+            raw_capacity=HISTORY_RAW_CAPACITY,
+            rollups=HISTORY_ROLLUPS,
+            angle_fields=("wdir_deg",),
+        )
 
         # ===== ADXL logger handle =====
         self.adxl_logger = None
         self.adxl_csv_path = None
+        self.vib_analyzer = None
+        self.trigger_engine = None
 
         # ===== ADD: realtime sender handle =====
         self.rt_sender = None
@@ -65,19 +105,27 @@ class Dashboard(QWidget):
         topbar = QHBoxLayout()
         self.btnExportExcelADXL = QPushButton("Export Excel ADXL345")
         self.btnExportExcelRS485 = QPushButton("Export Excel RS485")
+        self.btnExportJoin = QPushButton("Export Vibration × Wind")
         self.btnStart = QPushButton("Start")
         self.btnStop = QPushButton("Stop"); self.btnStop.setEnabled(False)
         self.btnRefresh = QPushButton("Refresh")
         self.btnExportExcelADXL.clicked.connect(self.export_excel_adxl_dialog)
         self.btnExportExcelRS485.clicked.connect(self.export_excel_rs485_dialog)
+        self.btnExportJoin.clicked.connect(self.export_join_dialog)
         self.btnStart.clicked.connect(self.start_reading)
         self.btnStop.clicked.connect(self.stop_reading)
         self.btnRefresh.clicked.connect(self.redraw_plots)
+        self.cmbSpan = QComboBox()
+        for label, span_s in HISTORY_SPANS:
+            self.cmbSpan.addItem(label, span_s)
+        self.cmbSpan.currentIndexChanged.connect(self.redraw_plots)
         topbar.addWidget(self.btnExportExcelADXL)
         topbar.addWidget(self.btnExportExcelRS485)
+        topbar.addWidget(self.btnExportJoin)
         topbar.addWidget(self.btnStart)
         topbar.addWidget(self.btnStop)
         topbar.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        topbar.addWidget(self.cmbSpan)
         topbar.addWidget(self.btnRefresh)
         main.addLayout(topbar)
 
@@ -88,9 +136,9 @@ class Dashboard(QWidget):
         self.tile_wdir = self._tile_unified("Wind Direction", "", "#ff9a33", with_subline=True)
         self.tile_wspd = self._tile_unified("Wind Speed", "m/s", "#ffcc00")
         # ADXL tiles (hiển thị mỗi 1s từ logger)
-        self.tile_adxl1 = self._tile_unified("ADXL345 1", "Z", "#c77dff")
-        self.tile_adxl2 = self._tile_unified("ADXL345 2", "Z", "#ff4d6d")
-        self.tile_adxl3 = self._tile_unified("ADXL345 3", "Z", "#00d4ff")
+        self.tile_adxl1 = self._tile_unified("ADXL345 1", "Z", "#c77dff", with_subline=True)
+        self.tile_adxl2 = self._tile_unified("ADXL345 2", "Z", "#ff4d6d", with_subline=True)
+        self.tile_adxl3 = self._tile_unified("ADXL345 3", "Z", "#00d4ff", with_subline=True)
 
         tiles_layout.addWidget(self.tile_temp)
         tiles_layout.addWidget(self.tile_hum)
@@ -102,6 +150,14 @@ class Dashboard(QWidget):
         tiles_layout.addStretch(1)
         main.addLayout(tiles_layout)
 
+        # === Status panel (metrics runtime) ===
+        self.lblStatus = QLabel("-")
+        self.lblStatus.setStyleSheet(
+            "QLabel {background:#1a1a1a; color:#bbbbbb; font-family:monospace; font-size:12px;"
+            " border-radius:6px; padding:6px 10px;}"
+        )
+        main.addWidget(self.lblStatus)
+
         # === Table ===
         self.table = QTableWidget(0, len(TABLE_HEADERS))
         self.table.setHorizontalHeaderLabels(TABLE_HEADERS)
@@ -127,12 +183,23 @@ class Dashboard(QWidget):
         self.plot_wspd = SimplePlot(ylabel="m/s", title="Wind Speed (m/s)")
         plots_rt.addWidget(self.plot_temp, 1)
         plots_rt.addWidget(self.plot_hum, 1)
+        self.plot_adxl = SimplePlot(ylabel="Z", title=f"ADXL345 Z ({ADXL_DISPLAY_RATE_HZ} Hz)")
         plots_rt.addWidget(self.plot_wspd, 1)
+        plots_rt.addWidget(self.plot_adxl, 1)
         main.addLayout(plots_rt, stretch=3)
 
         # === Timers ===
         self.timer = QTimer(); self.timer.timeout.connect(self.read_all)
         self.csv_path = None
+        self.session = None     # tên phiên log (hậu tố file), gửi kèm mỗi message
+        self._rs485_seq = 0     # số hàng dữ liệu trong rs485_log của phiên (seq chống trùng khi replay)
+        # truy vấn log đã ghi (RS485 ghép ADXL); index của phiên đang ghi cập nhật dần để export nhanh
+        self.log_store = LogStore([CSV_AUTO_DIR])
+        self.index_timer = QTimer(); self.index_timer.timeout.connect(self.refresh_log_index)
+        self._log_store_lock = threading.Lock()   # LogStore / AdxlIndex không thread-safe
+        self._export_thread = None
+        self._export_result = None                # (ok, message) do thread export ghi
+        self.export_timer = QTimer(); self.export_timer.timeout.connect(self._poll_export)
         self.apply_dark_style()
 
     # === Tile unified ===
@@ -178,18 +245,24 @@ class Dashboard(QWidget):
 
         # ---- Modbus CSV (giữ nguyên logic cũ) ----
         self.csv_path = CSV_AUTO_DIR / f"rs485_log_{now}.csv"
+        self.session = now
+        self._rs485_seq = 0
         pd.DataFrame(columns=TABLE_HEADERS).to_csv(self.csv_path, index=False)
 
-        # ---- ADXL CSV riêng ----
-        self.adxl_csv_path = CSV_AUTO_DIR / f"adxl345_log_{now}.csv"
-        # tạo file header ngay để dễ thấy file đã được tạo
-        try:
-            with open(self.adxl_csv_path, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(ADXL_HEADERS)
-        except Exception:
-            # nếu không tạo được thì vẫn cho Modbus chạy
-            self.adxl_csv_path = None
+        # ---- ADXL CSV riêng (chế độ "events" không ghi raw) ----
+        adxl_ok = True
+        self.adxl_csv_path = None
+        if ADXL_MODE != "events":
+            self.adxl_csv_path = CSV_AUTO_DIR / f"adxl345_log_{now}.csv"
+            # tạo file header ngay để dễ thấy file đã được tạo
+            try:
+                with open(self.adxl_csv_path, "w", newline="") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(ADXL_HEADERS)
+            except Exception:
+                # nếu không tạo được thì vẫn cho Modbus chạy
+                self.adxl_csv_path = None
+                adxl_ok = False
 
         # ===== ADD: start realtime sender =====
         if self.rt_sender is None:
@@ -197,32 +270,98 @@ class Dashboard(QWidget):
                 SERVER_URL, API_KEY, DEVICE_ID,
                 timeout=2.0,
                 adxl_batch_size=ADXL_BATCH_SIZE,
-                adxl_flush_interval_s=ADXL_FLUSH_INTERVAL_S
+                adxl_flush_interval_s=ADXL_FLUSH_INTERVAL_S,
+                adxl_fs_hz=ADXL_UPLOAD_RATE_HZ or 1e6 / INTERVAL_US,
+                session=now
             )
             self.rt_sender.start()
 
-        # start ADXL thread
-        if self.adxl_csv_path is not None:
-            self.adxl_logger = ADXLLogger(self.adxl_csv_path, realtime_sender=self.rt_sender)
+        # start ADXL thread (+ phân tích rung / trigger)
+        if adxl_ok:
+            events_mode = ADXL_MODE == "events"
+            consumers = []
+            self.vib_analyzer = VibrationAnalyzer(
+                1e6 / INTERVAL_US,
+                window=FEATURE_WINDOW,
+                overlap=FEATURE_OVERLAP,
+                nperseg=FEATURE_WELCH_NPERSEG,
+                bands_hz=FEATURE_BANDS_HZ,
+                top_k=FEATURE_TOP_K,
+                scale=ADXL_G_PER_LSB,
+                channels=ADXL_HEADERS,
+                realtime_sender=self.rt_sender,
+                log_path=(CSV_AUTO_DIR / f"adxl345_features_{now}.jsonl") if events_mode else None,
+            )
+            self.vib_analyzer.start()
+            consumers.append(self.vib_analyzer)
+
+            if events_mode:
+                self.trigger_engine = TriggerEngine(
+                    1e6 / INTERVAL_US,
+                    channels=ADXL_HEADERS,
+                    scale=ADXL_G_PER_LSB,
+                    level=TRIGGER_LEVEL_G,
+                    sta_s=TRIGGER_STA_S,
+                    lta_s=TRIGGER_LTA_S,
+                    on_ratio=TRIGGER_ON_RATIO,
+                    off_ratio=TRIGGER_OFF_RATIO,
+                    pre_s=TRIGGER_PRE_S,
+                    post_s=TRIGGER_POST_S,
+                    max_event_s=TRIGGER_MAX_EVENT_S,
+                    realtime_sender=self.rt_sender,
+                    event_log_path=CSV_AUTO_DIR / f"adxl345_events_{now}.jsonl",
+                )
+                self.trigger_engine.start()
+                consumers.append(self.trigger_engine)
+
+            self.adxl_logger = ADXLLogger(
+                self.adxl_csv_path,
+                realtime_sender=self.rt_sender if ADXL_MODE == "raw" else None,
+                block_consumers=consumers,
+                log_rate_hz=ADXL_LOG_RATE_HZ,
+                upload_rate_hz=ADXL_UPLOAD_RATE_HZ,
+                display_rate_hz=ADXL_DISPLAY_RATE_HZ,
+                display_seconds=ADXL_DISPLAY_SECONDS,
+            )
             self.adxl_logger.start()
 
         # start Modbus timer
         self.timer.start(READ_INTERVAL_MS)
+        self.index_timer.start(QUERY_INDEX_REFRESH_MS)
         self.btnStart.setEnabled(False); self.btnStop.setEnabled(True)
 
     def stop_reading(self):
         # stop Modbus
         self.timer.stop()
+        self.index_timer.stop()
         self.btnStart.setEnabled(True); self.btnStop.setEnabled(False)
 
-        # stop ADXL
+        # stop ADXL: join logger trước (xả block dở cho consumer), rồi analyzer / trigger
+        # (xử lý nốt block còn chờ, phát event đang mở) trước khi dừng sender
         if self.adxl_logger is not None:
             try:
                 self.adxl_logger.stop()
+                self.adxl_logger.join(timeout=2.0)
             except Exception:
                 pass
             self.adxl_logger = None
 
+        if self.vib_analyzer is not None:
+            try:
+                self.vib_analyzer.stop()
+                self.vib_analyzer.join(timeout=2.0)
+            except Exception:
+                pass
+            self.vib_analyzer = None
+
+        if self.trigger_engine is not None:
+            try:
+                self.trigger_engine.stop()
+                self.trigger_engine.join(timeout=2.0)
+            except Exception:
+                pass
+            self.trigger_engine = None
+
         # ===== ADD: stop realtime sender =====
         if self.rt_sender is not None:
             try:
@@ -268,24 +407,75 @@ class Dashboard(QWidget):
             QMessageBox.information(self, "Export", f"Exported to {fname}")
         except Exception as ex:
             QMessageBox.warning(self, "Export", f"Không export được: {ex}")
+
+    def refresh_log_index(self):
+        if self.session is None or self.adxl_csv_path is None:
+            return
+        # export đang chạy (giữ lock) -> lần sau cập nhật
+        if not self._log_store_lock.acquire(blocking=False):
+            return
+        try:
+            self.log_store.refresh(pattern=f"^{re.escape(self.session)}$")
+        except Exception as ex:
+            LOGSTORE_ERRORS.labels(op="refresh", error=type(ex).__name__).inc()
+        finally:
+            self._log_store_lock.release()
+
+    def export_join_dialog(self):
+        if self._export_thread is not None:
+            return
+        span_s = self.cmbSpan.currentData() or HISTORY_SPANS[0][1]
+        fname, _ = QFileDialog.getSaveFileName(
+            self, "Save vibration × wind",
+            f"vibration_wind_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            "CSV Files (*.csv);;Excel Files (*.xlsx)"
+        )
+        if not fname:
+            return
+        end = datetime.now()
+        start = end - timedelta(seconds=span_s)
+        # truy vấn (kể cả xây index lần đầu cho các phiên cũ) chạy ở thread riêng; UI poll kết quả
+        self._export_result = None
+        self._export_thread = threading.Thread(
+            target=self._export_join, args=(start, end, span_s, fname), daemon=True)
+        self._export_thread.start()
+        self.btnExportJoin.setEnabled(False)
+        self.btnExportJoin.setText("Exporting…")
+        self.export_timer.start(200)
+
+    def _export_join(self, start, end, span_s, fname):
+        try:
+            with self._log_store_lock:
+                # khung > 1 ngày: cửa sổ cố định, không thì 1 hàng / kỳ RS485
+                if span_s > 86400:
+                    df = self.log_store.windows(start, end, QUERY_EXPORT_WINDOW_S)
+                else:
+                    df = self.log_store.join(start, end)
+            if fname.endswith(".xlsx"):
+                df.to_excel(fname, index=False)
+            else:
+                df.to_csv(fname, index=False)
+            self._export_result = (True, f"Exported {len(df)} rows to {fname}")
+        except Exception as ex:
+            LOGSTORE_ERRORS.labels(op="export", error=type(ex).__name__).inc()
+            self._export_result = (False, f"Không export được: {ex}")
+
+    def _poll_export(self):
+        if self._export_thread is None or self._export_thread.is_alive():
+            return
+        self.export_timer.stop()
+        self._export_thread = None
+        self.btnExportJoin.setEnabled(True)
+        self.btnExportJoin.setText("Export Vibration × Wind")
+        ok, msg = self._export_result or (False, "Không export được")
+        if ok:
+            QMessageBox.information(self, "Export", msg)
+        else:
+            QMessageBox.warning(self, "Export", msg)
+
     def read_all(self):
         t = datetime.now()
-        try:
-            self.inst_temp.address = ID_TEMP_HUM
-            raw_temp = self.inst_temp.read_register(0, functioncode=3)
-            time.sleep(0.05)
-            raw_hum = self.inst_temp.read_register(1, functioncode=3)
-            time.sleep(0.05)
-
-            self.inst_spd.address = ID_WIND_SPD
-            raw_wspd = self.inst_spd.read_register(0, functioncode=3)
-            time.sleep(0.05)
-
-            self.inst_dir.address = ID_WIND_DIR
-            raw_wdir = self.inst_dir.read_register(0, functioncode=3)
-            time.sleep(0.05)
-        except Exception:
-            raw_temp = raw_hum = raw_wdir = raw_wspd = None
+        raw_temp, raw_hum, raw_wspd, raw_wdir = poll_rs485(self.inst_temp, self.inst_spd, self.inst_dir)
 
         temp = (raw_temp / 10.0) if raw_temp is not None else None
         hum = (raw_hum / 10.0) if raw_hum is not None else None
@@ -319,10 +509,31 @@ class Dashboard(QWidget):
             if lbl2: lbl2.setText("-")
             if lbl3: lbl3.setText("-")
         else:
-            z1, z2, z3 = latest
-            if lbl1: lbl1.setText(f"{z1}")
-            if lbl2: lbl2.setText(f"{z2}")
-            if lbl3: lbl3.setText(f"{z3}")
+            z1, z2, z3 = latest     # None = kênh đang lỗi (gap)
+            if lbl1: lbl1.setText("-" if z1 is None else f"{z1}")
+            if lbl2: lbl2.setText("-" if z2 is None else f"{z2}")
+            if lbl3: lbl3.setText("-" if z3 is None else f"{z3}")
+
+        # ADXL features (RMS + tần số đỉnh) ở dòng phụ
+        feats = None
+        if self.vib_analyzer is not None:
+            try:
+                feats = self.vib_analyzer.get_latest()
+            except Exception:
+                feats = None
+        for i, name in enumerate(("ADXL345_1", "ADXL345_2", "ADXL345_3")):
+            sub = self.findChild(QLabel, f"tile_sub_{name}")
+            if sub is None:
+                continue
+            if feats is None:
+                sub.setText("")
+            else:
+                f0 = feats["peak_freq"][i][0]
+                rms = feats["rms"][i]
+                peak_txt = "-" if np.isnan(f0) else f"{f0:.1f} Hz"
+                sub.setText("RMS - (gap)" if np.isnan(rms) else f"RMS {rms:.3f} g · {peak_txt}")
+
+        self.update_status_panel()
 
         # table update
         if self.table.rowCount() >= 600:
@@ -372,52 +583,133 @@ class Dashboard(QWidget):
                     "wind_dir_deg": wdir_deg,
                     "wind_dir_txt": wdir_txt,
                     "wind_spd_ms": wspd,
-                })
+                }, t_us=int(t.timestamp() * 1e6), seq=self._rs485_seq)
             except Exception:
                 pass
 
+        self._rs485_seq += 1
+
         # series buffer
-        self.data_times.append(t)
-        self.data_temp.append(temp)
-        self.data_hum.append(hum)
-        self.data_wdir_deg.append(wdir_deg)
-        self.data_wspd.append(wspd)
-
-        if len(self.data_times) > MAX_SAMPLES:
-            self.data_times = self.data_times[-MAX_SAMPLES:]
-            self.data_temp = self.data_temp[-MAX_SAMPLES:]
-            self.data_hum = self.data_hum[-MAX_SAMPLES:]
-            self.data_wdir_deg = self.data_wdir_deg[-MAX_SAMPLES:]
-            self.data_wspd = self.data_wspd[-MAX_SAMPLES:]
+        self.history.append(t.timestamp(), temp=temp, hum=hum, wdir_deg=wdir_deg, wspd=wspd)
 
         self.redraw_plots()
 
+    def update_status_panel(self):
+        def total(name, **match):
+            m = REGISTRY.get(name)
+            if m is None:
+                return 0
+            n = 0
+            for key, s in m.series():
+                labels = dict(zip(m.labelnames, key))
+                if all(labels.get(k) == str(v) for k, v in match.items()):
+                    n += s.value
+            return n
+
+        def by_label(name, label, **match):
+            m = REGISTRY.get(name)
+            out = {}
+            if m is None:
+                return out
+            for key, s in m.series():
+                labels = dict(zip(m.labelnames, key))
+                if all(labels.get(k) == str(v) for k, v in match.items()):
+                    out[labels[label]] = out.get(labels[label], 0) + s.value
+            return out
+
+        i2c = by_label("adxl_i2c_errors_total", "channel")
+        status = by_label("upload_requests_total", "status")
+        mb_to = by_label("modbus_transactions_total", "slave", result="timeout")
+        backlog = REGISTRY.get("upload_backlog")
+        adxl_backlog = 0
+        if backlog is not None:
+            for key, s in backlog.series():
+                if key == ("adxl",):
+                    adxl_backlog = s.get()
+
+        lat = []
+        up = REGISTRY.get("upload_latency_seconds")
+        if up is not None:
+            for key, s in up.series():
+                if key == ("adxl_batch",):
+                    lat = [s.quantile(0.5), s.quantile(0.95)]
+        lat_txt = "-" if not lat or lat[0] is None else f"{lat[0] * 1000:.0f}/{lat[1] * 1000:.0f} ms"
+
+        self.lblStatus.setText(
+            f"ADXL samples {total('adxl_samples_total')}"
+            f" | late ticks {total('adxl_ticks_missed_total')}"
+            f" | I2C err {' '.join(f'ch{k}:{v}' for k, v in sorted(i2c.items())) or '0'}"
+            f" | HTTP {' '.join(f'{k}:{v}' for k, v in sorted(status.items())) or '-'}"
+            f" | upload p50/p95 {lat_txt}"
+            f" | dropped {total('upload_dropped_samples_total')}"
+            f" | backlog {adxl_backlog}"
+            f" | Modbus timeouts {' '.join(f'#{k}:{v}' for k, v in sorted(mb_to.items())) or '0'}"
+        )
+
     def redraw_plots(self):
-        def filtered(t, v):
-            t2, v2 = [], []
-            for tt, vv in zip(t, v):
-                if vv is None:
-                    continue
-                t2.append(tt); v2.append(vv)
-            return t2, v2
-
-        t1, v1 = filtered(self.data_times, self.data_temp)
-        t2, v2 = filtered(self.data_times, self.data_hum)
-        t4, v4 = filtered(self.data_times, self.data_wspd)
-
-        self.plot_temp.plot_series(t1, v1, "Temperature (°C)", "#00cc66", y_fixed_range=(10, 50))
-        self.plot_hum.plot_series(t2, v2, "Humidity (%)", "#4da6ff", y_fixed_range=(0, 100))
-        self.plot_wspd.plot_series(t4, v4, "Wind Speed (m/s)", "#ffcc00")
+        with tracing.span("redraw"):
+            self._redraw_plots()
+
+    def _redraw_plots(self):
+        t_redraw = time.perf_counter()
+        span_s = self.cmbSpan.currentData() or HISTORY_SPANS[0][1]
+        times, res_s, cols = self.history.window(span_s, max_points=HISTORY_MAX_POINTS)
+
+        def series(name):
+            vmin, vmean, vmax = cols[name]
+            # raw: không có band min/max
+            return vmean, (None if res_s == 0 else (vmin, vmax))
+
+        v1, b1 = series("temp")
+        v2, b2 = series("hum")
+        v4, b4 = series("wspd")
+
+        self.plot_temp.plot_series(times, v1, "Temperature (°C)", "#00cc66", y_fixed_range=(10, 50), band=b1)
+        self.plot_hum.plot_series(times, v2, "Humidity (%)", "#4da6ff", y_fixed_range=(0, 100), band=b2)
+        self.plot_wspd.plot_series(times, v4, "Wind Speed (m/s)", "#ffcc00", band=b4)
+
+        # ADXL ở display rate (đã lọc chống alias), trục x = giây trước hiện tại
+        disp = None
+        if self.adxl_logger is not None:
+            try:
+                disp = self.adxl_logger.get_display()
+            except Exception:
+                disp = None
+        if disp is not None and len(disp) > 0:
+            x = (np.arange(len(disp)) - len(disp)) / self.adxl_logger.display_rate_hz
+            ys = disp.T
+        else:
+            x, ys = [], []
+        self.plot_adxl.plot_lines(x, ys, f"ADXL345 Z ({ADXL_DISPLAY_RATE_HZ} Hz)",
+                                  ["#c77dff", "#ff4d6d", "#00d4ff"], ADXL_HEADERS)
+        UI_REDRAW_SECONDS.observe(time.perf_counter() - t_redraw)
 
     def closeEvent(self, e):
-        # đảm bảo dừng ADXL khi tắt app
+        # đảm bảo dừng ADXL khi tắt app (cùng thứ tự như stop_reading)
         if self.adxl_logger is not None:
             try:
                 self.adxl_logger.stop()
+                self.adxl_logger.join(timeout=2.0)
             except Exception:
                 pass
             self.adxl_logger = None
 
+        if self.vib_analyzer is not None:
+            try:
+                self.vib_analyzer.stop()
+                self.vib_analyzer.join(timeout=2.0)
+            except Exception:
+                pass
+            self.vib_analyzer = None
+
+        if self.trigger_engine is not None:
+            try:
+                self.trigger_engine.stop()
+                self.trigger_engine.join(timeout=2.0)
+            except Exception:
+                pass
+            self.trigger_engine = None
+
         # ===== ADD: stop sender on close =====
         if self.rt_sender is not None:
             try:
@@ -1,6 +1,11 @@
+from datetime import datetime
+
+import numpy as np
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+from ..config import MAX_SAMPLES
+
 
 # ================= SIMPLE PLOT ==================
 class SimplePlot(FigureCanvas):
@@ -17,22 +22,32 @@ class SimplePlot(FigureCanvas):
             spine.set_color('#888')
         self.ax.grid(True, color='#555', linestyle='--', linewidth=0.6)
 
-    def plot_series(self, times, values, title, color=None, y_fixed_range=None):
+    def plot_series(self, times, values, title, color=None, y_fixed_range=None, band=None):
+        """
+        times: epoch giây (array/list), values: array có thể chứa NaN (= khoảng trống).
+        band: (vmin, vmax) tùy chọn, vẽ vùng min/max khi dữ liệu là rollup.
+        """
         self.ax.clear()
         self.ax.set_facecolor('#222')
         self.ax.set_title(title, color='w', fontsize=12, fontweight='bold')
         self.ax.set_ylabel(self.ax.get_ylabel(), color='w', fontsize=11)
 
-        if len(times) > 0 and len(values) > 0:
-            x = list(range(len(values)))
+        x = np.asarray(times, dtype=np.float64)
+        y = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(y)
+        if x.size > 0 and valid.any():
+            style = dict(linewidth=2.0, linestyle='-')
+            if x.size <= MAX_SAMPLES:
+                style.update(marker='o', markersize=4)
             if color:
-                self.ax.plot(x, values, marker='o', markersize=4, linewidth=2.0, linestyle='-', color=color)
-            else:
-                self.ax.plot(x, values, marker='o', markersize=4, linewidth=2.0, linestyle='-')
+                style["color"] = color
+            if band is not None:
+                self.ax.fill_between(x, band[0], band[1], color=color, alpha=0.25, linewidth=0)
+            self.ax.plot(x, y, **style)
 
-            step = max(1, len(times) // 8)
-            ticks = list(range(0, len(times), step))
-            labels = [times[i].strftime("%H:%M") for i in ticks]
+            ticks = np.linspace(x[0], x[-1], 8) if x[-1] > x[0] else x[:1]
+            fmt = "%H:%M" if (x[-1] - x[0]) < 86400 else "%m-%d %H:%M"
+            labels = [datetime.fromtimestamp(tt).strftime(fmt) for tt in ticks]
             self.ax.set_xticks(ticks)
             self.ax.set_xticklabels(labels, rotation=30, color='w', fontsize=9)
 
@@ -44,7 +59,8 @@ class SimplePlot(FigureCanvas):
                 elif "Humid" in title:
                     self.ax.set_yticks(list(range(y_min, y_max + 1, 10)))
             else:
-                y_max = max(values) * 1.2 if max(values) > 0 else 1
+                top = np.nanmax(band[1]) if band is not None and not np.isnan(band[1]).all() else np.nanmax(y)
+                y_max = top * 1.2 if top > 0 else 1
                 self.ax.set_ylim(0, y_max)
 
         self.ax.tick_params(colors='w', labelsize=9)
@@ -52,3 +68,23 @@ class SimplePlot(FigureCanvas):
             spine.set_color('#888')
         self.ax.grid(True, color='#555', linestyle='--', linewidth=0.6)
         self.draw()
+
+    def plot_lines(self, x, ys, title, colors, labels):
+        """Nhiều đường cùng trục x (vd. 3 kênh ADXL, x = giây tương đối)."""
+        self.ax.clear()
+        self.ax.set_facecolor('#222')
+        self.ax.set_title(title, color='w', fontsize=12, fontweight='bold')
+        self.ax.set_ylabel(self.ax.get_ylabel(), color='w', fontsize=11)
+
+        if len(x) > 0:
+            for y, color, label in zip(ys, colors, labels):
+                self.ax.plot(x, y, linewidth=1.0, color=color, label=label)
+            leg = self.ax.legend(loc="upper left", fontsize=8, facecolor='#222', edgecolor='#888')
+            for txt in leg.get_texts():
+                txt.set_color('w')
+
+        self.ax.tick_params(colors='w', labelsize=9)
+        for spine in self.ax.spines.values():
+            spine.set_color('#888')
+        self.ax.grid(True, color='#555', linestyle='--', linewidth=0.6)
+        self.draw()